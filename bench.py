@@ -0,0 +1,451 @@
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from collections import deque
+from itertools import zip_longest
+from pathlib import Path
+
+# Keep stdout clean for the JSON report.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from main import (
+    BATTLEFIELD_RENDER_SCALE,
+    BEERDB_FILE,
+    UI_BEER_FONT_PATH,
+    UI_COLORKEY,
+    UI_HEADER_FONT_PATH,
+    UI_INFO_FONT_PATH,
+    UI_OPAQUE_PANELS,
+    force_spawn_mode,
+    scene_flags,
+)
+from systems.battle import STARFIELD_BACKEND, ArcadeBattlefield, JSBattle, make_starfield
+from systems.logos import build_logo_cache
+from systems.quality import cap_levels
+from systems.replay import load_timeline
+from systems.taplist import BeerIndex, merge_taplist_with_db
+from systems.ui import draw_taplist_overlay, draw_taplist_static
+from systems.uibuilder import UiBuilder
+from themes import BLUE, RED
+
+# Headless render benchmark: runs the display pipeline against offscreen
+# surfaces (SDL dummy driver) with a fixed RNG seed and fixed dt, and prints
+# per-stage timing stats as JSON so runs can be diffed between commits.
+# Taplist data and logos come from the local json/ and logos/ folders; the
+# bar server is never contacted. With --replay it instead re-runs a scene
+# recorded by the display (GK_RECORD_FILE) frame for frame.
+THEMES = {"red": RED, "blue": BLUE}
+SHIP_MODES = ("normal", "broken", "combat")
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    try:
+        w, h = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+    if w <= 0 or h <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive size, got {text!r}")
+    return w, h
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+    n = len(ordered)
+    if not n:
+        return {"n": 0}
+
+    def pct(q):
+        return ordered[min(n - 1, int(n * q))]
+
+    total = sum(ordered)
+    return {
+        "n": n,
+        "mean_ms": round(total / n, 4),
+        "p50_ms": round(pct(0.50), 4),
+        "p95_ms": round(pct(0.95), 4),
+        "p99_ms": round(pct(0.99), 4),
+        "max_ms": round(ordered[-1], 4),
+        "total_ms": round(total, 3),
+    }
+
+
+class StageTimer:
+    # Collects per-call wall times (ms) per named stage; calls made while
+    # warming up are run but not recorded.
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+
+    def time(self, stage: str, fn, *args, record=True, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        if record:
+            self.samples.setdefault(stage, []).append((time.perf_counter() - t0) * 1000.0)
+        return result
+
+    def stats(self) -> dict:
+        return {stage: summarize(samples) for stage, samples in self.samples.items()}
+
+
+def load_local_json(path: str):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def bench_starfield(timer, size, bg_color, backend, args):
+    field = make_starfield(*size, bg_color, rng=random.Random(args.seed), backend=backend)
+    stage = "starfield" if backend == "python" else f"starfield_{backend}"
+    surface = pygame.Surface(size).convert()
+    for i in range(args.warmup + args.frames):
+        record = i >= args.warmup
+        timer.time(f"{stage}.update", field.update, args.dt, record=record)
+        timer.time(f"{stage}.draw", field.draw, surface, record=record)
+    return surface
+
+
+# Backends that draw from the Python starfield's RNG stream, so the same seed
+# gives the same stars and a pixel comparison means something. The numpy one
+# rolls its stars from its own generator.
+PARITY_BACKENDS = ("layered",)
+
+
+def starfield_parity(size, bg_color, surface, args) -> float:
+    # Share of pixels where a backend's last frame differs from the Python
+    # starfield's after the same seeded run.
+    field = make_starfield(*size, bg_color, rng=random.Random(args.seed), backend="python")
+    reference = pygame.Surface(size).convert()
+    for _ in range(args.warmup + args.frames):
+        field.update(args.dt)
+        field.draw(reference)
+    a = memoryview(pygame.image.tobytes(surface, "RGBX")).cast("I")
+    b = memoryview(pygame.image.tobytes(reference, "RGBX")).cast("I")
+    return round(sum(x != y for x, y in zip(a, b)) / len(a), 6)
+
+
+def bench_battle(timer, size, mode, args):
+    battle = timer.time(f"battle.{mode}.init", JSBattle, *size, rng=random.Random(args.seed))
+    surface = pygame.Surface(size).convert()
+    battle._spawn_ship(mode)
+    for i in range(args.warmup + args.frames):
+        record = i >= args.warmup
+        timer.time(f"battle.{mode}.update", battle.update, args.dt, record=record)
+        # Keep the chosen mode on screen for the whole run.
+        if not battle.ship["active"]:
+            battle._spawn_ship(mode)
+        surface.fill((0, 0, 0))
+        timer.time(f"battle.{mode}.draw", battle.draw, surface, record=record)
+
+
+def bench_logos(timer, beers, theme, args):
+    # One untimed pass rasterizes any missing PNGs into logos/_cache so the
+    # numbers don't depend on what an earlier run left on disk.
+    logo_cache = build_logo_cache(beers, theme.logo_size, theme)
+    for _ in range(args.ui_runs):
+        logo_cache = timer.time("logo_cache", build_logo_cache, beers, theme.logo_size, theme)
+    return logo_cache
+
+
+def bench_taplist(timer, size, beers, logo_cache, theme, args):
+    width, height = size
+    ui_static = pygame.Surface(size).convert()
+    ui_static.set_colorkey(UI_COLORKEY, pygame.RLEACCEL)
+
+    def draw():
+        ui_static.fill(UI_COLORKEY)
+        return draw_taplist_static(
+            ui_static,
+            beers,
+            logo_cache,
+            theme,
+            width,
+            height,
+            beer_font_path=UI_BEER_FONT_PATH,
+            info_font_path=UI_INFO_FONT_PATH,
+            header_font_path=UI_HEADER_FONT_PATH,
+            draw_panels=UI_OPAQUE_PANELS,
+            panel_color=tuple(max(0, c - 18) for c in theme.bg_color),
+            panel_border=tuple(min(255, int(c * 0.55) + 30) for c in theme.accent),
+        )
+
+    # The first draw builds the header text and fonts; main pays that once.
+    draw()
+    for _ in range(args.ui_runs):
+        timer.time("taplist_static", draw)
+    return ui_static
+
+
+def bench_compose(timer, size, battle_surface, ui_static, args):
+    screen = pygame.Surface(size).convert()
+    scale_needed = battle_surface.get_size() != size
+    for i in range(args.warmup + args.frames):
+        record = i >= args.warmup
+        if scale_needed:
+            timer.time("scale", pygame.transform.scale, battle_surface, size, screen, record=record)
+        else:
+            timer.time("scale", screen.blit, battle_surface, (0, 0), record=record)
+        timer.time("compose", screen.blit, ui_static, (0, 0), record=record)
+
+
+def run_resolution(size, theme, beers, args):
+    timer = StageTimer()
+    battle_size = (
+        max(640, int(size[0] * args.render_scale)),
+        max(360, int(size[1] * args.render_scale)),
+    )
+    parity = {}
+    for backend in args.starfields:
+        battle_surface = bench_starfield(timer, battle_size, theme.bg_color, backend, args)
+        if backend in PARITY_BACKENDS:
+            parity[backend] = starfield_parity(battle_size, theme.bg_color, battle_surface, args)
+    for mode in args.modes:
+        bench_battle(timer, battle_size, mode, args)
+    logo_cache = bench_logos(timer, beers, theme, args)
+    ui_static = bench_taplist(timer, size, beers, logo_cache, theme, args)
+    bench_compose(timer, size, battle_surface, ui_static, args)
+    return {"battle_size": list(battle_size), "starfield_parity": parity, "stages": timer.stats()}
+
+
+def replay_timeline(timeline, args):
+    # Mirrors the per-frame work of main.run() for a recorded timeline. Taplist
+    # layers are built off-thread by a UiBuilder as in run(). The recording
+    # holds the updates run() applied, after its debounce, so they are
+    # submitted at their recorded frame with no further delay. Replays aren't
+    # paced to the recorded frame times, so a build can span a different
+    # number of frames than it did live; "ui_updates" reports how many.
+    header = timeline.header
+    theme = THEMES[header["side"]]
+    flags = header.get("flags", {})
+    width, height = header["size"]
+    battle_w, battle_h = header["battle_size"]
+    colorkey = flags.get("ui_colorkey", True)
+    full_blit = flags.get("ui_full_blit", True)
+    draw_panels = flags.get("ui_opaque_panels", UI_OPAQUE_PANELS)
+    panel_color = tuple(max(0, c - 18) for c in theme.bg_color)
+    panel_border = tuple(min(255, int(c * 0.55) + 30) for c in theme.accent)
+    timer = StageTimer()
+
+    battlefield = ArcadeBattlefield(
+        battle_w, battle_h, bg_color=theme.bg_color, rng=random.Random(timeline.seed)
+    )
+    capped = cap_levels(glow=battlefield.base_glow, render_scale=flags.get("render_scale", 1.0))
+    levels = {level.name: level for level in capped}
+    state = {"frame": 0}
+    spawns = []
+    # The recorded spawns and bullet intervals drive the battle; what it
+    # actually spawned is kept to check the replay against the recording.
+    battlefield.battle.scripted_spawns = deque(timeline.spawns)
+    battlefield.battle.scripted_intervals = deque(timeline.bullet_intervals)
+    battlefield.battle.on_spawn = lambda spawn: spawns.append(
+        {"f": state["frame"], "mode": spawn["mode"], "scale": spawn["scale"]}
+    )
+    battlefield_surface = pygame.Surface((battle_w, battle_h)).convert()
+    screen = pygame.Surface((width, height)).convert()
+    toggles = {"draw_starfield": True, "draw_battle": True, "draw_ui": True}
+    font_kwargs = {
+        "beer_font_path": UI_BEER_FONT_PATH,
+        "info_font_path": UI_INFO_FONT_PATH,
+        "header_font_path": UI_HEADER_FONT_PATH,
+        "draw_panels": draw_panels,
+        "panel_color": panel_color,
+        "panel_border": panel_border,
+    }
+    ui_builder = UiBuilder(
+        theme, (width, height), print, font_kwargs, colorkey=UI_COLORKEY if colorkey else None
+    )
+    layer = timer.time("ui_build", ui_builder.build_now, header.get("token"), header["beers"])
+    ui_static, ui_rects = layer.surface, layer.rects
+    crossfade_s = flags.get("ui_crossfade_ms", 0) / 1000.0
+    fade_from = None
+    fade_elapsed = 0.0
+    submitted = deque()
+    ui_updates = []
+    ui_builder.start()
+
+    frames = len(timeline) if args.replay_frames <= 0 else min(len(timeline), args.replay_frames)
+    for frame in range(frames):
+        state["frame"] = frame
+        for event in timeline.events.get(frame, ()):
+            kind = event["t"]
+            if kind == "force":
+                motion = (event["x"], event["y"], event["vx"], event["vy"])
+                force_spawn_mode(battlefield, event["mode"], event["scale"], motion)
+            elif kind == "toggle":
+                toggles[event["name"]] = event["value"]
+            elif kind == "quality":
+                level = levels[event["level"]]
+                battlefield.apply_quality(level.star_density, level.particle_scale, level.glow, level.sim_rate)
+                new_w = max(640, int(width * level.render_scale))
+                new_h = max(360, int(height * level.render_scale))
+                if (new_w, new_h) != (battle_w, battle_h):
+                    battle_w, battle_h = new_w, new_h
+                    battlefield.rescale(battle_w, battle_h)
+                    battlefield_surface = pygame.Surface((battle_w, battle_h)).convert()
+            elif kind == "taplist":
+                ui_builder.submit(event.get("token"), event["beers"])
+                submitted.append(frame)
+
+        layer = ui_builder.poll()
+        if layer is not None:
+            if crossfade_s > 0 and toggles["draw_ui"]:
+                fade_from, fade_elapsed = ui_static, 0.0
+            ui_static, ui_rects = layer.surface, layer.rects
+            # Off the frame thread, as in run(); not part of any frame time.
+            timer.samples.setdefault("ui_build", []).append(layer.build_s * 1000.0)
+            first = submitted[0] if submitted else frame
+            for _ in range(min(layer.updates, len(submitted))):
+                submitted.popleft()
+            ui_updates.append({"f": first, "applied_f": frame, "updates": layer.updates})
+
+        frame_t0 = time.perf_counter()
+        timer.time("update", battlefield.update, timeline.dts[frame])
+        timer.time(
+            "draw", battlefield.draw, battlefield_surface,
+            draw_starfield=toggles["draw_starfield"], draw_battle=toggles["draw_battle"],
+        )
+        t0 = time.perf_counter()
+        if (battle_w, battle_h) == (width, height):
+            screen.blit(battlefield_surface, (0, 0))
+        else:
+            pygame.transform.scale(battlefield_surface, (width, height), screen)
+        t1 = time.perf_counter()
+        if toggles["draw_ui"]:
+            if fade_from is not None:
+                # Faded over recorded time, like run() over wall time.
+                fade_elapsed += timeline.dts[frame]
+                fade_t = fade_elapsed / crossfade_s
+                if fade_t < 1.0:
+                    fade_from.set_alpha(int(255 * (1.0 - fade_t)))
+                    ui_static.set_alpha(int(255 * fade_t))
+                    screen.blit(fade_from, (0, 0))
+                    screen.blit(ui_static, (0, 0))
+                else:
+                    fade_from = None
+                    ui_static.set_alpha(None)
+            if fade_from is None:
+                if colorkey and full_blit:
+                    screen.blit(ui_static, (0, 0))
+                else:
+                    for rect in ui_rects:
+                        screen.blit(ui_static, rect.topleft, rect)
+            draw_taplist_overlay(screen)
+        t2 = time.perf_counter()
+        timer.samples.setdefault("scale", []).append((t1 - t0) * 1000.0)
+        timer.samples.setdefault("ui", []).append((t2 - t1) * 1000.0)
+        timer.samples.setdefault("frame", []).append((t2 - frame_t0) * 1000.0)
+
+    ui_builder.stop()
+
+    # Diagnostic only: a recorded spawn that landed on another frame (the ship
+    # was still out, e.g. after a flag or code change moved it) shows where
+    # the replay left the recorded timeline.
+    recorded = [(e["f"], e["mode"], e["scale"]) for e in timeline.spawns if e["f"] < frames]
+    replayed = [(e["f"], e["mode"], e["scale"]) for e in spawns]
+    diverged_at = None
+    for a, b in zip_longest(recorded, replayed):
+        if a != b:
+            diverged_at = min(e[0] for e in (a, b) if e is not None)
+            break
+
+    current_flags = scene_flags(battlefield)
+    return {
+        "frames": frames,
+        "recording_complete": timeline.complete,
+        "size": [width, height],
+        "spawns": len(spawns),
+        "ui_updates": ui_updates,
+        # Bullet intervals rolled after the recorded ones ran out: the battle
+        # stayed in combat longer than it did live, so the load drifted.
+        "unscripted_bullet_intervals": battlefield.battle.unscripted_intervals,
+        "diverged_at_frame": diverged_at,
+        "flag_mismatches": sorted(k for k, v in flags.items() if current_flags.get(k) != v),
+        "stages": timer.stats(),
+    }
+
+
+def environment() -> dict:
+    return {
+        "video_driver": pygame.display.get_driver(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(str(v) for v in pygame.get_sdl_version()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless render pipeline benchmark")
+    parser.add_argument("--size", action="append", type=parse_size, help="Display WxH (repeatable, default 1920x1080)")
+    parser.add_argument("--side", default="red", choices=sorted(THEMES))
+    parser.add_argument("--render-scale", type=float, default=BATTLEFIELD_RENDER_SCALE)
+    parser.add_argument(
+        "--starfield", dest="starfields", action="append", choices=("python", "numpy", "layered"),
+        help="Starfield backend(s) (default: GK_STARFIELD_BACKEND)",
+    )
+    parser.add_argument("--mode", dest="modes", action="append", choices=SHIP_MODES, help="Ship mode(s) (default: all)")
+    parser.add_argument("--frames", type=int, default=600, help="Timed frames per per-frame stage")
+    parser.add_argument("--warmup", type=int, default=60, help="Untimed frames before each per-frame stage")
+    parser.add_argument("--ui-runs", type=int, default=20, help="Timed runs of the logo cache and taplist draw")
+    parser.add_argument("--dt", type=float, default=1.0 / 60.0, help="Fixed simulation step in seconds")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--replay", help="Re-run a scene recorded with GK_RECORD_FILE instead of the stage benchmarks")
+    parser.add_argument("--replay-frames", type=int, default=0, help="Stop the replay after this many frames (0: all)")
+    args = parser.parse_args()
+    args.render_scale = min(1.0, max(0.4, args.render_scale))
+    args.modes = args.modes or list(SHIP_MODES)
+    args.starfields = args.starfields or [STARFIELD_BACKEND]
+    sizes = args.size or [(1920, 1080)]
+
+    # Must be set before the display is initialized; an explicit setting wins.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    # Surfaces need a display format to convert() against; nothing is shown.
+    pygame.display.set_mode((1, 1))
+
+    if args.replay:
+        timeline = load_timeline(args.replay)
+        report = {
+            "config": {
+                "replay": args.replay,
+                "side": timeline.header["side"],
+                "seed": timeline.seed,
+                **environment(),
+            },
+            "replay": replay_timeline(timeline, args),
+        }
+    else:
+        theme = THEMES[args.side]
+        beers = merge_taplist_with_db(load_local_json(theme.json_path), BeerIndex(load_local_json(BEERDB_FILE)))
+        report = {
+            "config": {
+                "side": theme.name,
+                "render_scale": args.render_scale,
+                "modes": args.modes,
+                "starfields": args.starfields,
+                "frames": args.frames,
+                "warmup": args.warmup,
+                "ui_runs": args.ui_runs,
+                "dt": args.dt,
+                "seed": args.seed,
+                "beers": len(beers),
+                **environment(),
+            },
+            "resolutions": {f"{w}x{h}": run_resolution((w, h), theme, beers, args) for w, h in sizes},
+        }
+
+    pygame.font.quit()
+    pygame.display.quit()
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
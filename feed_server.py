@@ -0,0 +1,108 @@
+import argparse
+import json
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the bar server: serves the repo as static files and
+# answers php/taplist-feed.php the same way the PHP endpoint does, so the
+# change feed can be exercised without a PHP install.
+FEED_PATH = "/php/taplist-feed.php"
+FEED_MAX_WAIT_S = 30.0
+FEED_CHECK_S = 0.2
+
+
+def _db_version(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return "-"
+    return f"{int(stat.st_mtime)}-{stat.st_size}"
+
+
+def _refresh_token(path: Path) -> str:
+    try:
+        token = json.loads(path.read_text(encoding="utf-8")).get("refreshToken")
+    except Exception:
+        return ""
+    return "" if token is None else str(token)
+
+
+class FeedHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path != FEED_PATH:
+            super().do_GET()
+            return
+
+        query = parse_qs(parsed.query)
+        json_dir = Path(self.directory) / "json"
+        src = json_dir / Path(query.get("src", [""])[0]).name
+        db = json_dir / "beer-database.json"
+        if not src.is_file() or src.suffix != ".json":
+            self._send_json(404, {"error": "unknown taplist"})
+            return
+
+        token = query.get("token", [""])[0]
+        dbv = query.get("dbv", [""])[0]
+        try:
+            wait = min(FEED_MAX_WAIT_S, max(0.0, float(query.get("wait", ["20"])[0])))
+        except ValueError:
+            wait = 20.0
+
+        last_mtime = None
+        current_token = ""
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                mtime = src.stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != last_mtime:
+                current_token = _refresh_token(src)
+                last_mtime = mtime
+            current_dbv = _db_version(db)
+            if current_token != token or current_dbv != dbv:
+                self._send_json(200, {"refreshToken": current_token, "dbVersion": current_dbv})
+                return
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(FEED_CHECK_S)
+
+        self.send_response(204)
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static file server with the taplist change feed")
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--root", default=str(Path(__file__).resolve().parent))
+    args = parser.parse_args()
+
+    handler = partial(FeedHandler, directory=args.root)
+    server = ThreadingHTTPServer((args.bind, args.port), handler)
+    server.daemon_threads = True
+    print(f"[feed] serving {args.root} on {args.bind}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,36 @@
-import json
-import math
 import os
 import random
-import threading
 import time
-from collections import deque
 from pathlib import Path
 
 import pygame
 
-from systems.battle import ArcadeBattlefield
-from settings import SERVER_BASE
-from systems.fetch import fetch_meta, fetch_text, is_url
-from systems.logos import build_logo_cache
-from systems.ui import draw_taplist_overlay, draw_taplist_static
+from systems.battle import (
+    LEGACY_PARITY_MODE,
+    PI_PERF_MODE,
+    PREWARM_ROT_CACHE,
+    SIM_MAX_STEPS,
+    SMOOTH_TWINKLE,
+    STABLE_BULLET_CADENCE,
+    THRUST_PARTICLES,
+    ArcadeBattlefield,
+)
+from systems.daemon_client import DaemonSubscriber, daemon_socket_path
+from systems.fetch import REMOTE_CACHE
+from systems.framehist import FrameHistogram
+from systems.metrics import LATENCY_BOUNDS, METRICS, start_metrics_server
+from systems.poller import TaplistPoller
+from systems.quality import QualityGovernor, cap_levels, level_for_scale
+from systems.replay import SceneRecorder, beer_records
+from systems.taplist import (
+    JSON_CACHE,
+    BeerIndex,
+    load_json,
+    merge_taplist_with_db,
+    urlify,
+)
+from systems.ui import draw_taplist_overlay
+from systems.uibuilder import UiBuilder
 
 
 def _env_bool(name: str, default: bool) -> bool:
@@ -48,8 +65,27 @@ TARGET_FPS = max(0, _env_int("GK_TARGET_FPS", 60))
 TOKEN_POLL_SECONDS = max(0.2, _env_float("GK_TOKEN_POLL_SECONDS", 0.75))
 POLL_TAPLIST_TIMEOUT_S = max(0.5, _env_float("GK_POLL_TAPLIST_TIMEOUT_S", 2.0))
 POLL_BEERDB_TIMEOUT_S = max(0.5, _env_float("GK_POLL_BEERDB_TIMEOUT_S", 2.5))
+# Optional long-poll change feed (php/taplist-feed.php); polling stays the fallback.
+CHANGE_FEED = _env_bool("GK_CHANGE_FEED", False)
+FEED_URL = os.getenv("GK_FEED_URL", "php/taplist-feed.php")
+FEED_WAIT_SECONDS = min(30.0, max(1.0, _env_float("GK_FEED_WAIT_SECONDS", 20.0)))
+FEED_RETRY_SECONDS = max(1.0, _env_float("GK_FEED_RETRY_SECONDS", 60.0))
+# Treat byte-identical server JSON as the change signature (server output is canonical).
+TRUST_SERVER_JSON = _env_bool("GK_TRUST_SERVER_JSON", False)
+# Receive taplist updates from taplist_daemon.py instead of polling in-process.
+DATA_DAEMON = _env_bool("GK_DATA_DAEMON", False)
 BATTLEFIELD_RENDER_SCALE = min(1.0, max(0.4, _env_float("GK_RENDER_SCALE", 0.75)))
+# Let a governor trade render scale / stars / particles / glow for frame time at
+# runtime, starting from GK_RENDER_SCALE's level.
+ADAPTIVE_QUALITY = _env_bool("GK_ADAPTIVE_QUALITY", False)
+# Prometheus text endpoint (http://<pi>:<port>/metrics); 0 disables it.
+METRICS_PORT = max(0, _env_int("GK_METRICS_PORT", 0))
+METRICS_BIND = os.getenv("GK_METRICS_BIND", "0.0.0.0")
 PERF_LOG_FILE = os.getenv("GK_PERF_LOG_FILE", "perf.log")
+# Record the scene timeline (seed, dt, spawns, toggles, taplist updates) for
+# `bench.py --replay`; GK_SCENE_SEED pins the battlefield RNG.
+RECORD_FILE = os.getenv("GK_RECORD_FILE", "")
+SCENE_SEED = _env_int("GK_SCENE_SEED", -1)
 USE_VSYNC = _env_bool("GK_USE_VSYNC", False)
 UI_COLORKEY = (1, 0, 1)
 UI_USE_COLORKEY_CACHE = _env_bool("GK_UI_COLORKEY_CACHE", True)
@@ -65,6 +101,15 @@ UI_INFO_FONT_PATH = os.getenv(
 )
 UI_OPAQUE_PANELS = _env_bool("GK_UI_OPAQUE_PANELS", False)
 UI_FULL_BLIT = _env_bool("GK_UI_FULL_BLIT", True)
+# Crossfade from the old taplist layer to the new one; 0 swaps on the next frame.
+UI_CROSSFADE_MS = max(0, _env_int("GK_UI_CROSSFADE_MS", 0))
+# Turn bursts of editor saves into one rebuild. The first update after a quiet
+# spell is built straight away; the ones that follow it wait for this much
+# quiet (but no longer than the max delay), and rebuild at most once per min
+# interval.
+UPDATE_DEBOUNCE_S = max(0.0, _env_float("GK_UPDATE_DEBOUNCE_MS", 1000.0) / 1000.0)
+UPDATE_MAX_DELAY_S = max(0.0, _env_float("GK_UPDATE_MAX_DELAY_MS", 5000.0) / 1000.0)
+UI_MIN_REBUILD_INTERVAL_S = max(0.0, _env_float("GK_UI_MIN_REBUILD_INTERVAL_MS", 1000.0) / 1000.0)
 ALLOW_ESCAPE = _env_bool("GK_ALLOW_ESCAPE", True)
 SHOW_FPS = _env_bool("GK_SHOW_FPS", True)
 USE_BUSY_LOOP = _env_bool("GK_USE_BUSY_LOOP", True)
@@ -80,119 +125,39 @@ SIGIL = (
     "20 73 69 74 20 6E 6F 62 69 73 63 75 6D 20 73 65 6D 70 65 72 2E"
 )
 
-def urlify(path_or_url: str) -> str:
-    if is_url(path_or_url):
-        return path_or_url
-    return f"{SERVER_BASE.rstrip('/')}/{path_or_url.lstrip('./').lstrip('/')}"
-
-
-def load_json(src: str, ttl: int = 15, timeout_s: float = 10, allow_stale_on_error: bool = True):
-    if is_url(src):
-        local_path = fetch_text(src, ttl=ttl, timeout_s=timeout_s, allow_stale_on_error=allow_stale_on_error)
-        return json.loads(Path(local_path).read_text(encoding="utf-8"))
-
-    # For relative paths, prefer the server source of truth, then fall back to local file.
-    try:
-        local_path = fetch_text(urlify(src), ttl=ttl, timeout_s=timeout_s, allow_stale_on_error=allow_stale_on_error)
-        return json.loads(Path(local_path).read_text(encoding="utf-8"))
-    except Exception:
-        if not allow_stale_on_error:
-            raise
-        local = Path(src)
-        if local.exists():
-            return json.loads(local.read_text(encoding="utf-8"))
-        raise
-
-
-def merge_taplist_with_db(taplist: dict, beerdb: list[dict]) -> list[dict]:
-    db_by_id = {b["id"]: b for b in beerdb}
-    out = []
-    for slot in taplist.get("beers", []):
-        beer = db_by_id.get(slot.get("id"))
-        if not beer:
-            continue
-        entry = beer.copy()
-        entry["soldOut"] = slot.get("soldOut", False)
-        out.append(entry)
-    return out
-
-
-def taplist_signature(taplist: dict) -> str:
-    beers = taplist.get("beers", [])
-    try:
-        return json.dumps(beers, sort_keys=True, separators=(",", ":"))
-    except Exception:
-        return str(beers)
-
-
-def json_signature(data) -> str:
-    try:
-        return json.dumps(data, sort_keys=True, separators=(",", ":"))
-    except Exception:
-        return str(data)
-
-
-def source_meta(src: str, timeout_s: float):
-    if is_url(src):
-        return fetch_meta(src, timeout_s=timeout_s)
-
-    url = urlify(src)
-    meta = fetch_meta(url, timeout_s=timeout_s)
-    if meta is not None:
-        return meta
-
-    local = Path(src)
-    if not local.exists():
-        return None
-    stat = local.stat()
-    return ("", str(int(stat.st_mtime_ns)), str(stat.st_size))
+def surface_bytes(surfaces) -> int:
+    return sum(s.get_pitch() * s.get_height() for s in surfaces)
+
+
+def scene_flags(arcade_field: ArcadeBattlefield) -> dict:
+    # Settings that change what a recorded scene costs to simulate and draw.
+    return {
+        "pi_perf_mode": PI_PERF_MODE,
+        "legacy_parity_mode": LEGACY_PARITY_MODE,
+        "smooth_twinkle": SMOOTH_TWINKLE,
+        "prewarm_rot_cache": PREWARM_ROT_CACHE,
+        "stable_bullet_cadence": STABLE_BULLET_CADENCE,
+        "thrust_particles": THRUST_PARTICLES,
+        "sim_hz": arcade_field.sim_hz,
+        "sim_max_steps": SIM_MAX_STEPS,
+        "starfield": type(arcade_field.starfield).__name__,
+        "particles": type(arcade_field.battle.particles).__name__,
+        "bullets": type(arcade_field.battle.bullets).__name__,
+        "angle_step_default": arcade_field.battle.ANGLE_STEP_DEFAULT,
+        "angle_step_broken": arcade_field.battle.ANGLE_STEP_BROKEN,
+        "ui_colorkey": UI_USE_COLORKEY_CACHE,
+        "ui_full_blit": UI_FULL_BLIT,
+        "ui_opaque_panels": UI_OPAQUE_PANELS,
+        "ui_crossfade_ms": UI_CROSSFADE_MS,
+        "render_scale": BATTLEFIELD_RENDER_SCALE,
+    }
 
 
-def force_spawn_mode(arcade_field: ArcadeBattlefield, mode: str):
-    battle = arcade_field.battle
+def force_spawn_mode(arcade_field: ArcadeBattlefield, mode: str, scale=None, motion=None):
+    # Same rolls as a spawn the battle makes itself; replays pass the recorded ones.
     if mode not in ("normal", "broken", "combat"):
         return
-
-    battle.ship["active"] = True
-    battle.ship["mode"] = mode
-    battle.ship["scale"] = float(random.randint(1, 4))
-    if mode == "combat":
-        battle.alien.update(
-            {"active": True, "scale": int(battle.ship["scale"]), "frame": 0, "ticker": 0.0}
-        )
-    else:
-        battle.alien.update({"active": False, "x": -9999, "y": -9999, "frame": 0})
-
-    margin = 100
-    edge = random.randint(0, 3)
-    if edge == 0:
-        sx, sy = random.random() * battle.w, -margin
-    elif edge == 1:
-        sx, sy = battle.w + margin, random.random() * battle.h
-    elif edge == 2:
-        sx, sy = random.random() * battle.w, battle.h + margin
-    else:
-        sx, sy = -margin, random.random() * battle.h
-    battle.ship["x"], battle.ship["y"] = sx, sy
-
-    cx, cy = battle.w / 2, battle.h / 2
-    spread = min(battle.w, battle.h) * 0.25
-    tx = cx + (random.random() - 0.5) * spread
-    ty = cy + (random.random() - 0.5) * spread
-    w = battle.ship_w * battle.ship["scale"]
-    h = battle.ship_h * battle.ship["scale"]
-    dx = tx - (battle.ship["x"] + w / 2)
-    dy = ty - (battle.ship["y"] + h / 2)
-    dist = math.hypot(dx, dy) or 1.0
-    if mode == "broken":
-        base_speed = (0.8 + random.random() * 0.8) * 60.0
-    else:
-        base_speed = (2 + random.random() * 6) * 60.0
-
-    battle.ship["vx"] = dx / dist * base_speed
-    battle.ship["vy"] = dy / dist * base_speed
-    battle.ship["angle"] = math.degrees(math.atan2(battle.ship["vy"], battle.ship["vx"]))
-    battle.ship["timer"] = 0.0
+    arcade_field.battle._spawn_ship(mode, scale, motion)
 
 
 def run(theme):
@@ -212,33 +177,95 @@ def run(theme):
     width, height = screen.get_size()
     clock = pygame.time.Clock()
 
+    # Start a fresh perf log per run.
+    try:
+        Path(PERF_LOG_FILE).write_text("", encoding="utf-8")
+    except Exception:
+        pass
+
+    def log_debug(line: str):
+        print(line)
+        try:
+            with Path(PERF_LOG_FILE).open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception:
+            pass
+
     taplist = load_json(theme.json_path, ttl=0)
-    beerdb = load_json(BEERDB_FILE, ttl=0)
-    beers = merge_taplist_with_db(taplist, beerdb)
+    beer_index = BeerIndex(load_json(BEERDB_FILE, ttl=0))
+    beers = merge_taplist_with_db(taplist, beer_index)
     current_refresh_token = taplist.get("refreshToken")
-    current_taplist_sig = taplist_signature(taplist)
-    current_beerdb_sig = json_signature(beerdb)
 
-    logo_cache = build_logo_cache(beers, theme.logo_size, theme)
     battle_w = max(640, int(width * BATTLEFIELD_RENDER_SCALE))
     battle_h = max(360, int(height * BATTLEFIELD_RENDER_SCALE))
-    battlefield = ArcadeBattlefield(battle_w, battle_h, bg_color=theme.bg_color)
+    scene_seed = SCENE_SEED if SCENE_SEED >= 0 else random.randrange(1 << 32)
+    battlefield = ArcadeBattlefield(
+        battle_w, battle_h, bg_color=theme.bg_color, rng=random.Random(scene_seed)
+    )
+    recorder = None
+    if RECORD_FILE:
+        recorder = SceneRecorder(
+            RECORD_FILE,
+            {
+                "seed": scene_seed,
+                "side": theme.name,
+                "size": [width, height],
+                "battle_size": [battle_w, battle_h],
+                "flags": scene_flags(battlefield),
+                "token": current_refresh_token,
+                "beers": beer_records(beers),
+            },
+        )
+        battlefield.battle.on_spawn = lambda spawn: recorder.event("spawn", **spawn)
+        battlefield.battle.on_bullet_interval = lambda frames: recorder.event("bullets", interval=frames)
     battlefield_surface = pygame.Surface((battle_w, battle_h)).convert()
+    governor = None
+    if ADAPTIVE_QUALITY:
+        levels = cap_levels(glow=battlefield.base_glow, render_scale=BATTLEFIELD_RENDER_SCALE)
+        governor = QualityGovernor(
+            1000.0 / (TARGET_FPS if TARGET_FPS > 0 else 60),
+            levels=levels,
+            start_level=level_for_scale(BATTLEFIELD_RENDER_SCALE, levels),
+        )
+        level = governor.level
+        battlefield.apply_quality(level.star_density, level.particle_scale, level.glow, level.sim_rate)
+        if recorder is not None:
+            recorder.event("quality", level=level.name)
     debug_font = pygame.font.SysFont(None, 24)
     show_fps = SHOW_FPS
 
-    if UI_USE_COLORKEY_CACHE:
-        ui_static = pygame.Surface((width, height)).convert()
-        ui_static.set_colorkey(UI_COLORKEY, pygame.RLEACCEL)
-    else:
-        ui_static = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
-    ui_dirty = True
-    ui_rects = []
+    # Logos and the taplist layer are built off the render thread; the loop
+    # only swaps finished layers in.
+    ui_builder = UiBuilder(
+        theme,
+        (width, height),
+        log_debug,
+        {
+            "beer_font_path": UI_BEER_FONT_PATH,
+            "info_font_path": UI_INFO_FONT_PATH,
+            "header_font_path": UI_HEADER_FONT_PATH,
+            "draw_panels": UI_OPAQUE_PANELS,
+            "panel_color": tuple(max(0, c - 18) for c in theme.bg_color),
+            "panel_border": tuple(min(255, int(c * 0.55) + 30) for c in theme.accent),
+        },
+        colorkey=UI_COLORKEY if UI_USE_COLORKEY_CACHE else None,
+        debounce_s=UPDATE_DEBOUNCE_S,
+        max_delay_s=UPDATE_MAX_DELAY_S,
+        min_interval_s=UI_MIN_REBUILD_INTERVAL_S,
+    )
+    layer = ui_builder.build_now(current_refresh_token, beers)
+    logo_cache = layer.logo_cache
+    ui_static = layer.surface
+    ui_rects = layer.rects
+    fade_from = None
+    fade_started = 0.0
+    fps_text = None
     draw_starfield = True
     draw_battle = True
     draw_ui = True
     perf_logging = True
 
+    sim_report = (0, 0.0)
     perf_acc = {
         "update_ms": 0.0,
         "draw_ms": 0.0,
@@ -248,98 +275,93 @@ def run(theme):
         "frame_ms": 0.0,
         "frames": 0,
     }
-    frame_samples = deque(maxlen=240)
+    # Every frame lands in frame_hist; each report folds it into the run total.
+    frame_hist = FrameHistogram()
+    run_hist = FrameHistogram()
     last_perf_report = time.perf_counter()
 
-    # Start a fresh perf log per run.
-    try:
-        Path(PERF_LOG_FILE).write_text("", encoding="utf-8")
-    except Exception:
-        pass
-
-    def log_debug(line: str):
-        print(line)
+    stage_hist = {
+        stage: METRICS.histogram(
+            "gk_frame_stage_seconds", "Render loop time per stage, per frame.", stage=stage
+        )
+        for stage in ("update", "draw", "scale", "ui", "flip", "frame")
+    }
+    apply_hist = METRICS.histogram(
+        "gk_change_apply_seconds",
+        "From a poll publishing a new taplist to the render loop finishing the apply.",
+        LATENCY_BOUNDS,
+    )
+    METRICS.counter_fn("gk_json_cache_hits_total", "Parsed-JSON cache hits.", lambda: JSON_CACHE.hits)
+    METRICS.counter_fn("gk_json_cache_misses_total", "Parsed-JSON cache misses.", lambda: JSON_CACHE.misses)
+    METRICS.gauge_fn("gk_remote_cache_bytes", "Bytes held in the on-disk remote cache.", REMOTE_CACHE.total_bytes)
+    METRICS.gauge_fn(
+        "gk_surface_cache_bytes", "Pixel memory of cached surfaces.",
+        lambda: surface_bytes(list(logo_cache.values())), cache="logos",
+    )
+    METRICS.gauge_fn(
+        "gk_surface_cache_bytes", "Pixel memory of cached surfaces.",
+        lambda: surface_bytes(battlefield.battle.rotation_surfaces()),
+        cache="rotations",
+    )
+    METRICS.gauge_fn(
+        "gk_surface_cache_bytes", "Pixel memory of cached surfaces.",
+        lambda: surface_bytes((ui_static, battlefield_surface)), cache="frame",
+    )
+    if METRICS_PORT:
         try:
-            with Path(PERF_LOG_FILE).open("a", encoding="utf-8") as f:
-                f.write(line + "\n")
-        except Exception:
-            pass
+            start_metrics_server(METRICS_PORT, METRICS_BIND)
+        except OSError as exc:
+            print(f"[warn] metrics endpoint disabled, can't bind {METRICS_BIND}:{METRICS_PORT}: {exc}")
 
     log_debug(
         "[debug] "
         f"vsync={USE_VSYNC} target_fps={TARGET_FPS} "
-        f"render_scale={BATTLEFIELD_RENDER_SCALE:.2f} "
+        f"render_scale={BATTLEFIELD_RENDER_SCALE:.2f} adaptive_quality={ADAPTIVE_QUALITY} "
+        f"scene_seed={scene_seed} record_file={RECORD_FILE or None} "
         f"token_poll_s={TOKEN_POLL_SECONDS:.2f} "
         f"poll_taplist_timeout_s={POLL_TAPLIST_TIMEOUT_S:.2f} "
         f"poll_beerdb_timeout_s={POLL_BEERDB_TIMEOUT_S:.2f} "
+        f"change_feed={CHANGE_FEED} data_daemon={DATA_DAEMON} "
         f"taplist_src={urlify(theme.json_path)} "
         f"beerdb_src={urlify(BEERDB_FILE)} "
+        f"metrics_port={METRICS_PORT} "
         f"ui_colorkey={UI_USE_COLORKEY_CACHE} ui_full_blit={UI_FULL_BLIT} "
+        f"ui_crossfade_ms={UI_CROSSFADE_MS} "
+        f"update_debounce_s={UPDATE_DEBOUNCE_S:.2f} update_max_delay_s={UPDATE_MAX_DELAY_S:.2f} "
+        f"ui_min_rebuild_interval_s={UI_MIN_REBUILD_INTERVAL_S:.2f} "
         f"allow_escape={ALLOW_ESCAPE} show_fps={SHOW_FPS} busy_loop={USE_BUSY_LOOP}"
     )
 
-    poll_lock = threading.Lock()
-    stop_poll = threading.Event()
-    poll_state = {"pending": None}
-
-    def poll_worker():
-        cached_taplist = taplist
-        cached_beerdb = beerdb
-        last_seen_token = current_refresh_token
-        last_seen_sig = current_taplist_sig
-        last_seen_beerdb_sig = current_beerdb_sig
-        last_seen_beerdb_meta = source_meta(BEERDB_FILE, POLL_BEERDB_TIMEOUT_S)
-        poll_errors = 0
-        while not stop_poll.wait(TOKEN_POLL_SECONDS):
-            try:
-                tap_changed = False
-                beerdb_changed = False
-
-                latest_taplist = load_json(
-                    theme.json_path,
-                    ttl=0,
-                    timeout_s=POLL_TAPLIST_TIMEOUT_S,
-                    allow_stale_on_error=False,
-                )
-                latest_token = latest_taplist.get("refreshToken")
-                latest_sig = taplist_signature(latest_taplist)
-                if latest_token != last_seen_token or latest_sig != last_seen_sig:
-                    cached_taplist = latest_taplist
-                    last_seen_token = latest_token
-                    last_seen_sig = latest_sig
-                    tap_changed = True
-
-                current_beerdb_meta = source_meta(BEERDB_FILE, POLL_BEERDB_TIMEOUT_S)
-                if current_beerdb_meta is None or current_beerdb_meta != last_seen_beerdb_meta:
-                    latest_beerdb = load_json(
-                        BEERDB_FILE,
-                        ttl=0,
-                        timeout_s=POLL_BEERDB_TIMEOUT_S,
-                        allow_stale_on_error=False,
-                    )
-                    latest_beerdb_sig = json_signature(latest_beerdb)
-                    last_seen_beerdb_meta = current_beerdb_meta
-                    if latest_beerdb_sig != last_seen_beerdb_sig:
-                        cached_beerdb = latest_beerdb
-                        last_seen_beerdb_sig = latest_beerdb_sig
-                        beerdb_changed = True
-
-                if not tap_changed and not beerdb_changed:
-                    continue
-
-                merged = merge_taplist_with_db(cached_taplist, cached_beerdb)
-                with poll_lock:
-                    poll_state["pending"] = (last_seen_token, merged)
-                poll_errors = 0
-            except Exception as exc:
-                poll_errors += 1
-                if poll_errors <= 3 or poll_errors % 10 == 0:
-                    log_debug(f"[warn] poll fetch failed ({poll_errors}): {exc}")
-                # Keep rendering smooth even if network polling fails intermittently.
-                pass
-
-    poll_thread = threading.Thread(target=poll_worker, daemon=True)
-    poll_thread.start()
+    def publish_update(refresh_token, merged):
+        ui_builder.submit(refresh_token, merged, time.perf_counter())
+
+    def make_poller(publish_first=False):
+        return TaplistPoller(
+            theme.json_path,
+            BEERDB_FILE,
+            taplist,
+            beer_index,
+            publish_update,
+            log_debug,
+            poll_seconds=TOKEN_POLL_SECONDS,
+            taplist_timeout_s=POLL_TAPLIST_TIMEOUT_S,
+            beerdb_timeout_s=POLL_BEERDB_TIMEOUT_S,
+            feed_url=urlify(FEED_URL) if CHANGE_FEED else None,
+            feed_wait_s=FEED_WAIT_SECONDS,
+            feed_retry_s=FEED_RETRY_SECONDS,
+            trust_server_bytes=TRUST_SERVER_JSON,
+            publish_first=publish_first,
+        )
+
+    if DATA_DAEMON:
+        poller = DaemonSubscriber(
+            daemon_socket_path(), theme.json_path, publish_update, log_debug,
+            make_fallback=lambda: make_poller(publish_first=True),
+        )
+    else:
+        poller = make_poller()
+    ui_builder.start()
+    poller.start()
 
     running = True
     while running:
@@ -355,19 +377,31 @@ def run(theme):
                     running = False
                 elif event.key == pygame.K_c:
                     force_spawn_mode(battlefield, "combat")
+                    if recorder is not None:
+                        recorder.event("force", **battlefield.battle.spawn_state())
                 elif event.key == pygame.K_b:
                     force_spawn_mode(battlefield, "broken")
+                    if recorder is not None:
+                        recorder.event("force", **battlefield.battle.spawn_state())
                 elif event.key == pygame.K_n:
                     force_spawn_mode(battlefield, "normal")
+                    if recorder is not None:
+                        recorder.event("force", **battlefield.battle.spawn_state())
                 elif event.key == pygame.K_F1:
                     draw_starfield = not draw_starfield
                     log_debug(f"[debug] draw_starfield={draw_starfield}")
+                    if recorder is not None:
+                        recorder.event("toggle", name="draw_starfield", value=draw_starfield)
                 elif event.key == pygame.K_F2:
                     draw_battle = not draw_battle
                     log_debug(f"[debug] draw_battle={draw_battle}")
+                    if recorder is not None:
+                        recorder.event("toggle", name="draw_battle", value=draw_battle)
                 elif event.key == pygame.K_F3:
                     draw_ui = not draw_ui
                     log_debug(f"[debug] draw_ui={draw_ui}")
+                    if recorder is not None:
+                        recorder.event("toggle", name="draw_ui", value=draw_ui)
                 elif event.key == pygame.K_f:
                     show_fps = not show_fps
                     log_debug(f"[debug] show_fps={show_fps}")
@@ -375,17 +409,25 @@ def run(theme):
                     perf_logging = not perf_logging
                     log_debug(f"[debug] perf_logging={perf_logging}")
 
-        pending = None
-        with poll_lock:
-            if poll_state["pending"] is not None:
-                pending = poll_state["pending"]
-                poll_state["pending"] = None
-        if pending:
-            current_refresh_token, beers = pending
-            logo_cache = build_logo_cache(beers, theme.logo_size, theme)
-            ui_dirty = True
+        layer = ui_builder.poll()
+        if layer is not None:
+            if UI_CROSSFADE_MS > 0 and draw_ui:
+                fade_from = ui_static
+                fade_started = time.perf_counter()
+            ui_static = layer.surface
+            ui_rects = layer.rects
+            beers = layer.beers
+            logo_cache = layer.logo_cache
+            current_refresh_token = layer.refresh_token
+            if layer.published_at is not None:
+                apply_hist.observe(time.perf_counter() - layer.published_at)
+            if recorder is not None:
+                recorder.taplist(current_refresh_token, beers)
+            diff = layer.diff or {"layout": True, "slots": {}}
             log_debug(
-                f"[update] taplist change applied refreshToken={current_refresh_token!r} items={len(beers)}"
+                f"[update] taplist change applied refreshToken={current_refresh_token!r} items={len(beers)} "
+                f"layout={diff['layout']} slots={sorted(diff['slots'].items())} "
+                f"updates={layer.updates} build={layer.build_s * 1000.0:.1f}ms"
             )
 
         frame_t0 = time.perf_counter()
@@ -393,27 +435,6 @@ def run(theme):
         battlefield.update(dt)
         t1 = time.perf_counter()
 
-        if ui_dirty:
-            if UI_USE_COLORKEY_CACHE:
-                ui_static.fill(UI_COLORKEY)
-            else:
-                ui_static.fill((0, 0, 0, 0))
-            ui_rects = draw_taplist_static(
-                ui_static,
-                beers,
-                logo_cache,
-                theme,
-                width,
-                height,
-                beer_font_path=UI_BEER_FONT_PATH,
-                info_font_path=UI_INFO_FONT_PATH,
-                header_font_path=UI_HEADER_FONT_PATH,
-                draw_panels=UI_OPAQUE_PANELS,
-                panel_color=tuple(max(0, c - 18) for c in theme.bg_color),
-                panel_border=tuple(min(255, int(c * 0.55) + 30) for c in theme.accent),
-            )
-            ui_dirty = False
-
         battlefield.draw(
             battlefield_surface,
             draw_starfield=draw_starfield,
@@ -426,16 +447,33 @@ def run(theme):
             pygame.transform.scale(battlefield_surface, (width, height), screen)
         t3 = time.perf_counter()
         if draw_ui:
-            if UI_USE_COLORKEY_CACHE and UI_FULL_BLIT:
-                screen.blit(ui_static, (0, 0))
-            else:
-                for rect in ui_rects:
-                    screen.blit(ui_static, rect.topleft, rect)
+            if fade_from is not None:
+                fade_t = (t3 - fade_started) * 1000.0 / UI_CROSSFADE_MS
+                if fade_t < 1.0:
+                    fade_from.set_alpha(int(255 * (1.0 - fade_t)))
+                    ui_static.set_alpha(int(255 * fade_t))
+                    screen.blit(fade_from, (0, 0))
+                    screen.blit(ui_static, (0, 0))
+                else:
+                    fade_from = None
+                    ui_static.set_alpha(None)
+            if fade_from is None:
+                if UI_USE_COLORKEY_CACHE and UI_FULL_BLIT:
+                    screen.blit(ui_static, (0, 0))
+                else:
+                    for rect in ui_rects:
+                        screen.blit(ui_static, rect.topleft, rect)
             draw_taplist_overlay(screen)
 
         if show_fps:
-            fps_text = debug_font.render(f"{clock.get_fps():.1f} FPS", True, (120, 255, 120))
-            screen.blit(fps_text, (10, 8))
+            # Fonts aren't thread-safe; while a layer is being built, keep the last text.
+            if ui_builder.font_lock.acquire(blocking=False):
+                try:
+                    fps_text = debug_font.render(f"{clock.get_fps():.1f} FPS", True, (120, 255, 120))
+                finally:
+                    ui_builder.font_lock.release()
+            if fps_text is not None:
+                screen.blit(fps_text, (10, 8))
         t4 = time.perf_counter()
         pygame.display.flip()
         t5 = time.perf_counter()
@@ -448,30 +486,84 @@ def run(theme):
         frame_ms = (t5 - frame_t0) * 1000.0
         perf_acc["frame_ms"] += frame_ms
         perf_acc["frames"] += 1
-        frame_samples.append(frame_ms)
+        frame_hist.record(frame_ms)
+        stage_hist["update"].observe(t1 - t0)
+        stage_hist["draw"].observe(t2 - t1)
+        stage_hist["scale"].observe(t3 - t2)
+        stage_hist["ui"].observe(t4 - t3)
+        stage_hist["flip"].observe(t5 - t4)
+        stage_hist["frame"].observe(t5 - frame_t0)
+        if recorder is not None:
+            recorder.frame_done(dt)
 
         now = time.perf_counter()
+        if governor is not None:
+            governor.observe(frame_ms)
+            level = governor.update(now)
+            if level is not None:
+                battlefield.apply_quality(level.star_density, level.particle_scale, level.glow, level.sim_rate)
+                new_w = max(640, int(width * level.render_scale))
+                new_h = max(360, int(height * level.render_scale))
+                if (new_w, new_h) != (battle_w, battle_h):
+                    battle_w, battle_h = new_w, new_h
+                    battlefield.rescale(battle_w, battle_h)
+                    battlefield_surface = pygame.Surface((battle_w, battle_h)).convert()
+                if recorder is not None:
+                    recorder.event("quality", level=level.name)
+                log_debug(
+                    f"[quality] level={level.name} p95={governor.p95:.2f}ms "
+                    f"budget={governor.budget_ms:.2f}ms render={battle_w}x{battle_h}"
+                )
         if perf_logging and (now - last_perf_report) >= 2.0 and perf_acc["frames"] > 0:
             n = perf_acc["frames"]
-            sorted_samples = sorted(frame_samples)
-            p95 = sorted_samples[int(len(sorted_samples) * 0.95)] if sorted_samples else 0.0
-            p99 = sorted_samples[int(len(sorted_samples) * 0.99)] if sorted_samples else 0.0
+            json_stats = JSON_CACHE.stats()
+            p95 = frame_hist.percentile(0.95)
+            p99 = frame_hist.percentile(0.99)
+            sim_text = ""
+            sim = battlefield.sim
+            if sim is not None:
+                sim_text = (
+                    f"sim_hz={sim.hz:.0f} sim_steps={(sim.steps - sim_report[0]) / n:.2f} "
+                    f"sim_dropped={(sim.dropped_s - sim_report[1]) * 1000.0:.0f}ms "
+                )
+                sim_report = (sim.steps, sim.dropped_s)
             log_debug(
                 "[perf] "
                 f"fps={clock.get_fps():.1f} "
                 f"frame={perf_acc['frame_ms']/n:.2f}ms "
                 f"p95={p95:.2f}ms "
                 f"p99={p99:.2f}ms "
+                f"max={frame_hist.max_seen_ms:.2f}ms "
                 f"update={perf_acc['update_ms']/n:.2f}ms "
                 f"draw={perf_acc['draw_ms']/n:.2f}ms "
                 f"scale={perf_acc['scale_ms']/n:.2f}ms "
                 f"ui={perf_acc['ui_ms']/n:.2f}ms "
-                f"flip={perf_acc['flip_ms']/n:.2f}ms"
+                f"flip={perf_acc['flip_ms']/n:.2f}ms "
+                f"{sim_text}"
+                f"json_cache_hits={json_stats['hits']} json_cache_misses={json_stats['misses']}"
             )
             for k in perf_acc:
                 perf_acc[k] = 0.0 if k != "frames" else 0
+            run_hist.merge(frame_hist)
+            frame_hist.reset()
             last_perf_report = now
 
-    stop_poll.set()
+    poller.stop()
+    ui_builder.stop()
+    if recorder is not None:
+        recorder.close()
+    run_hist.merge(frame_hist)
+    if run_hist.count:
+        summary = run_hist.summary()
+        log_debug(
+            "[perf] run "
+            f"frames={summary['count']} "
+            f"frame={summary['mean_ms']:.2f}ms "
+            f"p50={summary['p50_ms']:.2f}ms "
+            f"p95={summary['p95_ms']:.2f}ms "
+            f"p99={summary['p99_ms']:.2f}ms "
+            f"p99.9={summary['p99.9_ms']:.2f}ms "
+            f"max={summary['max_ms']:.2f}ms"
+        )
     pygame.font.quit()
     pygame.display.quit()
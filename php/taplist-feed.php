@@ -0,0 +1,65 @@
+<?php
+// Long-poll change feed for the taplist displays.
+// GET ?src=red-beers.json&token=<refreshToken>&dbv=<dbVersion>&wait=20
+// Answers as soon as the taplist refreshToken or the beer DB version differs
+// from what the client already has, or with `null` once `wait` seconds pass
+// quietly. While waiting it sends a space about once a second: PHP only
+// notices a client that went away when it writes, and without that a
+// dropped display would hold a worker for the whole wait.
+// Note: `php -S` handles one request at a time unless PHP_CLI_SERVER_WORKERS
+// is set, so give the built-in server a few workers when using this.
+header('Content-Type: application/json');
+header('Cache-Control: no-store');
+
+$jsonDir = realpath(__DIR__ . '/../json');
+$src = $jsonDir . '/' . basename($_GET['src'] ?? '');
+$db = $jsonDir . '/beer-database.json';
+if (!is_file($src) || substr($src, -5) !== '.json') {
+    http_response_code(404);
+    echo json_encode(['error' => 'unknown taplist']);
+    exit;
+}
+
+$token = (string)($_GET['token'] ?? '');
+$dbv = (string)($_GET['dbv'] ?? '');
+$wait = min(30.0, max(0.0, floatval($_GET['wait'] ?? 20)));
+set_time_limit((int)ceil($wait) + 10);
+ignore_user_abort(false);
+while (ob_get_level() > 0) {
+    ob_end_flush();
+}
+
+$lastMtime = null;
+$currentToken = '';
+$deadline = microtime(true) + $wait;
+$nextBeat = microtime(true) + 1.0;
+do {
+    clearstatcache();
+    $mtime = @filemtime($src);
+    if ($mtime !== $lastMtime) {
+        // Only re-read the taplist when the file actually changed on disk.
+        $data = json_decode((string)@file_get_contents($src), true);
+        $currentToken = (string)($data['refreshToken'] ?? '');
+        $lastMtime = $mtime;
+    }
+    $currentDbv = @filemtime($db) . '-' . @filesize($db);
+
+    if ($currentToken !== $token || $currentDbv !== $dbv) {
+        echo json_encode(['refreshToken' => $currentToken, 'dbVersion' => $currentDbv]);
+        exit;
+    }
+    usleep(200000);
+    if (microtime(true) >= $nextBeat) {
+        // Leading whitespace is still valid JSON for the client.
+        echo ' ';
+        flush();
+        $nextBeat += 1.0;
+    }
+} while (microtime(true) < $deadline && !connection_aborted());
+
+if (headers_sent()) {
+    echo 'null';
+} else {
+    http_response_code(204);
+}
+?>
@@ -9,6 +9,19 @@ import random
 
 import pygame
 
+from systems.fixedstep import FixedStep
+from systems.spriteasset import load_indexed_sprite
+from systems.spriteatlas import (
+    RotationAtlas,
+    atlas_key,
+    blit_rotation,
+    canonical_angle,
+    crop_sprite,
+    derive_rotation,
+    rotation_entry,
+    sprite_mirror,
+)
+
 
 def _env_bool(name: str, default: bool) -> bool:
     raw = os.getenv(name)
@@ -26,6 +39,16 @@ def _env_int(name: str, default: int) -> int:
     except Exception:
         return default
 
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw.strip())
+    except Exception:
+        return default
+
 # Pi-focused defaults: keep the look, cut expensive per-frame blending.
 PI_PERF_MODE = _env_bool("GK_PI_PERF_MODE", False)
 # When True, prefer matching legacy JS behavior over Pi-oriented shortcuts.
@@ -38,6 +61,24 @@ PREWARM_ROT_CACHE = _env_bool("GK_PREWARM_ROT_CACHE", True)
 STABLE_BULLET_CADENCE = _env_bool("GK_STABLE_BULLET_CADENCE", True)
 # Optional hard override for per-frame thrust particle spawn.
 THRUST_PARTICLES = max(0, _env_int("GK_THRUST_PARTICLES", 0))
+# "numpy" selects the array-based starfield in systems/npstarfield.py,
+# "layered" the one with cached far stars in systems/layeredstarfield.py.
+STARFIELD_BACKEND = os.getenv("GK_STARFIELD_BACKEND", "python").strip().lower()
+# Layered starfield: stars deeper than this fraction of the width are drawn
+# from a cached layer, refreshed before any of them can drift this many pixels.
+STAR_FAR_DEPTH = min(1.0, max(0.1, _env_float("GK_STAR_FAR_DEPTH", 0.5)))
+STAR_FAR_PX = max(0.05, _env_float("GK_STAR_FAR_PX", 1.0))
+# Exhaust particle store: "numpy" (arrays + stamp blits, systems/particles.py)
+# or "python" (one dict per particle). numpy falls back to python if missing.
+PARTICLE_BACKEND = os.getenv("GK_PARTICLE_BACKEND", "numpy").strip().lower()
+# Bullet pool: "numpy" (ring of arrays, systems/bullets.py) or "python".
+BULLET_BACKEND = os.getenv("GK_BULLET_BACKEND", "numpy").strip().lower()
+# Where the prewarmed rotation atlas is kept between starts ("" disables it).
+SPRITE_CACHE_DIR = os.getenv("GK_SPRITE_CACHE_DIR", ".cache_sprites").strip()
+# Battlefield simulation rate in steps per second (0 = one variable-length
+# step per frame, the old behaviour), and the most catch-up steps per frame.
+SIM_HZ = max(0, _env_int("GK_SIM_HZ", 60))
+SIM_MAX_STEPS = max(1, _env_int("GK_SIM_MAX_STEPS", 5))
 
 # ---------- helpers ----------
 def clamp(v, lo, hi): return lo if v < lo else hi if v > hi else v
@@ -65,13 +106,152 @@ def draw_pixel_trail(screen, color, x0, y0, x1, y1, size):
         py = int(round(y0 + dy * t)) - size // 2
         draw_pixel_block(screen, color, px, py, size)
 
+# ---------- EXHAUST PARTICLES ----------
+class ListParticles:
+    # Pure-Python particle store, one dict per particle; same interface as
+    # systems.particles.ArrayParticles.
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, x, y, vx, vy, r):
+        if len(self.items) < self.capacity:
+            self.items.append({"x": x, "y": y, "vx": vx, "vy": vy, "r": r, "a": 1.0})
+
+    def update(self, dt, w, h, decay, fade, margin):
+        keep = []
+        for p in self.items:
+            p["x"] += p["vx"] * dt; p["y"] += p["vy"] * dt
+            p["r"] *= decay
+            p["a"] -= fade
+            if (
+                p["a"] > 0
+                and -margin <= p["x"] <= w + margin
+                and -margin <= p["y"] <= h + margin
+            ):
+                keep.append(p)
+        self.items = keep
+
+    def truncate(self, count):
+        if len(self.items) > count:
+            self.items = self.items[-count:]
+
+    def rescale(self, fx, fy):
+        for p in self.items:
+            p["x"] *= fx; p["y"] *= fy
+
+    def draw(self, screen, w, h, glow):
+        # Pixel exhaust: stepped square trail + square core blocks.
+        for p in self.items:
+            x, y = int(p["x"]), int(p["y"])
+            if x < -16 or x > w + 16 or y < -16 or y > h + 16:
+                continue
+            a = clamp(p["a"], 0.0, 1.0)
+            r_core = max(1, int(p["r"]))
+            trail_len = max(2, min(20, int((abs(p["vx"]) + abs(p["vy"])) * 0.55 + r_core)))
+            tx = int(p["x"] - p["vx"] * trail_len * 0.85)
+            ty = int(p["y"] - p["vy"] * trail_len * 0.85)
+            if not glow:
+                trail = (int(40 * a), int(120 * a), int(220 * a))
+                core = (int(150 * a), int(230 * a), int(255 * a))
+                trail_size = max(1, r_core // 2)
+                draw_pixel_trail(screen, trail, x, y, tx, ty, trail_size)
+                draw_pixel_block(screen, core, x - r_core // 2, y - r_core // 2, r_core)
+            else:
+                r_halo = max(r_core + 1, int(p["r"] * 1.8))
+                outer = (int(20 * a), int(90 * a), int(220 * a))
+                core = (int(170 * a), int(235 * a), int(255 * a))
+                hot = (int(255 * a), int(255 * a), int(220 * a))
+                trail_size = max(1, r_core // 2)
+                draw_pixel_trail(screen, outer, x, y, tx, ty, trail_size)
+                draw_pixel_block(screen, outer, x - r_halo // 2, y - r_halo // 2, r_halo)
+                draw_pixel_block(screen, core, x - r_core // 2, y - r_core // 2, r_core)
+                hot_size = max(1, r_core // 2)
+                draw_pixel_block(screen, hot, x - hot_size // 2, y - hot_size // 2, hot_size)
+
+
+def make_particles(capacity, backend=None):
+    backend = backend or PARTICLE_BACKEND
+    if backend == "numpy":
+        try:
+            from systems.particles import ArrayParticles
+        except ImportError as exc:
+            print(f"[warn] numpy particles unavailable, using the python ones: {exc}")
+        else:
+            return ArrayParticles(capacity)
+    return ListParticles(capacity)
+
+# ---------- BULLETS ----------
+class ListBullets:
+    # Pure-Python bullet pool, one dict per bullet; same interface as
+    # systems.bullets.ArrayBullets.
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, x, y, vx, vy, r, life):
+        self.items.append({"x": x, "y": y, "vx": vx, "vy": vy, "r": r, "life": life})
+        if len(self.items) > self.capacity:
+            self.items = self.items[-self.capacity:]
+
+    def update(self, dt, w, h, margin):
+        keep = []
+        for b in self.items:
+            b["x"] += b["vx"] * dt; b["y"] += b["vy"] * dt
+            b["life"] -= dt * 60.0
+            x, y = b["x"], b["y"]
+            # Off screen and flying away: it will never be drawn again.
+            if (
+                (x < -margin and b["vx"] <= 0) or (x > w + margin and b["vx"] >= 0)
+                or (y < -margin and b["vy"] <= 0) or (y > h + margin and b["vy"] >= 0)
+            ):
+                continue
+            if b["life"] > 0:
+                keep.append(b)
+        self.items = keep
+
+    def rescale(self, fx, fy):
+        for b in self.items:
+            b["x"] *= fx; b["y"] *= fy
+            b["vx"] *= fx; b["vy"] *= fy
+
+    def draw(self, screen, w, h, lag=0.0):
+        for b in self.items:
+            bx, by = int(b["x"] - b["vx"] * lag), int(b["y"] - b["vy"] * lag)
+            if bx < -4 or bx > w + 4 or by < -4 or by > h + 4:
+                continue
+            pygame.draw.circle(screen, (255, 255, 255), (bx, by), max(1, int(b["r"])), 0)
+
+
+def make_bullets(capacity, backend=None):
+    backend = backend or BULLET_BACKEND
+    if backend == "numpy":
+        try:
+            from systems.bullets import ArrayBullets
+        except ImportError as exc:
+            print(f"[warn] numpy bullets unavailable, using the python ones: {exc}")
+        else:
+            return ArrayBullets(capacity)
+    return ListBullets(capacity)
+
 # ---------- STARFIELD (layers, drift, opacity jitter) ----------
 class JSStarfield:
-    def __init__(self, w, h, bg_color=(0,0,0)):
+    def __init__(self, w, h, bg_color=(0,0,0), rng=None):
         self.w, self.h = w, h
         self.bg = bg_color
+        # Pass a seeded random.Random to make the field reproducible.
+        self.rng = rng if rng is not None else random
         self.time = 0.0
         self.perf_mode = PI_PERF_MODE and not LEGACY_PARITY_MODE
+        # Runtime quality knobs (see systems/quality.py).
+        self.density = 1.0
+        self.glow = not self.perf_mode
         self.layers = self._gen_layers()
         self.stars = self._init_stars()
         # Speeds/amounts taken from your JS:
@@ -97,21 +277,27 @@ class JSStarfield:
             {"count":125, "zmin":w*0.1,  "zmax":w*0.4,  "color":hex_to_rgb("#e7abc2"), "blur":False},
         ]
 
+    def _layer_count(self, L):
+        return max(1, int(round(L["count"] * self.density)))
+
+    def _new_star(self, L):
+        z = self.rng.random() * (L["zmax"] - L["zmin"]) + L["zmin"]
+        return {
+            "x": self.rng.random() * self.w,
+            "y": self.rng.random() * self.h,
+            "z": z,
+            "o": self.rng.random(),   # opacity jitter 0..1 (clamped in update)
+            "ov": (self.rng.random() * 1.2) - 0.6,  # twinkle velocity
+            "col": L["color"],
+            "blur": L["blur"],
+            "layer": L,
+        }
+
     def _init_stars(self):
         stars = []
         for L in self.layers:
-            for _ in range(L["count"]):
-                z = random.random() * (L["zmax"] - L["zmin"]) + L["zmin"]
-                stars.append({
-                    "x": random.random() * self.w,
-                    "y": random.random() * self.h,
-                    "z": z,
-                    "o": random.random(),   # opacity jitter 0..1 (clamped in update)
-                    "ov": (random.random() * 1.2) - 0.6,  # twinkle velocity
-                    "col": L["color"],
-                    "blur": L["blur"],
-                    "layer": L,
-                })
+            for _ in range(self._layer_count(L)):
+                stars.append(self._new_star(L))
         return stars
 
     def resize(self, w, h):
@@ -119,20 +305,49 @@ class JSStarfield:
         self.layers = self._gen_layers()
         self.stars  = self._init_stars()
 
+    def rescale(self, w, h):
+        # Resize without restarting the field: stars keep their place on screen.
+        fx, fy = w / self.w, h / self.h
+        self.w, self.h = w, h
+        for L in self.layers:
+            L["zmin"] *= fx
+            L["zmax"] *= fx
+        for s in self.stars:
+            s["x"] *= fx
+            s["y"] *= fy
+            s["z"] *= fx
+
+    def set_density(self, density):
+        # Thin out or top up each layer in place; surviving stars don't jump.
+        self.density = clamp(density, 0.05, 1.0)
+        by_layer = {id(L): [] for L in self.layers}
+        for s in self.stars:
+            by_layer[id(s["layer"])].append(s)
+        stars = []
+        for L in self.layers:
+            keep = by_layer[id(L)][:self._layer_count(L)]
+            while len(keep) < self._layer_count(L):
+                keep.append(self._new_star(L))
+            stars.extend(keep)
+        self.stars = stars
+
     def update(self, dt):
         self.time += dt
-        for s in self.stars:
+        self._update_stars(self.stars, dt)
+
+    def _update_stars(self, stars, dt):
+        for s in stars:
             s["z"] -= self.STAR_SPEED * dt
             if s["z"] <= 0:
                 L = s["layer"]
-                s["z"] = random.random() * (L["zmax"] - L["zmin"]) + L["zmin"]
-                s["x"] = random.random() * self.w
-                s["y"] = random.random() * self.h
-                s["ov"] = (random.random() * 1.2) - 0.6
+                s["z"] = self.rng.random() * (L["zmax"] - L["zmin"]) + L["zmin"]
+                s["x"] = self.rng.random() * self.w
+                s["y"] = self.rng.random() * self.h
+                s["ov"] = (self.rng.random() * 1.2) - 0.6
 
             if LEGACY_PARITY_MODE and not SMOOTH_TWINKLE:
                 # Match JS twinkle jitter.
-                s["o"] += (random.random() - 0.5) * 0.05 * dt * 60.0
+                s["o"] += (self.rng.random() - 0.5) * 0.05 * dt * 60.0
                 s["o"] = clamp(s["o"], 0.1, 1.0)
             else:
                 # Smooth twinkle without per-frame RNG calls.
@@ -144,26 +359,35 @@ class JSStarfield:
                     s["o"] = 1.0
                     s["ov"] = -abs(s["ov"])
 
-    def draw(self, screen):
-        screen.fill(self.bg)
+    def _center(self, t):
         # drifting projection center
         centerX = (
             self.w / 2
-            + math.sin(self.time * self.DRIFT_SPEED_X) * self.w * self.DRIFT_AMOUNT_X
-            + math.sin(self.time * self.DRIFT_SPEED_Y * 0.63 + 1.2) * self.w * 0.05
+            + math.sin(t * self.DRIFT_SPEED_X) * self.w * self.DRIFT_AMOUNT_X
+            + math.sin(t * self.DRIFT_SPEED_Y * 0.63 + 1.2) * self.w * 0.05
         )
         centerY = (
             self.h / 2
-            + math.cos(self.time * self.DRIFT_SPEED_Y) * self.h * self.DRIFT_AMOUNT_Y
-            + math.sin(self.time * self.DRIFT_SPEED_X * 0.77 + 0.4) * self.h * 0.04
+            + math.cos(t * self.DRIFT_SPEED_Y) * self.h * self.DRIFT_AMOUNT_Y
+            + math.sin(t * self.DRIFT_SPEED_X * 0.77 + 0.4) * self.h * 0.04
         )
+        return centerX, centerY
 
-        for s in self.stars:
+    def draw(self, screen, lag=0.0):
+        # lag: seconds to draw behind the last update (see ArcadeBattlefield).
+        screen.fill(self.bg)
+        centerX, centerY = self._center(self.time - lag)
+        self._draw_stars(screen, self.stars, centerX, centerY, self.STAR_SPEED * lag)
+
+    def _draw_stars(self, screen, stars, centerX, centerY, back=0.0):
+        # back: how far to push stars away again (drawing behind the last update).
+        for s in stars:
             # perspective projection
-            k  = 128.0 / s["z"]
+            z  = s["z"] + back
+            k  = 128.0 / z
             px = (s["x"] - centerX) * k + centerX
             py = (s["y"] - centerY) * k + centerY
-            size = max(1, int((1.0 - s["z"]/self.w) * 2))
+            size = max(1, int((1.0 - z/self.w) * 2))
 
             r, g, b = s["col"]
             # Pi perf: avoid alpha circles on display surface; emulate twinkle via brightness.
@@ -174,7 +398,7 @@ class JSStarfield:
                 int(b * bright),
             )
 
-            if (not self.perf_mode) and s["blur"]:
+            if self.glow and s["blur"]:
                 # Approximate JS glow with a larger soft ring.
                 glow = (
                     min(255, int(r * 0.45)),
@@ -186,38 +410,30 @@ class JSStarfield:
 
 # ---------- BATTLE (ship/alien/bullets/exhaust) ----------
 class JSBattle:
-    def __init__(self, w, h):
+    def __init__(self, w, h, rng=None):
         self.w, self.h = w, h
-
-        # Ship sprite (15x15), 1 = white pixel
+        self.rng = rng if rng is not None else random
+        # Called as on_spawn(spawn) with spawn_state() whenever the battle
+        # spawns a ship itself, and as on_bullet_interval(frames) whenever the
+        # RNG picks the wait before the next combat shot.
+        self.on_spawn = None
+        self.on_bullet_interval = None
+        # Replays set these to deques of recorded spawns / intervals, which
+        # then take the place of the RNG rolls (see bench.py --replay).
+        self.scripted_spawns = None
+        self.scripted_intervals = None
+        # RNG rolls made after scripted_intervals ran out.
+        self.unscripted_intervals = 0
+        # update() calls so far; spawns are recorded against it.
+        self.steps = 0
+
+        # Sprites are palette-indexed PNGs in sprites/ (index 0 = empty).
         self.pixel_size = 2
-        self.sprite = [
-            [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-            [0,0,1,1,1,1,0,0,0,0,0,0,0,0,0],
-            [0,0,0,1,1,0,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,1,1,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,1,1,1,1,0,0,0,0,0,0,0],
-            [0,0,1,1,1,1,1,1,1,1,1,1,1,0,0],
-            [0,0,0,0,1,1,1,1,0,0,0,0,0,0,0],
-            [0,0,0,0,1,1,0,0,0,0,0,0,0,0,0],
-            [0,0,0,1,1,0,0,0,0,0,0,0,0,0,0],
-            [0,0,1,1,1,1,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],
-        ]
-        self.ship_w = len(self.sprite[0]) * self.pixel_size
-        self.ship_h = len(self.sprite)    * self.pixel_size
-
-        # prerender ship to offscreen (white pixels)
-        self.ship_base = pygame.Surface((self.ship_w, self.ship_h), pygame.SRCALPHA).convert_alpha()
-        for r, row in enumerate(self.sprite):
-            for c, v in enumerate(row):
-                if v:
-                    pygame.draw.rect(self.ship_base, (255,255,255,255),
-                                     (c*self.pixel_size, r*self.pixel_size, self.pixel_size, self.pixel_size))
+        self.ship_sprite = load_indexed_sprite("battle-ship")
+        self.sprite = self.ship_sprite.frames[0]
+        self.ship_w = self.ship_sprite.width * self.pixel_size
+        self.ship_h = self.ship_sprite.height * self.pixel_size
+        self.ship_base = self.ship_sprite.scaled(0, self.pixel_size)
 
         self.ship = {
             "x":0.0, "y":0.0, "vx":0.0, "vy":0.0,
@@ -225,31 +441,43 @@ class JSBattle:
             "scale":1.0, "mode":"normal"   # 'normal' | 'broken' | 'combat'
         }
 
-        # Alien frames (2 frames; colors preserved)
-        self.alien_frames = self._build_alien_frames()
+        # Alien: two 15x15 animation frames side by side.
+        self.alien_sprite = load_indexed_sprite("battle-alien", frame_width=15)
+        self.alien_frames = self.alien_sprite.frames
         self.alien = {"active":False, "x":-9999, "y":-9999, "vx":0.0, "vy":0.0,
                       "angle":0.0, "scale":1, "frame":0, "ticker":0.0}
         self.alien_animation_speed = 30.0  # frames (scaled by 60)
 
         # Combat toys
-        self.bullets = []
         self.bullet_timer = 0.0
         self.next_bullet_interval = 20    # frames (scaled by 60)
-        self.particles = []
 
         # ---------- CRISP RENDERING CACHES ----------
         self.ship_scaled = {}           # {scale_int: Surface} nearest-neighbor
-        self.ship_rot_cache = {}        # {(scale_int, ang_deg): Surface}
+        self.ship_rot_cache = {}        # {(scale_int, ang_deg): (Surface, dx, dy)}
         self.alien_scaled = {}          # {(scale_int, frame): Surface}
-        self.alien_rot_cache = {}       # {(scale_int, frame, ang_deg): Surface}
+        self.alien_rot_cache = {}       # {(scale_int, frame, ang_deg): (Surface, dx, dy)}
+        self.rot_atlas = None           # RotationAtlas backing prewarmed entries
+        self.derived_rot_cache = {}     # flipped/turned views of cached rotations
+        self.DERIVED_ROT_CACHE_SIZE = 64
+        # Sprites that mirror onto themselves only need 0-45 degrees rotated.
+        self.ship_mirror = sprite_mirror(self.sprite)
+        self.alien_mirror = [sprite_mirror(fr) for fr in self.alien_frames]
         default_angle_step = 1 if LEGACY_PARITY_MODE else (6 if PI_PERF_MODE else 3)
         self.ANGLE_STEP_DEFAULT = max(1, _env_int("GK_ANGLE_STEP_DEFAULT", default_angle_step))
         # Broken mode needs smoother spin to avoid "chunky" motion.
         broken_angle_step = 1 if LEGACY_PARITY_MODE else (2 if PI_PERF_MODE else 1)
         self.ANGLE_STEP_BROKEN = max(1, _env_int("GK_ANGLE_STEP_BROKEN", broken_angle_step))
         self.max_particles = 1600 if LEGACY_PARITY_MODE else (140 if PI_PERF_MODE else 600)
+        self.base_max_particles = self.max_particles
+        self.particles = make_particles(self.base_max_particles)
+        # Halo blocks around exhaust particles; the quality governor may drop them.
+        self.particle_glow = not (PI_PERF_MODE and not LEGACY_PARITY_MODE)
         self.max_bullets = 800 if LEGACY_PARITY_MODE else (80 if PI_PERF_MODE else 300)
-        if PREWARM_ROT_CACHE and (PI_PERF_MODE or not LEGACY_PARITY_MODE):
+        self.bullets = make_bullets(self.max_bullets)
+        # Legacy mode used to skip this (too slow at 1-degree steps); the atlas
+        # makes every start after the first a single image load.
+        if PREWARM_ROT_CACHE:
             self._prewarm_caches()
 
     # ---- crisp helpers ----
@@ -261,90 +489,137 @@ class JSBattle:
         return int(round(ang / step)) * step
 
 
+    # Rotation cache values are (surface, dx, dy): blit at the sprite's
+    # center + (dx, dy) via blit_rotation. The caches hold canonical angles
+    # only (see systems/spriteatlas.py); other angles are derived by flips and
+    # quarter turns and kept in a small most-recently-used table.
+    def _ship_scaled_base(self, s):
+        if s not in self.ship_scaled:
+            self.ship_scaled[s] = self.ship_sprite.scaled(0, s * self.pixel_size)
+        return self.ship_scaled[s]
+
+    def _alien_scaled_base(self, s, frame):
+        key_scaled = (s, frame)
+        if key_scaled not in self.alien_scaled:
+            self.alien_scaled[key_scaled] = self.alien_sprite.scaled(frame, s * self.pixel_size)
+        return self.alien_scaled[key_scaled]
+
+    def _rotation(self, cache, key, mirror, ang, base_fn):
+        canon, turns, flip = canonical_angle(ang, mirror is not None)
+        entry = cache.get(key + (canon,))
+        if entry is None:
+            entry = rotation_entry(pygame.transform.rotate(base_fn(), -canon))
+            cache[key + (canon,)] = entry
+        if not turns and not flip:
+            return entry
+        derived_key = (id(cache),) + key + (ang,)
+        derived = self.derived_rot_cache.pop(derived_key, None)
+        if derived is None:
+            derived = derive_rotation(entry, turns, mirror if flip else None)
+            if len(self.derived_rot_cache) >= self.DERIVED_ROT_CACHE_SIZE:
+                self.derived_rot_cache.pop(next(iter(self.derived_rot_cache)))
+        self.derived_rot_cache[derived_key] = derived
+        return derived
+
+    def _ship_rotation(self, s, ang):
+        return self._rotation(self.ship_rot_cache, (s,), self.ship_mirror, ang,
+                              lambda: self._ship_scaled_base(s))
+
+    def _alien_rotation(self, s, frame, ang):
+        return self._rotation(self.alien_rot_cache, (s, frame), self.alien_mirror[frame], ang,
+                              lambda: self._alien_scaled_base(s, frame))
+
     def _get_ship_surface_crisp(self, scale, angle_deg):
         s = max(1, int(round(scale)))
-        if s not in self.ship_scaled:
-            self.ship_scaled[s] = pygame.transform.scale(
-                self.ship_base, (self.ship_w * s, self.ship_h * s)
-            )
-        ang = self._quant_angle(angle_deg) % 360
-        key = (s, ang)
-        surf = self.ship_rot_cache.get(key)
-        if surf is None:
-            surf = pygame.transform.rotate(self.ship_scaled[s], -ang)
-            self.ship_rot_cache[key] = surf
-        return surf
+        return self._ship_rotation(s, self._quant_angle(angle_deg) % 360)
 
     def _get_alien_surface_crisp(self, scale, frame, angle_deg):
         s = max(1, int(round(scale)))
-        key_scaled = (s, frame)
-        base = self.alien_scaled.get(key_scaled)
-        if base is None:
-            # Build nearest-neighbor scaled frame
-            px = max(1, int(s * self.pixel_size))
-            fr = self.alien_frames[frame]
-            w = len(fr[0]) * px; h = len(fr) * px
-            base = pygame.Surface((w, h), pygame.SRCALPHA).convert_alpha()
-            for r, row in enumerate(fr):
-                for c, hexcol in enumerate(row):
-                    if hexcol != "#000000":
-                        pygame.draw.rect(base, (*hex_to_rgb(hexcol), 255), (c*px, r*px, px, px))
-            self.alien_scaled[key_scaled] = base
-
-        ang = self._quant_angle(angle_deg) % 360
-        key_rot = (s, frame, ang)
-        rot = self.alien_rot_cache.get(key_rot)
-        if rot is None:
-            rot = pygame.transform.rotate(base, -ang)
-            self.alien_rot_cache[key_rot] = rot
-        return rot
+        return self._alien_rotation(s, frame, self._quant_angle(angle_deg) % 360)
 
     def _prewarm_caches(self):
-        # Build commonly-used rotations up front to avoid runtime hitching.
+        # Build commonly-used rotations up front to avoid runtime hitching,
+        # or load them from the on-disk atlas a previous start wrote.
         scales = [1, 2, 3, 4]
         steps = sorted({max(1, int(self.ANGLE_STEP_DEFAULT)), max(1, int(self.ANGLE_STEP_BROKEN))})
-        for s in scales:
-            for step in steps:
-                for ang in range(0, 360, step):
-                    self._get_ship_surface_crisp(s, ang)
-                    for frame in range(len(self.alien_frames)):
-                        self._get_alien_surface_crisp(s, frame, ang)
-
-    # ---- alien frames from JS ----
-    def _build_alien_frames(self):
-        f0 = [
- ['#000000']*15,
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#000000','#000000','#000000','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#60c494','#000000','#000000','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#60c494','#60c494','#000000','#60c494','#60c494','#68a22a','#68a22a','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#60c494','#60c494','#60c494','#000000','#60c494','#68a22a','#000000','#000000','#68a22a','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#60c494','#60c494','#68a22a','#60c494','#b9712f','#b9712f','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#68a22a','#68a22a','#68a22a','#68a22a','#b9712f','#b9712f','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#68a22a','#68a22a','#68a22a','#68a22a','#68a22a','#68a22a','#68a22a','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#68a22a','#68a22a','#68a22a','#68a22a','#b9712f','#b9712f','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#60c494','#60c494','#68a22a','#60c494','#b9712f','#b9712f','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#60c494','#60c494','#60c494','#000000','#60c494','#68a22a','#000000','#000000','#68a22a','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#60c494','#60c494','#000000','#60c494','#60c494','#68a22a','#68a22a','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#60c494','#000000','#000000','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#000000','#000000','#000000','#000000','#000000','#000000','#000000','#000000'],
- ['#000000']*15]
-        f1 = [
- ['#000000']*15,
- ['#000000']*15,
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#000000','#000000','#000000','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#60c494','#68a22a','#68a22a','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#60c494','#60c494','#000000','#60c494','#60c494','#68a22a','#000000','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#60c494','#60c494','#68a22a','#60c494','#b9712f','#b9712f','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#68a22a','#68a22a','#68a22a','#68a22a','#b9712f','#b9712f','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#68a22a','#68a22a','#68a22a','#68a22a','#68a22a','#68a22a','#68a22a','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#68a22a','#68a22a','#68a22a','#68a22a','#b9712f','#b9712f','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#60c494','#60c494','#68a22a','#60c494','#b9712f','#b9712f','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#60c494','#60c494','#000000','#60c494','#60c494','#68a22a','#000000','#68a22a','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#60c494','#68a22a','#68a22a','#000000','#000000','#000000','#000000','#000000'],
- ['#000000','#000000','#000000','#000000','#000000','#60c494','#60c494','#000000','#000000','#000000','#000000','#000000','#000000','#000000','#000000'],
- ['#000000']*15,
- ['#000000']*15]
-        return [f0, f1]
+        angles = sorted({ang for step in steps for ang in range(0, 360, step)})
+        frames = range(len(self.alien_frames))
+        ship_angles = sorted({canonical_angle(a, self.ship_mirror is not None)[0] for a in angles})
+        alien_angles = [
+            sorted({canonical_angle(a, self.alien_mirror[f] is not None)[0] for a in angles})
+            for f in frames
+        ]
+        try:
+            from systems import rotkernel
+        except ImportError:
+            rotkernel = None
+
+        key = None
+        if SPRITE_CACHE_DIR:
+            key = atlas_key(
+                self.sprite, self.ship_sprite.palette, self.alien_frames, self.alien_sprite.palette,
+                self.pixel_size, scales, ship_angles, alien_angles,
+                "numpy" if rotkernel is not None else "pygame",
+            )
+            atlas = RotationAtlas.load(SPRITE_CACHE_DIR, key)
+            if atlas is not None:
+                self._use_atlas(atlas)
+                return
+
+        if rotkernel is not None:
+            # Rotate straight from the pixel grids into the atlas.
+            ship_grid = rotkernel.grid_pixels(self.sprite, self.ship_sprite.color_of)
+            alien_grids = [rotkernel.grid_pixels(fr, self.alien_sprite.color_of) for fr in self.alien_frames]
+            sprites = {}
+            for s in scales:
+                cell = max(1, int(s * self.pixel_size))
+                for ang, entry in zip(ship_angles, rotkernel.rotate_grid(ship_grid, cell, ship_angles)):
+                    sprites[("ship", s, ang)] = entry
+                for frame in frames:
+                    rotated = rotkernel.rotate_grid(alien_grids[frame], cell, alien_angles[frame])
+                    for ang, entry in zip(alien_angles[frame], rotated):
+                        sprites[("alien", s, frame, ang)] = entry
+            atlas = rotkernel.build_atlas(sprites)
+        else:
+            for s in scales:
+                for ang in ship_angles:
+                    self._ship_rotation(s, ang)
+                for frame in frames:
+                    for ang in alien_angles[frame]:
+                        self._alien_rotation(s, frame, ang)
+            sprites = {}
+            for (s, ang), entry in self.ship_rot_cache.items():
+                sprites[("ship", s, ang)] = crop_sprite(entry)
+            for (s, frame, ang), entry in self.alien_rot_cache.items():
+                sprites[("alien", s, frame, ang)] = crop_sprite(entry)
+            atlas = RotationAtlas.pack(sprites)
+        self._use_atlas(atlas)
+        if key is not None:
+            try:
+                atlas.save(SPRITE_CACHE_DIR, key)
+            except (OSError, pygame.error) as exc:
+                print(f"[warn] could not save rotation atlas: {exc}")
+
+    def _use_atlas(self, atlas):
+        self.rot_atlas = atlas
+        for key, entry in atlas.items():
+            if key[0] == "ship":
+                self.ship_rot_cache[key[1:]] = entry
+            else:
+                self.alien_rot_cache[key[1:]] = entry
+
+    def rotation_surfaces(self):
+        # Distinct pixel buffers behind the rotation caches (for memory stats).
+        out = [self.rot_atlas.surface] if self.rot_atlas is not None else []
+        entries = (
+            list(self.ship_rot_cache.values())
+            + list(self.alien_rot_cache.values())
+            + list(self.derived_rot_cache.values())
+        )
+        for surf, _dx, _dy in entries:
+            if surf.get_parent() is None:
+                out.append(surf)
+        return out
 
     # ---- exhaust particles ----
     def _add_thrust(self):
@@ -373,73 +648,30 @@ class JSBattle:
             if len(self.particles) >= self.max_particles:
                 break
             base = angle_rad + math.pi
-            spread = (random.random() - 0.5) * 0.6
+            spread = (self.rng.random() - 0.5) * 0.6
             ang = base + spread
-            spd = 1.1 + random.random() * 0.8
+            spd = 1.1 + self.rng.random() * 0.8
             # Emit across a small nozzle width (perpendicular to thrust axis)
             # so large ship scales don't collapse into one giant center blob.
             nozzle_half = max(1.0, 2.2 * scale)
-            jitter = (random.random() - 0.5) * 2.0 * nozzle_half
+            jitter = (self.rng.random() - 0.5) * 2.0 * nozzle_half
             px = -sin_a * jitter
             py = cos_a * jitter
             # Keep particles energetic but avoid huge "blue dots" at scale 3-4.
-            radius = (1.8 + random.random() * 1.1) * (0.85 + 0.45 * scale)
-            self.particles.append(
-                {
-                    "x": tx + px,
-                    "y": ty + py,
-                    "vx": math.cos(ang) * spd,
-                    "vy": math.sin(ang) * spd,
-                    "r": radius,
-                    "a": 1.0,
-                }
-            )
+            radius = (1.8 + self.rng.random() * 1.1) * (0.85 + 0.45 * scale)
+            self.particles.add(tx + px, ty + py, math.cos(ang) * spd, math.sin(ang) * spd, radius)
 
     def _update_particles(self, dt):
         decay = math.pow(0.9, dt*60.0)  # matches JS frame-scaling
         fade  = 0.1 * dt * 60.0
-        keep = []
-        margin = 24
-        for p in self.particles:
-            p["x"] += p["vx"] * dt; p["y"] += p["vy"] * dt
-            p["r"] *= decay
-            p["a"] -= fade
-            if (
-                p["a"] > 0
-                and -margin <= p["x"] <= self.w + margin
-                and -margin <= p["y"] <= self.h + margin
-            ):
-                keep.append(p)
-        self.particles = keep
+        self.particles.update(dt, self.w, self.h, decay, fade, 24)
 
     def _draw_particles(self, screen):
-        # Pixel exhaust: stepped square trail + square core blocks.
-        for p in self.particles:
-            x, y = int(p["x"]), int(p["y"])
-            if x < -16 or x > self.w + 16 or y < -16 or y > self.h + 16:
-                continue
-            a = clamp(p["a"], 0.0, 1.0)
-            r_core = max(1, int(p["r"]))
-            trail_len = max(2, min(20, int((abs(p["vx"]) + abs(p["vy"])) * 0.55 + r_core)))
-            tx = int(p["x"] - p["vx"] * trail_len * 0.85)
-            ty = int(p["y"] - p["vy"] * trail_len * 0.85)
-            if PI_PERF_MODE and not LEGACY_PARITY_MODE:
-                trail = (int(40 * a), int(120 * a), int(220 * a))
-                core = (int(150 * a), int(230 * a), int(255 * a))
-                trail_size = max(1, r_core // 2)
-                draw_pixel_trail(screen, trail, x, y, tx, ty, trail_size)
-                draw_pixel_block(screen, core, x - r_core // 2, y - r_core // 2, r_core)
-            else:
-                r_halo = max(r_core + 1, int(p["r"] * 1.8))
-                outer = (int(20 * a), int(90 * a), int(220 * a))
-                core = (int(170 * a), int(235 * a), int(255 * a))
-                hot = (int(255 * a), int(255 * a), int(220 * a))
-                trail_size = max(1, r_core // 2)
-                draw_pixel_trail(screen, outer, x, y, tx, ty, trail_size)
-                draw_pixel_block(screen, outer, x - r_halo // 2, y - r_halo // 2, r_halo)
-                draw_pixel_block(screen, core, x - r_core // 2, y - r_core // 2, r_core)
-                hot_size = max(1, r_core // 2)
-                draw_pixel_block(screen, hot, x - hot_size // 2, y - hot_size // 2, hot_size)
+        self.particles.draw(screen, self.w, self.h, self.particle_glow)
+
+    def set_particle_scale(self, scale):
+        self.max_particles = max(16, int(self.base_max_particles * scale))
+        self.particles.truncate(self.max_particles)
 
     # ---- bullets ----
     def _fire_bullet_pair(self):
@@ -458,55 +690,57 @@ class JSBattle:
             cy = self.ship["y"] + (self.ship_h * scale) / 2
             bulletX, bulletY = cx + rx, cy + ry
             speed = 1000.0
-            self.bullets.append({"x":bulletX, "y":bulletY,
-                                 "vx":math.cos(angle)*speed + self.ship["vx"],
-                                 "vy":math.sin(angle)*speed + self.ship["vy"],
-                                 "r":1.0*scale, "life":240.0})
-        if len(self.bullets) > self.max_bullets:
-            self.bullets = self.bullets[-self.max_bullets:]
+            self.bullets.add(bulletX, bulletY,
+                             math.cos(angle)*speed + self.ship["vx"],
+                             math.sin(angle)*speed + self.ship["vy"],
+                             1.0*scale, 240.0)
 
     # ---- activation / spawn ----
-    def _spawn_ship(self, mode=None):
+    def _spawn_ship(self, mode=None, scale=None, motion=None):
+        # scale and motion (x, y, vx, vy) replace the RNG rolls when given.
         self.ship["active"] = True
         if mode in ("normal", "broken", "combat"):
             self.ship["mode"] = mode
         else:
-            r = random.random()
+            r = self.rng.random()
             self.ship["mode"] = "broken" if r < 0.1 else ("combat" if r < 0.4 else "normal")
-        self.ship["scale"] = float(random.randint(1, 4))
-
-        # edge spawn
-        margin = 100
-        e = random.randint(0, 3)
-        if e == 0:
-            sx, sy = random.random() * self.w, -margin
-        elif e == 1:
-            sx, sy = self.w + margin, random.random() * self.h
-        elif e == 2:
-            sx, sy = random.random() * self.w, self.h + margin
+        self.ship["scale"] = float(scale if scale is not None else self.rng.randint(1, 4))
+
+        if motion is not None:
+            self.ship["x"], self.ship["y"], self.ship["vx"], self.ship["vy"] = motion
         else:
-            sx, sy = -margin, random.random() * self.h
-        self.ship["x"], self.ship["y"] = sx, sy
-
-        # target near center
-        cx, cy = self.w / 2, self.h / 2
-        spread = min(self.w, self.h) * 0.25
-        tx = cx + (random.random() - 0.5) * spread
-        ty = cy + (random.random() - 0.5) * spread
-
-        # velocity toward target
-        w = self.ship_w * self.ship["scale"]
-        h = self.ship_h * self.ship["scale"]
-        dx = tx - (self.ship["x"] + w / 2)
-        dy = ty - (self.ship["y"] + h / 2)
-        dist = math.hypot(dx, dy) or 1.0
-        base_speed = (
-            (0.8 + random.random() * 0.8) * 60.0
-            if self.ship["mode"] == "broken"
-            else (2 + random.random() * 6) * 60.0
-        )
-        self.ship["vx"] = dx / dist * base_speed
-        self.ship["vy"] = dy / dist * base_speed
+            # edge spawn
+            margin = 100
+            e = self.rng.randint(0, 3)
+            if e == 0:
+                sx, sy = self.rng.random() * self.w, -margin
+            elif e == 1:
+                sx, sy = self.w + margin, self.rng.random() * self.h
+            elif e == 2:
+                sx, sy = self.rng.random() * self.w, self.h + margin
+            else:
+                sx, sy = -margin, self.rng.random() * self.h
+            self.ship["x"], self.ship["y"] = sx, sy
+
+            # target near center
+            cx, cy = self.w / 2, self.h / 2
+            spread = min(self.w, self.h) * 0.25
+            tx = cx + (self.rng.random() - 0.5) * spread
+            ty = cy + (self.rng.random() - 0.5) * spread
+
+            # velocity toward target
+            w = self.ship_w * self.ship["scale"]
+            h = self.ship_h * self.ship["scale"]
+            dx = tx - (self.ship["x"] + w / 2)
+            dy = ty - (self.ship["y"] + h / 2)
+            dist = math.hypot(dx, dy) or 1.0
+            base_speed = (
+                (0.8 + self.rng.random() * 0.8) * 60.0
+                if self.ship["mode"] == "broken"
+                else (2 + self.rng.random() * 6) * 60.0
+            )
+            self.ship["vx"] = dx / dist * base_speed
+            self.ship["vy"] = dy / dist * base_speed
         self.ship["angle"] = math.degrees(math.atan2(self.ship["vy"], self.ship["vx"]))
         self.ship["timer"] = 0.0
 
@@ -516,14 +750,55 @@ class JSBattle:
         else:
             self.alien.update({"active": False, "x": -9999, "y": -9999, "frame": 0})
 
-    def _maybe_activate_ship(self):
+    def spawn_state(self) -> dict:
+        # Everything a spawn rolled, enough to repeat it with _spawn_ship().
+        s = self.ship
+        return {"step": self.steps, "mode": s["mode"], "scale": s["scale"],
+                "x": s["x"], "y": s["y"], "vx": s["vx"], "vy": s["vy"]}
+
+    def _maybe_activate_ship(self, dt):
         if self.ship["active"]: return
-        if random.random() < 0.002:   # activation gate
+        if self.scripted_spawns is not None:
+            if not self.scripted_spawns or self.scripted_spawns[0]["step"] > self.steps:
+                return
+            spawn = self.scripted_spawns.popleft()
+            self._spawn_ship(spawn["mode"], spawn["scale"], (spawn["x"], spawn["y"], spawn["vx"], spawn["vy"]))
+        elif self.rng.random() < 0.002 * dt * 60.0:   # activation gate (per 60 Hz frame)
             self._spawn_ship()
+        else:
+            return
+        if self.on_spawn is not None:
+            self.on_spawn(self.spawn_state())
+
+    def _next_bullet_interval(self):
+        if STABLE_BULLET_CADENCE:
+            return 24 if PI_PERF_MODE and not LEGACY_PARITY_MODE else 16
+        if self.scripted_intervals:
+            return self.scripted_intervals.popleft()
+        if self.scripted_intervals is not None:
+            self.unscripted_intervals += 1
+        if PI_PERF_MODE and not LEGACY_PARITY_MODE:
+            interval = 12 + int(self.rng.random() * 48)  # 12..59 frames
+        else:
+            interval = 5 + int(self.rng.random() * 50)   # 5..54 frames
+        if self.on_bullet_interval is not None:
+            self.on_bullet_interval(interval)
+        return interval
+
+    def rescale(self, w, h):
+        # Keep ship, alien, bullets and exhaust where they are on screen.
+        fx, fy = w / self.w, h / self.h
+        self.w, self.h = w, h
+        for obj in (self.ship, self.alien):
+            obj["x"] *= fx; obj["y"] *= fy
+            obj["vx"] *= fx; obj["vy"] *= fy
+        self.particles.rescale(fx, fy)
+        self.bullets.rescale(fx, fy)
 
     # ---- public update/draw ----
     def update(self, dt):
-        self._maybe_activate_ship()
+        self._maybe_activate_ship(dt)
+        self.steps += 1
 
         # inactive: just particles
         if not self.ship["active"]:
@@ -552,15 +827,7 @@ class JSBattle:
             if self.bullet_timer >= self.next_bullet_interval:
                 self._fire_bullet_pair()
                 self.bullet_timer = 0.0
-                if STABLE_BULLET_CADENCE:
-                    if PI_PERF_MODE and not LEGACY_PARITY_MODE:
-                        self.next_bullet_interval = 24
-                    else:
-                        self.next_bullet_interval = 16
-                elif PI_PERF_MODE and not LEGACY_PARITY_MODE:
-                    self.next_bullet_interval = 12 + int(random.random() * 48)  # 12..59 frames
-                else:
-                    self.next_bullet_interval = 5 + int(random.random() * 50)   # 5..54 frames
+                self.next_bullet_interval = self._next_bullet_interval()
 
             # alien position 200px ahead + perpendicular bob
             forward = 200.0
@@ -574,7 +841,10 @@ class JSBattle:
             ax += math.cos(ang + math.pi/2)*bob
             ay += math.sin(ang + math.pi/2)*bob
             self.alien["x"] = ax; self.alien["y"] = ay
-            self.alien["vx"] = self.ship["vx"]; self.alien["vy"] = self.ship["vy"]
+            # Ship velocity plus the bob's, so draw() can place it between steps.
+            bob_v = math.cos(self.ship["timer"]*bob_freq)*bob_freq*bob_amp
+            self.alien["vx"] = self.ship["vx"] + math.cos(ang + math.pi/2)*bob_v
+            self.alien["vy"] = self.ship["vy"] + math.sin(ang + math.pi/2)*bob_v
             self.alien["angle"] = self.ship["angle"]
             self.alien["scale"] = int(self.ship["scale"])
 
@@ -587,15 +857,7 @@ class JSBattle:
             self._add_thrust()
 
         # bullets
-        keep = []
-        for b in self.bullets:
-            b["x"] += b["vx"] * dt; b["y"] += b["vy"] * dt
-            b["life"] -= dt * 60.0
-            if b["life"] > 0:
-                keep.append(b)
-        self.bullets = keep
-        if len(self.bullets) > self.max_bullets:
-            self.bullets = self.bullets[-self.max_bullets:]
+        self.bullets.update(dt, self.w, self.h, 8)
 
         self._update_particles(dt)
 
@@ -603,52 +865,99 @@ class JSBattle:
         if self.ship["mode"] == "broken":
             self.ship["angle"] += 0.5 * dt * 60.0
 
-    def draw(self, screen):
-        # bullets
-        for b in self.bullets:
-            bx, by = int(b["x"]), int(b["y"])
-            if bx < -4 or bx > self.w + 4 or by < -4 or by > self.h + 4:
-                continue
-            pygame.draw.circle(screen, (255, 255, 255), (bx, by), max(1, int(b["r"])), 0)
+    def draw(self, screen, lag=0.0):
+        # lag: seconds to draw behind the last update. Everything moves in
+        # straight lines between steps, so stepping back along the velocity
+        # is the same as blending the previous and current step. Exhaust
+        # particles barely move and are drawn where they are.
+        # bullets (they only move while the ship is out)
+        self.bullets.draw(screen, self.w, self.h, lag if self.ship["active"] else 0.0)
         # particles
         self._draw_particles(screen)
 
         # ship (CRISP)
         if self.ship["active"]:
-            surf = self._get_ship_surface_crisp(self.ship["scale"], self.ship["angle"])
-            rect = surf.get_rect(center=(
-                int(self.ship["x"] + (self.ship_w * self.ship["scale"]) / 2),
-                int(self.ship["y"] + (self.ship_h * self.ship["scale"]) / 2)
-            ))
-            screen.blit(surf, rect)
+            angle = self.ship["angle"]
+            if self.ship["mode"] == "broken":
+                angle -= 0.5 * lag * 60.0
+            entry = self._get_ship_surface_crisp(self.ship["scale"], angle)
+            cx = int(self.ship["x"] - self.ship["vx"] * lag + (self.ship_w * self.ship["scale"]) / 2)
+            cy = int(self.ship["y"] - self.ship["vy"] * lag + (self.ship_h * self.ship["scale"]) / 2)
+            blit_rotation(screen, entry, cx, cy)
 
         # alien (CRISP)
         if self.alien["active"]:
-            a_rot = self._get_alien_surface_crisp(self.alien["scale"], self.alien["frame"], self.alien["angle"])
-            rect = a_rot.get_rect(center=(int(self.alien["x"]), int(self.alien["y"])))
-            screen.blit(a_rot, rect)
+            entry = self._get_alien_surface_crisp(self.alien["scale"], self.alien["frame"], self.alien["angle"])
+            ax = int(self.alien["x"] - self.alien["vx"] * lag)
+            ay = int(self.alien["y"] - self.alien["vy"] * lag)
+            blit_rotation(screen, entry, ax, ay)
+
+def make_starfield(w, h, bg_color=(0,0,0), rng=None, backend=None):
+    backend = backend or STARFIELD_BACKEND
+    if backend == "layered":
+        from systems.layeredstarfield import LayeredStarfield
+        return LayeredStarfield(w, h, bg_color, rng=rng)
+    if backend == "numpy":
+        try:
+            from systems.npstarfield import NumpyStarfield
+        except ImportError as exc:
+            print(f"[warn] numpy starfield unavailable, using the python one: {exc}")
+        else:
+            return NumpyStarfield(w, h, bg_color, rng=rng)
+    return JSStarfield(w, h, bg_color, rng=rng)
 
 # ---------- COMBINED ----------
 class ArcadeBattlefield:
-    def __init__(self, w, h, bg_color=(0,0,0)):
-        self.starfield = JSStarfield(w, h, bg_color)
-        self.battle    = JSBattle(w, h)
+    def __init__(self, w, h, bg_color=(0,0,0), rng=None, sim_hz=None):
+        # One RNG drives both halves, so a seed reproduces the whole scene.
+        self.rng = rng if rng is not None else random
+        self.starfield = make_starfield(w, h, bg_color, rng=self.rng)
+        self.battle    = JSBattle(w, h, rng=self.rng)
+        # Fixed-rate simulation (None without one); draw() trails the last
+        # step by self.lag seconds.
+        self.sim_hz = SIM_HZ if sim_hz is None else sim_hz
+        self.sim = FixedStep(self.sim_hz, SIM_MAX_STEPS) if self.sim_hz > 0 else None
+        self.lag = 0.0
+        # Glow as configured at startup (off in GK_PI_PERF_MODE); quality
+        # levels are capped to it.
+        self.base_glow = self.starfield.glow and self.battle.particle_glow
 
     def resize(self, w, h):
         self.starfield.resize(w, h)
         self.battle.w, self.battle.h = w, h
 
-    def update(self, dt):
+    def rescale(self, w, h):
+        self.starfield.rescale(w, h)
+        self.battle.rescale(w, h)
+
+    def apply_quality(self, star_density, particle_scale, glow, sim_rate=1.0):
+        self.starfield.set_density(star_density)
+        self.starfield.glow = glow
+        self.battle.set_particle_scale(particle_scale)
+        self.battle.particle_glow = glow
+        if self.sim is not None:
+            # Fewer steps under load; drawing still runs every frame.
+            self.sim.set_rate(self.sim_hz * sim_rate)
+
+    def _step(self, dt):
         self.starfield.update(dt)
         self.battle.update(dt)
 
+    def update(self, dt):
+        if self.sim is None:
+            self._step(dt)
+            return
+        for _ in range(self.sim.advance(dt)):
+            self._step(self.sim.step)
+        self.lag = self.sim.lag
+
     def draw(self, screen, draw_starfield=True, draw_battle=True):
         if draw_starfield:
-            self.starfield.draw(screen)
+            self.starfield.draw(screen, self.lag)
         else:
             screen.fill(self.starfield.bg)
         if draw_battle:
-            self.battle.draw(screen)
+            self.battle.draw(screen, self.lag)
 
 # ---------- Standalone runner ----------
 if __name__ == "__main__":
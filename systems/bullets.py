@@ -0,0 +1,99 @@
+import numpy as np
+import pygame
+
+# Array-backed bullet pool for JSBattle (the default when numpy is available;
+# GK_BULLET_BACKEND=python keeps the per-dict list). Bullets live in a fixed
+# ring: firing past capacity overwrites the oldest bullet, like the old list
+# slice did, and nothing is allocated per shot or per frame.
+_STAMP_KEY = (255, 0, 255)
+BULLET_COLOR = (255, 255, 255)
+
+
+class ArrayBullets:
+    """
+    Fixed-capacity bullet ring. Every bullet lives the same number of frames,
+    so expiry frees slots from the head; bullets culled early (off screen and
+    flying away) are just marked dead until the head passes them.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.x = np.zeros(self.capacity)
+        self.y = np.zeros(self.capacity)
+        self.vx = np.zeros(self.capacity)
+        self.vy = np.zeros(self.capacity)
+        self.r = np.zeros(self.capacity)
+        self.life = np.zeros(self.capacity)
+        self.head = 0
+        self.used = 0
+        self._stamps = {}
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life > 0))
+
+    def add(self, x, y, vx, vy, r, life):
+        if self.used == self.capacity:
+            i = self.head
+            self.head = (self.head + 1) % self.capacity
+        else:
+            i = (self.head + self.used) % self.capacity
+            self.used += 1
+        self.x[i] = x; self.y[i] = y
+        self.vx[i] = vx; self.vy[i] = vy
+        self.r[i] = r
+        self.life[i] = life
+
+    def update(self, dt, w, h, margin):
+        if not self.used:
+            return
+        # Whole-array math: dead slots are moved too, which is cheaper than
+        # indexing the live span of the ring.
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.life -= dt * 60.0
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        gone = (
+            ((x < -margin) & (vx <= 0)) | ((x > w + margin) & (vx >= 0))
+            | ((y < -margin) & (vy <= 0)) | ((y > h + margin) & (vy >= 0))
+        )
+        self.life[gone] = 0.0
+        life = self.life
+        while self.used and life[self.head] <= 0:
+            self.head = (self.head + 1) % self.capacity
+            self.used -= 1
+
+    def rescale(self, fx, fy):
+        self.x *= fx; self.y *= fy
+        self.vx *= fx; self.vy *= fy
+
+    def _stamp(self, radius: int):
+        stamp = self._stamps.get(radius)
+        if stamp is None:
+            size = radius * 2 + 1
+            stamp = pygame.Surface((size, size)).convert()
+            stamp.fill(_STAMP_KEY)
+            pygame.draw.circle(stamp, BULLET_COLOR, (radius, radius), radius, 0)
+            stamp.set_colorkey(_STAMP_KEY, pygame.RLEACCEL)
+            self._stamps[radius] = stamp
+        return stamp
+
+    def draw(self, screen, w, h, lag=0.0):
+        if not self.used:
+            return
+        if lag:
+            bx = (self.x - self.vx * lag).astype(np.int64)
+            by = (self.y - self.vy * lag).astype(np.int64)
+        else:
+            bx = self.x.astype(np.int64)
+            by = self.y.astype(np.int64)
+        show = (self.life > 0) & (bx >= -4) & (bx <= w + 4) & (by >= -4) & (by <= h + 4)
+        if not show.any():
+            return
+        radius = np.maximum(1, self.r.astype(np.int64))
+        seq = []
+        for x, y, rad in zip(bx[show].tolist(), by[show].tolist(), radius[show].tolist()):
+            seq.append((self._stamp(rad), (x - rad, y - rad)))
+        if hasattr(screen, "fblits"):
+            screen.fblits(seq)
+        else:
+            screen.blits(seq, doreturn=False)
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:
+    # POSIX only; elsewhere the index is only guarded within one process.
+    fcntl = None
+
+# Access times only matter for eviction order, so hits are flushed to the
+# index lazily instead of rewriting it on every poll.
+INDEX_FLUSH_SECONDS = 60.0
+# Files in the cache folders that the index doesn't know about (older layouts,
+# crashed writes) are removed once they're older than this.
+ORPHAN_GRACE_SECONDS = 3600.0
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def atomic_write_bytes(dest: Path, data: bytes):
+    # Write next to the target and rename so readers never see a torn file.
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-", suffix=dest.suffix)
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class RemoteCache:
+    """
+    Content-addressed store for downloaded files under root/<subdir>/<hash><ext>.
+    index.json maps each URL to its object plus HTTP validators, and records
+    access times so the least recently used objects go first once the cache
+    grows past max_bytes. Identical payloads under different URLs share one file.
+
+    Several processes (the red and blue displays) may share one root. index.json
+    is the shared truth: every write re-reads it under an exclusive flock,
+    folds in this process's pending access times and writes it back, and
+    objects are only deleted after checking the merged index under that lock.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.index_path = self.root / "index.json"
+        self.lock_path = self.root / "index.lock"
+        self._lock = threading.Lock()
+        self._urls: dict[str, dict] = {}
+        self._objects: dict[str, dict] = {}
+        # url -> (atime, checked) recorded since the last write.
+        self._pending: dict[str, tuple[float, float]] = {}
+        self._dirty = False
+        self._last_flush = 0.0
+        self._load()
+
+    # ---- index ----
+    @contextmanager
+    def _index_lock(self):
+        # Cross-process half of the locking; callers hold self._lock too.
+        if fcntl is None:
+            yield
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self):
+        # Reload the shared index and re-apply this process's pending hits.
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            urls = dict(data.get("urls", {}))
+            objects = dict(data.get("objects", {}))
+        except Exception:
+            urls, objects = {}, {}
+        for url, (atime, checked) in self._pending.items():
+            entry = urls.get(url)
+            if entry is None:
+                continue
+            entry["checked"] = max(entry.get("checked", 0.0), checked)
+            obj = objects.get(entry["object"])
+            if obj is not None:
+                obj["atime"] = max(obj.get("atime", 0.0), atime)
+        self._urls, self._objects = urls, objects
+
+    def _load(self):
+        with self._lock, self._index_lock():
+            self._sync()
+            # Drop index entries whose files went missing.
+            for key in [k for k in self._objects if not (self.root / k).exists()]:
+                del self._objects[key]
+            for url in [u for u, e in self._urls.items() if e.get("object") not in self._objects]:
+                del self._urls[url]
+            self._sweep_orphans()
+            self._write()
+
+    def _sweep_orphans(self):
+        now = time.time()
+        for sub in self.root.iterdir() if self.root.exists() else []:
+            if not sub.is_dir():
+                continue
+            for f in sub.iterdir():
+                key = f"{sub.name}/{f.name}"
+                if key in self._objects or not f.is_file():
+                    continue
+                try:
+                    if now - f.stat().st_mtime > ORPHAN_GRACE_SECONDS:
+                        f.unlink()
+                except OSError:
+                    pass
+
+    def _write(self):
+        # Caller holds both locks and has just synced.
+        payload = json.dumps({"urls": self._urls, "objects": self._objects}, separators=(",", ":"))
+        try:
+            atomic_write_bytes(self.index_path, payload.encode("utf-8"))
+            self._pending.clear()
+            self._dirty = False
+            self._last_flush = time.time()
+        except OSError:
+            pass
+
+    def _flush(self, force=False):
+        # Caller holds self._lock.
+        if not self._dirty:
+            return
+        if not force and time.time() - self._last_flush < INDEX_FLUSH_SECONDS:
+            return
+        with self._index_lock():
+            self._sync()
+            self._write()
+
+    def flush(self):
+        with self._lock:
+            self._flush(force=True)
+
+    # ---- lookups ----
+    def lookup(self, url: str) -> dict | None:
+        """Return a copy of the URL's entry (object, etag, last_modified, checked) if its file exists."""
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is None:
+                return None
+            if not (self.root / entry["object"]).exists():
+                # Gone from disk (another display may have evicted it).
+                self._forget_object(entry["object"])
+                return None
+            return dict(entry)
+
+    def path_for(self, entry: dict) -> Path:
+        return self.root / entry["object"]
+
+    def touch(self, url: str, validated=False):
+        # Record a hit (and optionally a successful revalidation) for eviction order / TTLs.
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is None:
+                return
+            now = time.time()
+            obj = self._objects.get(entry["object"])
+            if obj is not None:
+                obj["atime"] = now
+            if validated:
+                entry["checked"] = now
+            self._pending[url] = (now, entry.get("checked", 0.0))
+            self._dirty = True
+            self._flush()
+
+    # ---- writes ----
+    @staticmethod
+    def object_key(url: str, subdir: str, digest: str) -> str:
+        ext = Path(urlparse(url).path).suffix.lower()[:8]
+        return f"{subdir}/{digest}{ext}"
+
+    def store(self, url: str, subdir: str, data: bytes, etag="", last_modified="") -> tuple[Path, bool]:
+        """
+        Save a downloaded payload for url. Returns (path, changed) where changed is
+        False when url already pointed at identical content.
+        """
+        key = self.object_key(url, subdir, content_hash(data))
+        dest = self.root / key
+        now = time.time()
+
+        with self._lock, self._index_lock():
+            self._sync()
+            if key not in self._objects or not dest.exists():
+                atomic_write_bytes(dest, data)
+                self._objects[key] = {"size": len(data), "atime": now}
+            else:
+                self._objects[key]["atime"] = now
+
+            previous = self._urls.get(url)
+            changed = previous is None or previous.get("object") != key
+            self._urls[url] = {
+                "object": key,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked": now,
+            }
+            if previous is not None and changed:
+                self._release(previous.get("object"))
+            self._evict()
+            self._write()
+        return dest, changed
+
+    def _release(self, key: str | None):
+        # Drop an object as soon as no URL references it any more. Called
+        # right after _sync under the index lock, so other processes' URLs count.
+        if key is None or any(e.get("object") == key for e in self._urls.values()):
+            return
+        self._delete_object(key)
+
+    def _delete_object(self, key: str):
+        self._objects.pop(key, None)
+        try:
+            (self.root / key).unlink()
+        except OSError:
+            pass
+
+    def _forget_object(self, key: str):
+        self._objects.pop(key, None)
+        for url in [u for u, e in self._urls.items() if e.get("object") == key]:
+            del self._urls[url]
+        self._dirty = True
+
+    def total_bytes(self) -> int:
+        # Called from the metrics thread while fetches may be writing.
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        return sum(int(o.get("size", 0)) for o in self._objects.values())
+
+    def _evict(self):
+        if not self.max_bytes:
+            return
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        # Oldest access first; never evict the newest object (the one just stored).
+        by_age = sorted(self._objects.items(), key=lambda kv: kv[1].get("atime", 0.0))
+        for key, obj in by_age[:-1]:
+            if total <= self.max_bytes:
+                break
+            total -= int(obj.get("size", 0))
+            self._forget_object(key)
+            self._delete_object(key)
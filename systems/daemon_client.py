@@ -0,0 +1,97 @@
+import json
+import os
+import socket
+import threading
+
+DEFAULT_SOCKET = "/tmp/gk-taplister.sock"
+
+
+def daemon_socket_path() -> str:
+    return os.getenv("GK_DAEMON_SOCKET", DEFAULT_SOCKET)
+
+
+class DaemonSubscriber:
+    """
+    Receives merged taplists from taplist_daemon.py over its Unix socket instead
+    of polling the server from this process. Same start()/stop() shape as
+    TaplistPoller; if the daemon can't be reached, or drops the connection
+    later, make_fallback() builds an in-process poller and that takes over. The
+    fallback is built from startup state, so it should publish what it fetches
+    first (TaplistPoller's publish_first).
+    """
+
+    def __init__(self, socket_path: str, taplist_src: str, on_update, log, make_fallback):
+        self.socket_path = socket_path
+        self.taplist_src = taplist_src
+        self.on_update = on_update
+        self.log = log
+        self.make_fallback = make_fallback
+        self.fallback = None
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(2.0)
+            sock.connect(self.socket_path)
+            sock.sendall((json.dumps({"subscribe": self.taplist_src}) + "\n").encode("utf-8"))
+            sock.settimeout(None)
+        except OSError as exc:
+            self.log(f"[warn] data daemon unavailable at {self.socket_path}, polling in-process: {exc}")
+            self._start_fallback()
+            return
+        self._sock = sock
+        self.log(f"[debug] subscribed to data daemon at {self.socket_path}")
+        self._thread = threading.Thread(target=self._read_loop, name="daemon-subscriber", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        with self._lock:
+            fallback = self.fallback
+        if fallback is not None:
+            fallback.stop()
+
+    def _start_fallback(self):
+        with self._lock:
+            if self._stopping.is_set() or self.fallback is not None:
+                return
+            self.fallback = self.make_fallback()
+        self.fallback.start()
+
+    def _read_loop(self):
+        try:
+            with self._sock.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    try:
+                        msg = json.loads(line)
+                    except ValueError as exc:
+                        self.log(f"[warn] bad message from data daemon: {exc}")
+                        continue
+                    if "error" in msg:
+                        # e.g. the daemon doesn't serve this side; keep the
+                        # screen as it is and poll instead.
+                        self.log(f"[warn] data daemon refused {self.taplist_src}: {msg['error']}, polling in-process")
+                        self._start_fallback()
+                        return
+                    try:
+                        self.on_update(msg.get("refreshToken"), msg.get("beers", []))
+                    except Exception as exc:
+                        self.log(f"[warn] bad message from data daemon: {exc}")
+        except (OSError, ValueError):
+            pass
+        if not self._stopping.is_set():
+            self.log("[warn] data daemon connection lost, polling in-process")
+            self._start_fallback()
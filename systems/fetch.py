@@ -1,46 +1,186 @@
-import hashlib
+import os
+import queue
+import threading
 import time
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from urllib.parse import urlparse
 
 import requests
 
+from settings import CACHE_DIR
+from systems.cache import RemoteCache, content_hash
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw.strip())
+    except Exception:
+        return default
+
+
 def is_url(s: str) -> bool:
     try:
         return urlparse(s).scheme in ("http", "https")
     except Exception:
         return False
 
-CACHE_ROOT = Path(".cache_remote")
+CACHE_ROOT = Path(CACHE_DIR)
 CACHE_ROOT.mkdir(exist_ok=True)
+CACHE_MAX_BYTES = max(0, _env_int("GK_CACHE_MAX_MB", 64)) * 1024 * 1024
+REMOTE_CACHE = RemoteCache(CACHE_ROOT, CACHE_MAX_BYTES)
+
+# requests.Session isn't guaranteed thread-safe, so each thread (render, poll)
+# keeps its own keep-alive pool.
+_SESSIONS = threading.local()
+
+
+def http_session() -> requests.Session:
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        session = requests.Session()
+        _SESSIONS.session = session
+    return session
+
+
+def _request_validators(entry: dict | None) -> dict:
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _response_validators(r) -> tuple[str, str]:
+    etag = (r.headers.get("ETag") or "").strip()
+    last_modified = (r.headers.get("Last-Modified") or "").strip()
+    # Last-Modified has one-second resolution: a file saved again within the
+    # same second as this response would still match it. Only keep it once it's
+    # safely older than the response Date, like a strong validator.
+    date = (r.headers.get("Date") or "").strip()
+    if last_modified and date:
+        try:
+            age = parsedate_to_datetime(date) - parsedate_to_datetime(last_modified)
+            if age.total_seconds() < 1.0:
+                last_modified = ""
+        except Exception:
+            last_modified = ""
+    return etag, last_modified
+
+
+def _conditional_get(url: str, subdir: str, timeout_s) -> tuple[Path, bool]:
+    """
+    GET url with If-None-Match/If-Modified-Since from the cached validators.
+    Returns (path, changed); changed is False when the server answered 304
+    or sent back the exact bytes we already have.
+    """
+    entry = REMOTE_CACHE.lookup(url)
+    headers = _request_validators(entry)
+
+    r = http_session().get(url, timeout=timeout_s, headers=headers)
+    if r.status_code == 304 and entry is not None:
+        REMOTE_CACHE.touch(url, validated=True)
+        return REMOTE_CACHE.path_for(entry), False
+    r.raise_for_status()
+
+    # Servers without validator support still send 200; the content-addressed
+    # store notices an identical body and leaves the cached file alone.
+    etag, last_modified = _response_validators(r)
+    return REMOTE_CACHE.store(url, subdir, r.content, etag=etag, last_modified=last_modified)
+
+
+def _fresh_entry(url: str, ttl) -> dict | None:
+    entry = REMOTE_CACHE.lookup(url)
+    if entry is not None and (time.time() - entry.get("checked", 0.0)) < ttl:
+        REMOTE_CACHE.touch(url)
+        return entry
+    return None
+
+
+def _stale_path(url: str) -> Path | None:
+    entry = REMOTE_CACHE.lookup(url)
+    if entry is None:
+        return None
+    REMOTE_CACHE.touch(url)
+    return REMOTE_CACHE.path_for(entry)
 
-def _cache_path(url: str, subdir: str, ext_hint: str | None = None) -> Path:
-    h = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
-    name = Path(urlparse(url).path).name or "file"
-    if ext_hint and not name.lower().endswith(ext_hint):
-        name += ext_hint
-    p = CACHE_ROOT / subdir
-    p.mkdir(parents=True, exist_ok=True)
-    return p / f"{h}_{name}"
 
 def fetch_text(url: str, ttl=15, timeout_s=10, allow_stale_on_error=True) -> Path:
-    dest = _cache_path(url, "json", ".json")
-    if dest.exists() and (time.time() - dest.stat().st_mtime) < ttl:
-        return dest
+    entry = _fresh_entry(url, ttl)
+    if entry is not None:
+        return REMOTE_CACHE.path_for(entry)
     try:
-        r = requests.get(url, timeout=timeout_s)
-        r.raise_for_status()
+        dest, _ = _conditional_get(url, "json", timeout_s)
     except Exception:
-        if allow_stale_on_error and dest.exists():
+        stale = _stale_path(url) if allow_stale_on_error else None
+        if stale is not None:
             # Keep the display alive with stale data during temporary network/server failures.
-            return dest
+            return stale
         raise
-    dest.write_text(r.text, encoding="utf-8")
     return dest
 
+def _write_behind_worker():
+    while True:
+        url, subdir, data, etag, last_modified = _WRITE_QUEUE.get()
+        try:
+            REMOTE_CACHE.store(url, subdir, data, etag=etag, last_modified=last_modified)
+        except Exception as exc:
+            print(f"[cache] write-behind failed for {url}: {exc}")
+
+
+_WRITE_QUEUE: queue.Queue = queue.Queue()
+threading.Thread(target=_write_behind_worker, name="cache-writer", daemon=True).start()
+
+
+def fetch_text_payload(url: str, ttl=15, timeout_s=10, allow_stale_on_error=True):
+    """
+    Like fetch_text, but for callers that keep the parsed result in memory.
+    Returns (validator, body, path): validator is the content-addressed object
+    key, body holds freshly downloaded bytes (None when the cached copy is
+    current) and path is the on-disk copy to read when body is None. New bodies
+    reach the disk cache from a background writer as the offline fallback.
+    """
+    entry = _fresh_entry(url, ttl)
+    if entry is not None:
+        return entry["object"], None, REMOTE_CACHE.path_for(entry)
+
+    entry = REMOTE_CACHE.lookup(url)
+    headers = _request_validators(entry)
+    try:
+        r = http_session().get(url, timeout=timeout_s, headers=headers)
+        if r.status_code == 304 and entry is not None:
+            REMOTE_CACHE.touch(url, validated=True)
+            return entry["object"], None, REMOTE_CACHE.path_for(entry)
+        r.raise_for_status()
+    except Exception:
+        if allow_stale_on_error and entry is not None:
+            # Keep the display alive with stale data during temporary network/server failures.
+            REMOTE_CACHE.touch(url)
+            return entry["object"], None, REMOTE_CACHE.path_for(entry)
+        raise
+
+    body = r.content
+    validator = RemoteCache.object_key(url, "json", content_hash(body))
+    etag, last_modified = _response_validators(r)
+    if (
+        entry is not None
+        and entry["object"] == validator
+        and entry.get("etag") == etag
+        and entry.get("last_modified") == last_modified
+    ):
+        REMOTE_CACHE.touch(url, validated=True)
+    else:
+        _WRITE_QUEUE.put((url, "json", body, etag, last_modified))
+    return validator, body, None
+
 def fetch_meta(url: str, timeout_s=5):
     try:
-        r = requests.head(url, timeout=timeout_s, allow_redirects=True)
+        r = http_session().head(url, timeout=timeout_s, allow_redirects=True)
         r.raise_for_status()
     except Exception:
         return None
@@ -53,15 +193,29 @@ def fetch_meta(url: str, timeout_s=5):
     return (etag, last_modified, content_length)
 
 def fetch_binary(url: str, subdir="assets", ttl=300, timeout_s=15) -> Path:
-    dest = _cache_path(url, subdir, None)
-    if dest.exists() and (time.time() - dest.stat().st_mtime) < ttl:
-        return dest
+    entry = _fresh_entry(url, ttl)
+    if entry is not None:
+        return REMOTE_CACHE.path_for(entry)
     try:
-        r = requests.get(url, timeout=timeout_s)
-        r.raise_for_status()
+        dest, _ = _conditional_get(url, subdir, timeout_s)
     except Exception:
-        if dest.exists():
-            return dest
+        stale = _stale_path(url)
+        if stale is not None:
+            return stale
         raise
-    dest.write_bytes(r.content)
     return dest
+
+def wait_for_change(feed_url: str, params: dict, wait_s=20.0, timeout_s=5) -> dict | None:
+    """
+    Long-poll the change feed. Blocks until the server reports a different
+    refreshToken/dbVersion than the ones in params, then returns the new ones.
+    Returns None when the server's wait window passed with no change: a 204,
+    or a `null` body after the heartbeat spaces the PHP feed sends.
+    """
+    query = dict(params)
+    query["wait"] = f"{wait_s:g}"
+    r = http_session().get(feed_url, params=query, timeout=(timeout_s, wait_s + timeout_s))
+    if r.status_code == 204:
+        return None
+    r.raise_for_status()
+    return r.json()
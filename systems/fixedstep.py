@@ -0,0 +1,54 @@
+# Fixed-timestep accumulator for the battlefield. Frame time is banked and
+# paid out in whole simulation steps, so motion, spawns and fades advance the
+# same way whatever the frame rate, and a hitch turns into a few catch-up
+# steps instead of one big jump. The leftover time (less than one step) is how
+# far the last step is ahead of the frame being drawn; renderers use it to
+# place things between the previous and the current step.
+
+
+class FixedStep:
+    """
+    Accumulator paying out steps of 1/hz seconds. At most max_steps run per
+    frame; time beyond that is dropped (the scene briefly slows down instead
+    of spiralling into ever longer catch-up frames).
+    """
+
+    def __init__(self, hz: float, max_steps: int = 5):
+        self.max_steps = max(1, int(max_steps))
+        self.step = 1.0 / hz
+        self.acc = 0.0
+        # Run totals, for perf logging.
+        self.steps = 0
+        self.dropped_s = 0.0
+
+    @property
+    def hz(self) -> float:
+        return 1.0 / self.step
+
+    def set_rate(self, hz: float):
+        # Keep the same fraction of a step banked, so the rendered state
+        # doesn't jump.
+        step = 1.0 / hz
+        self.acc = self.acc / self.step * step
+        self.step = step
+
+    def advance(self, dt: float) -> int:
+        """Bank dt and return how many steps to run now."""
+        self.acc += max(0.0, dt)
+        # The epsilon keeps dt == step from paying 0 then 2 steps on rounding.
+        n = int(self.acc / self.step + 1e-6)
+        if n > self.max_steps:
+            self.dropped_s += (n - self.max_steps) * self.step
+            n = self.max_steps
+            self.acc = self.acc % self.step + n * self.step
+        self.acc = max(0.0, self.acc - n * self.step)
+        self.steps += n
+        return n
+
+    @property
+    def lag(self) -> float:
+        # Seconds the drawn frame trails the last step: one full step right
+        # after paying out, down towards zero as the next step comes due. The
+        # frame shows the previous state blended towards the current one by
+        # acc / step.
+        return max(0.0, self.step - self.acc)
@@ -0,0 +1,118 @@
+# Log-linear (HDR-style) frame-time histogram. Values are bucketed at 1 us
+# resolution below 64 us and in 32 sub-buckets per power of two above that,
+# so any reported percentile is within ~3% of the true value. Recording is an
+# index computation and one in-place add on a preallocated list, so the render
+# loop can record every frame and nothing between reports is lost.
+SUB_BITS = 6
+_SUB_COUNT = 1 << SUB_BITS
+_HALF_COUNT = _SUB_COUNT >> 1
+
+
+def _bucket_index(us: int) -> int:
+    if us < _SUB_COUNT:
+        return us
+    shift = us.bit_length() - SUB_BITS
+    return _SUB_COUNT + (shift - 1) * _HALF_COUNT + (us >> shift) - _HALF_COUNT
+
+
+def _bucket_upper_us(index: int) -> int:
+    # Largest value (us) that lands in this bucket.
+    if index < _SUB_COUNT:
+        return index
+    k = index - _SUB_COUNT
+    shift = k // _HALF_COUNT + 1
+    sub = k % _HALF_COUNT + _HALF_COUNT
+    return ((sub + 1) << shift) - 1
+
+
+class FrameHistogram:
+    """
+    Constant-memory frame-time histogram (values in ms). Samples above max_ms
+    are clamped into the top bucket but still counted in max. Histograms with
+    the same max_ms can be merged, so a per-report window can be folded into a
+    run-long total before it is reset.
+    """
+
+    __slots__ = ("max_ms", "_max_us", "counts", "count", "total_ms", "min_ms", "max_seen_ms")
+
+    def __init__(self, max_ms: float = 60000.0):
+        self.max_ms = max_ms
+        self._max_us = int(max_ms * 1000.0)
+        self.counts = [0] * (_bucket_index(self._max_us) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = 0.0
+        self.max_seen_ms = 0.0
+
+    def record(self, ms: float):
+        us = int(ms * 1000.0)
+        if us < 0:
+            us = 0
+        elif us > self._max_us:
+            us = self._max_us
+        self.counts[_bucket_index(us)] += 1
+        if self.count == 0 or ms < self.min_ms:
+            self.min_ms = ms
+        if ms > self.max_seen_ms:
+            self.max_seen_ms = ms
+        self.count += 1
+        self.total_ms += ms
+
+    def merge(self, other: "FrameHistogram"):
+        if other.max_ms != self.max_ms:
+            raise ValueError("can't merge histograms with different ranges")
+        if not other.count:
+            return
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        if self.count == 0 or other.min_ms < self.min_ms:
+            self.min_ms = other.min_ms
+        self.max_seen_ms = max(self.max_seen_ms, other.max_seen_ms)
+        self.count += other.count
+        self.total_ms += other.total_ms
+
+    def reset(self):
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = 0.0
+        self.max_seen_ms = 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper edge (ms) of the bucket holding the q-quantile, capped at the max seen."""
+        if not self.count:
+            return 0.0
+        rank = max(1, min(self.count, int(q * self.count + 0.999999)))
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= rank:
+                return min(_bucket_upper_us(i) / 1000.0, self.max_seen_ms)
+        return self.max_seen_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99, 0.999)) -> dict:
+        out = {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_seen_ms,
+        }
+        for q in quantiles:
+            out[f"p{q * 100:g}_ms"] = self.percentile(q)
+        return out
+
+    def dump(self) -> dict:
+        # Summary plus the non-empty buckets as {upper edge in ms: count}.
+        out = self.summary()
+        out["buckets"] = {
+            _bucket_upper_us(i) / 1000.0: c for i, c in enumerate(self.counts) if c
+        }
+        return out
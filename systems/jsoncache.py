@@ -0,0 +1,49 @@
+import threading
+
+_MISS = object()
+
+
+class JsonCache:
+    """
+    Parsed JSON documents keyed by source, each tagged with the validator it was
+    parsed from (content-addressed cache key for remote files, mtime/size for
+    local ones). Returned objects are shared, so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, object]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, src: str, validator: str):
+        with self._lock:
+            entry = self._entries.get(src)
+            if entry is not None and entry[0] == validator:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return _MISS
+
+    def put(self, src: str, validator: str, data):
+        with self._lock:
+            self._entries[src] = (validator, data)
+
+    def validator(self, src: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(src)
+            return entry[0] if entry is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+def is_miss(value) -> bool:
+    return value is _MISS
@@ -0,0 +1,119 @@
+import pygame
+
+from systems.battle import STAR_FAR_DEPTH, STAR_FAR_PX, JSStarfield
+
+# Layered renderer for the starfield (GK_STARFIELD_BACKEND=layered). Stars
+# fly in from the back of their layer, and far away they crawl: projected
+# positions scale with 1/z, so their on-screen speed falls off with 1/z^2.
+# Stars deeper than STAR_FAR_DEPTH * w are split off and drawn once onto a
+# cached layer; each frame clears, blits that layer and only updates and
+# draws the near stars. Far stars all project close to the vanishing point,
+# so the layer is a small patch around it and the blit is cheap. The far set catches up and is redrawn whenever its fastest star
+# could have moved STAR_FAR_PX pixels, and stars that came closer move over
+# to the near set then.
+#
+# Per-star motion and drawing are the Python backend's, so the only visible
+# differences are the far stars' sub-pixel lag and near stars now always
+# drawing over far ones.
+
+# Longest a far star goes unrefreshed, so twinkle doesn't visibly step.
+FAR_MAX_INTERVAL_S = 0.1
+# Patch margin around the far stars' projections; covers the glow ring.
+_PATCH_PAD = 4
+
+
+class LayeredStarfield(JSStarfield):
+    """
+    Drop-in JSStarfield. With smooth twinkle, far stars never respawn or draw
+    from the RNG, so a seeded field makes the same RNG calls in the same order
+    as the Python backend.
+    """
+
+    def __init__(self, w, h, bg_color=(0,0,0), rng=None, far_depth=STAR_FAR_DEPTH, far_px=STAR_FAR_PX):
+        self.far_depth = far_depth
+        self.far_px = far_px
+        self.far = []
+        self.near = []
+        self._far_dt = 0.0
+        self._far_due = 0.0
+        self._layer = None
+        self._layer_state = None
+        self._patch = pygame.Rect(0, 0, 0, 0)
+        super().__init__(w, h, bg_color, rng=rng)
+        self._partition()
+
+    # ---- state ----
+    def _partition(self):
+        # List order is kept in both sets; it is also the draw order.
+        far_z = self.far_depth * self.w
+        self.far = [s for s in self.stars if s["z"] >= far_z]
+        self.near = [s for s in self.stars if s["z"] < far_z]
+        self._far_dt = 0.0
+        self._far_due = self._refresh_interval()
+        self._layer_state = None
+
+    def _refresh_interval(self):
+        if not self.far:
+            return FAR_MAX_INTERVAL_S
+        cx, cy = self._center(self.time)
+        # Nearest the far set gets before the next refresh.
+        z = max(1.0, min(s["z"] for s in self.far) - self.STAR_SPEED * FAR_MAX_INTERVAL_S)
+        reach = max(max(abs(s["x"] - cx), abs(s["y"] - cy)) for s in self.far)
+        # (x - c) * 128 / z with z shrinking at STAR_SPEED, plus the center's drift.
+        drift = max(
+            self.w * (self.DRIFT_AMOUNT_X * self.DRIFT_SPEED_X + 0.05 * self.DRIFT_SPEED_Y * 0.63),
+            self.h * (self.DRIFT_AMOUNT_Y * self.DRIFT_SPEED_Y + 0.04 * self.DRIFT_SPEED_X * 0.77),
+        )
+        speed = reach * 128.0 * self.STAR_SPEED / (z * z) + drift
+        return min(FAR_MAX_INTERVAL_S, self.far_px / speed)
+
+    def resize(self, w, h):
+        super().resize(w, h)
+        self._partition()
+
+    def rescale(self, w, h):
+        super().rescale(w, h)
+        self._partition()
+
+    def set_density(self, density):
+        super().set_density(density)
+        self._partition()
+
+    # ---- per frame ----
+    def update(self, dt):
+        self.time += dt
+        self._update_stars(self.near, dt)
+        self._far_dt += dt
+        if self._far_dt >= self._far_due:
+            self._update_stars(self.far, self._far_dt)
+            self._partition()
+
+    def _far_patch(self, cx, cy):
+        # Screen area the far stars can land in: the field's bounds pulled
+        # towards the center by the largest projection scale among them.
+        if not self.far:
+            return pygame.Rect(0, 0, 0, 0)
+        k = 128.0 / min(s["z"] for s in self.far)
+        left = int(cx - cx * k) - _PATCH_PAD
+        top = int(cy - cy * k) - _PATCH_PAD
+        right = int(cx + (self.w - cx) * k) + _PATCH_PAD + 1
+        bottom = int(cy + (self.h - cy) * k) + _PATCH_PAD + 1
+        return pygame.Rect(left, top, right - left, bottom - top).clip(pygame.Rect(0, 0, self.w, self.h))
+
+    def draw(self, screen, lag=0.0):
+        screen.fill(self.bg)
+        size = screen.get_size()
+        state = (size, self.glow, self.bg)
+        if self._layer_state != state:
+            if self._layer is None or self._layer.get_size() != size:
+                self._layer = pygame.Surface(size).convert()
+            # Far stars are drawn where their last catch-up put them.
+            cx, cy = self._center(self.time - self._far_dt)
+            self._patch = self._far_patch(cx, cy)
+            self._layer.fill(self.bg, self._patch)
+            self._draw_stars(self._layer, self.far, cx, cy)
+            self._layer_state = state
+        if self._patch:
+            screen.blit(self._layer, self._patch.topleft, self._patch)
+        cx, cy = self._center(self.time - lag)
+        self._draw_stars(screen, self.near, cx, cy, self.STAR_SPEED * lag)
@@ -103,11 +103,17 @@ def rasterize_svg_to_cache(svg_path: str, out_png_path: str, size_px: int,
         tmp_svg = _rewrite_svg_with_color(svg_path, hexcol, stroke_mode="none")
         src = tmp_svg
 
+    # Render next to the target and rename, so another process (the data daemon
+    # or a second screen) never loads a half-written PNG.
+    tmp_png = f"{out_png_path}.{os.getpid()}.tmp"
     try:
         # -w: output width (px), aspect ratio preserved; -b none: transparent BG
-        cmd = [rsvg, "-w", str(int(size_px)), "-b", "none", "-o", out_png_path, src]
+        cmd = [rsvg, "-w", str(int(size_px)), "-b", "none", "-o", tmp_png, src]
         subprocess.run(cmd, check=True)
+        os.replace(tmp_png, out_png_path)
     finally:
+        if os.path.exists(tmp_png):
+            os.unlink(tmp_png)
         # Clean up temp if we made one
         if src != svg_path:
             try:
@@ -164,64 +170,81 @@ def load_logo_surface(filename: str, box_px: int, theme=None) -> pygame.Surface
         return None
 
 
-def build_logo_cache(beerdb: list[dict], size_px: int, theme):
+def ensure_logo_png(beer: dict, size_px: int, theme) -> Path | None:
+    """
+    Make sure the themed PNG for one beer's logo exists in logos/_cache and return
+    its path. Needs no display, so the shared data daemon can prerender for screens.
+    """
+    logo = beer.get("logoPath")
+    if not logo:
+        return None
+
+    # Resolve to a local SVG path first when possible; only fetch remote as fallback.
+    local_candidates: list[Path] = []
+    remote_url: str | None = None
+
+    if is_url(logo):
+        remote_url = logo
+        parsed_path = urlparse(logo).path.lstrip("/")
+        if parsed_path:
+            local_candidates.append(Path(parsed_path))
+            local_candidates.append(Path("logos") / Path(parsed_path).name)
+    else:
+        path_part = logo.lstrip("./").lstrip("/")
+        if "/" not in path_part:
+            path_part = f"logos/{path_part}"
+        local_candidates.append(Path(path_part))
+        remote_url = f"{SERVER_BASE.rstrip('/')}/{path_part}"
+
+    svg_path: Path | None = None
+    for cand in local_candidates:
+        if cand.exists():
+            svg_path = cand
+            break
+
+    if svg_path is None and remote_url:
+        try:
+            local_svg = fetch_binary(remote_url, subdir="logos")
+            svg_path = Path(local_svg)
+        except Exception as e:
+            print(f"[logo] fetch failed {logo}: {e}")
+            return None
+
+    if svg_path is None:
+        print(f"[logo] missing logo source for {logo}")
+        return None
+
+    # PNG cache name and render
+    stem = _logo_stem(logo)
+    cached_png = Path("logos/_cache") / f"{stem}_{theme.name}_{size_px}.png"
+
+    cached_png.parent.mkdir(parents=True, exist_ok=True)
+
+    if not cached_png.exists():
+        rasterize_svg_to_cache(str(svg_path), str(cached_png), size_px, color_rgb=getattr(theme, "accent", None))
+    return cached_png
+
+
+def build_logo_cache(beerdb: list[dict], size_px: int, theme, previous=None, rebuild_ids=()):
     """
     Preload one Surface per beer. Pull SVGs from server if needed, rasterize to PNG cache,
     and return a dict keyed by beer['id'].
+    Surfaces from `previous` are reused for beers not listed in rebuild_ids.
     """
     cache: dict[str, pygame.Surface] = {}
-    fill_rgb = getattr(theme, "accent", None)
+    previous = previous or {}
 
     for b in beerdb:
         beer_id = b.get("id")
-        logo = b.get("logoPath")
-        if not beer_id or not logo:
+        if not beer_id or not b.get("logoPath"):
             continue
-
-        # Resolve to a local SVG path first when possible; only fetch remote as fallback.
-        local_candidates: list[Path] = []
-        remote_url: str | None = None
-
-        if is_url(logo):
-            remote_url = logo
-            parsed_path = urlparse(logo).path.lstrip("/")
-            if parsed_path:
-                local_candidates.append(Path(parsed_path))
-                local_candidates.append(Path("logos") / Path(parsed_path).name)
-        else:
-            path_part = logo.lstrip("./").lstrip("/")
-            if "/" not in path_part:
-                path_part = f"logos/{path_part}"
-            local_candidates.append(Path(path_part))
-            remote_url = f"{SERVER_BASE.rstrip('/')}/{path_part}"
-
-        svg_path: Path | None = None
-        for cand in local_candidates:
-            if cand.exists():
-                svg_path = cand
-                break
-
-        if svg_path is None and remote_url:
-            try:
-                local_svg = fetch_binary(remote_url, subdir="logos")
-                svg_path = Path(local_svg)
-            except Exception as e:
-                print(f"[logo] fetch failed {logo}: {e}")
-                continue
-
-        if svg_path is None:
-            print(f"[logo] missing logo source for {logo}")
+        if beer_id in previous and beer_id not in rebuild_ids:
+            cache[beer_id] = previous[beer_id]
             continue
 
-        # PNG cache name and render
-        stem = _logo_stem(logo)
-        cached_png = Path("logos/_cache") / f"{stem}_{theme.name}_{size_px}.png"
-
-        cached_png.parent.mkdir(parents=True, exist_ok=True)
-
-        if not cached_png.exists():
-            rasterize_svg_to_cache(str(svg_path), str(cached_png), size_px, color_rgb=fill_rgb)
-
+        cached_png = ensure_logo_png(b, size_px, theme)
+        if cached_png is None:
+            continue
         surf = pygame.image.load(str(cached_png)).convert_alpha()
         cache[beer_id] = surf
 
@@ -0,0 +1,145 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus-text metrics. Recording is a bisect plus two in-place adds on
+# preallocated lists, so the render loop can afford it every frame; all the
+# formatting happens on the scrape thread.
+FRAME_BOUNDS = (0.001, 0.002, 0.004, 0.006, 0.008, 0.010, 0.0125, 0.015, 0.0175,
+                0.020, 0.025, 0.033, 0.050, 0.075, 0.100, 0.250)
+LATENCY_BOUNDS = (0.005, 0.010, 0.025, 0.050, 0.100, 0.250, 0.500, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(labels: dict, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    __slots__ = ("bounds", "labels", "counts", "total", "_bucket_labels")
+
+    def __init__(self, bounds, labels: dict):
+        self.bounds = tuple(bounds)
+        self.labels = labels
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        les = [f'le="{b}"' for b in self.bounds] + ['le="+Inf"']
+        self._bucket_labels = [_label_text(labels, le) for le in les]
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def _render(self, name: str, out: list):
+        running = 0
+        for label_text, count in zip(self._bucket_labels, list(self.counts)):
+            running += count
+            out.append(f"{name}_bucket{label_text} {running}")
+        out.append(f"{name}_sum{_label_text(self.labels)} {self.total}")
+        out.append(f"{name}_count{_label_text(self.labels)} {running}")
+
+
+class Counter:
+    __slots__ = ("labels", "value")
+
+    def __init__(self, labels: dict):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def _render(self, name: str, out: list):
+        out.append(f"{name}{_label_text(self.labels)} {self.value}")
+
+
+class _ValueFn:
+    __slots__ = ("labels", "fn")
+
+    def __init__(self, fn, labels: dict):
+        self.labels = labels
+        self.fn = fn
+
+    def _render(self, name: str, out: list):
+        try:
+            value = self.fn()
+            float(value)
+        except Exception:
+            return
+        out.append(f"{name}{_label_text(self.labels)} {value}")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: dict[str, tuple[str, str, list]] = {}
+
+    def _add(self, name: str, kind: str, help_text: str, metric):
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, []))
+            family[2].append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, bounds=FRAME_BOUNDS, **labels) -> Histogram:
+        return self._add(name, "histogram", help_text, Histogram(bounds, labels))
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        return self._add(name, "counter", help_text, Counter(labels))
+
+    # Evaluated at scrape time, so they cost the render loop nothing.
+    def gauge_fn(self, name: str, help_text: str, fn, **labels):
+        self._add(name, "gauge", help_text, _ValueFn(fn, labels))
+
+    def counter_fn(self, name: str, help_text: str, fn, **labels):
+        self._add(name, "counter", help_text, _ValueFn(fn, labels))
+
+    def render(self) -> str:
+        with self._lock:
+            families = [(n, k, h, list(m)) for n, (k, h, m) in self._families.items()]
+        out = []
+        for name, kind, help_text, metrics in families:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for metric in metrics:
+                metric._render(name, out)
+        return "\n".join(out) + "\n"
+
+
+METRICS = MetricsRegistry()
+POLL_SECONDS = METRICS.histogram(
+    "gk_poll_seconds", "Round trip of one taplist + beer DB poll.", LATENCY_BOUNDS
+)
+POLL_ERRORS = METRICS.counter("gk_poll_errors_total", "Polls where a fetch failed.")
+UI_REBUILDS = METRICS.counter("gk_ui_rebuilds_total", "Taplist layers built after startup.")
+UI_UPDATES_COALESCED = METRICS.counter(
+    "gk_ui_updates_coalesced_total", "Taplist updates folded into a later one before being built."
+)
+UI_LAYERS_DROPPED = METRICS.counter(
+    "gk_ui_layers_dropped_total", "Built taplist layers replaced before the render loop swapped them in."
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, bind: str = "0.0.0.0", registry: MetricsRegistry = METRICS):
+    server = ThreadingHTTPServer((bind, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,170 @@
+import numpy as np
+import pygame
+
+from systems.battle import LEGACY_PARITY_MODE, SMOOTH_TWINKLE, JSStarfield
+
+# NumPy backend for the starfield (GK_STARFIELD_BACKEND=numpy). Star state
+# lives in flat arrays, so update/respawn/projection run in batch, and stars
+# are drawn by blitting prerendered stamps in a single Surface.blits() call
+# instead of one or two pygame.draw.circle calls each. Stamps are drawn with
+# pygame.draw.circle at every brightness level, so each star looks as the
+# Python backend would draw it, up to brightness quantization. A seeded field
+# is a different field, though: stars are rolled from a numpy generator.
+BRIGHTNESS_LEVELS = 64
+_STAMP_KEY = (255, 0, 255)
+
+
+def _stamp(color, radius: int) -> pygame.Surface:
+    key = _STAMP_KEY if tuple(color) != _STAMP_KEY else (0, 255, 0)
+    size = radius * 2 + 1
+    surf = pygame.Surface((size, size)).convert()
+    surf.fill(key)
+    pygame.draw.circle(surf, color, (radius, radius), radius, 0)
+    surf.set_colorkey(key, pygame.RLEACCEL)
+    return surf
+
+
+class NumpyStarfield(JSStarfield):
+    """
+    Drop-in JSStarfield with the same layers, motion, twinkle and drifting
+    projection. Stars are kept grouped by layer in array order, which is also
+    the Python backend's draw order.
+    """
+
+    def __init__(self, w, h, bg_color=(0,0,0), rng=None):
+        self._stamps = {}
+        super().__init__(w, h, bg_color, rng=rng)
+
+    # ---- state ----
+    def _np_rng(self):
+        # Seeded from the shared RNG, so a seeded battlefield stays reproducible.
+        return np.random.default_rng(self.rng.getrandbits(64))
+
+    def _init_stars(self):
+        self.np_rng = self._np_rng()
+        counts = [self._layer_count(L) for L in self.layers]
+        self.layer_idx = np.repeat(np.arange(len(self.layers)), counts)
+        self._sync_layer_arrays()
+        n = len(self.layer_idx)
+        r = self.np_rng.random
+        self.z = r(n) * (self.zmax - self.zmin) + self.zmin
+        self.x = r(n) * self.w
+        self.y = r(n) * self.h
+        self.o = r(n)
+        self.ov = r(n) * 1.2 - 0.6
+        return None
+
+    def _sync_layer_arrays(self):
+        self.zmin = np.array([L["zmin"] for L in self.layers])[self.layer_idx]
+        self.zmax = np.array([L["zmax"] for L in self.layers])[self.layer_idx]
+        self.blur = np.array([L["blur"] for L in self.layers], dtype=bool)[self.layer_idx]
+
+    def resize(self, w, h):
+        self.w, self.h = w, h
+        self.layers = self._gen_layers()
+        self._stamps.clear()
+        self.stars = self._init_stars()
+
+    def rescale(self, w, h):
+        fx, fy = w / self.w, h / self.h
+        self.w, self.h = w, h
+        for L in self.layers:
+            L["zmin"] *= fx
+            L["zmax"] *= fx
+        self.zmin *= fx
+        self.zmax *= fx
+        self.x *= fx
+        self.y *= fy
+        self.z *= fx
+
+    def set_density(self, density):
+        # Keep the leading stars of each layer and top up with fresh ones.
+        self.density = max(0.05, min(1.0, density))
+        keep = []
+        fresh = []
+        for i, L in enumerate(self.layers):
+            idx = np.flatnonzero(self.layer_idx == i)
+            want = self._layer_count(L)
+            keep.append(idx[:want])
+            fresh.append(max(0, want - len(idx)))
+
+        parts = {name: [] for name in ("layer_idx", "x", "y", "z", "o", "ov")}
+        r = self.np_rng.random
+        for i, (idx, extra) in enumerate(zip(keep, fresh)):
+            L = self.layers[i]
+            parts["layer_idx"].append(np.concatenate([self.layer_idx[idx], np.full(extra, i)]))
+            parts["x"].append(np.concatenate([self.x[idx], r(extra) * self.w]))
+            parts["y"].append(np.concatenate([self.y[idx], r(extra) * self.h]))
+            parts["z"].append(np.concatenate([self.z[idx], r(extra) * (L["zmax"] - L["zmin"]) + L["zmin"]]))
+            parts["o"].append(np.concatenate([self.o[idx], r(extra)]))
+            parts["ov"].append(np.concatenate([self.ov[idx], r(extra) * 1.2 - 0.6]))
+        for name, chunks in parts.items():
+            setattr(self, name, np.concatenate(chunks))
+        self._sync_layer_arrays()
+
+    # ---- per frame ----
+    def update(self, dt):
+        self.time += dt
+        self.z -= self.STAR_SPEED * dt
+        dead = np.flatnonzero(self.z <= 0)
+        if len(dead):
+            r = self.np_rng.random
+            n = len(dead)
+            self.z[dead] = r(n) * (self.zmax[dead] - self.zmin[dead]) + self.zmin[dead]
+            self.x[dead] = r(n) * self.w
+            self.y[dead] = r(n) * self.h
+            self.ov[dead] = r(n) * 1.2 - 0.6
+
+        if LEGACY_PARITY_MODE and not SMOOTH_TWINKLE:
+            self.o += (self.np_rng.random(len(self.o)) - 0.5) * 0.05 * dt * 60.0
+            np.clip(self.o, 0.1, 1.0, out=self.o)
+        else:
+            self.o += self.ov * dt
+            low = self.o < 0.1
+            high = self.o > 1.0
+            self.o[low] = 0.1
+            self.ov[low] = np.abs(self.ov[low])
+            self.o[high] = 1.0
+            self.ov[high] = -np.abs(self.ov[high])
+
+    def _stamp_table(self, size: int):
+        # Per layer: (core stamp per brightness level, glow stamp, glow radius).
+        table = self._stamps.get(size)
+        if table is None:
+            glow_r = max(2, int(size * 3))
+            table = []
+            for L in self.layers:
+                r, g, b = L["color"]
+                glow = _stamp((min(255, int(r * 0.45)), min(255, int(g * 0.45)), min(255, int(b * 0.45))), glow_r)
+                row = []
+                for level in range(BRIGHTNESS_LEVELS):
+                    bright = 0.65 + (level / (BRIGHTNESS_LEVELS - 1)) * 0.35
+                    row.append(_stamp((int(r * bright), int(g * bright), int(b * bright)), size))
+                table.append((row, glow, glow_r))
+            self._stamps[size] = table
+        return table
+
+    def draw(self, screen, lag=0.0):
+        screen.fill(self.bg)
+        centerX, centerY = self._center(self.time - lag)
+
+        z = self.z + self.STAR_SPEED * lag if lag else self.z
+        k = 128.0 / z
+        # Stars very close to the camera project far off screen; clamp so the
+        # blit coordinates stay in C int range.
+        px = np.clip((self.x - centerX) * k + centerX, -64, self.w + 64).astype(np.int64)
+        py = np.clip((self.y - centerY) * k + centerY, -64, self.h + 64).astype(np.int64)
+        sizes = np.maximum(1, ((1.0 - z / self.w) * 2).astype(np.int64))
+        levels = np.clip(np.rint(self.o * (BRIGHTNESS_LEVELS - 1)), 0, BRIGHTNESS_LEVELS - 1).astype(np.int64)
+        glow = self.blur if self.glow else np.zeros(len(self.blur), dtype=bool)
+
+        tables = {size: self._stamp_table(size) for size in np.unique(sizes).tolist()}
+        seq = []
+        for i, size, x, y, lvl, g in zip(
+            self.layer_idx.tolist(), sizes.tolist(), px.tolist(), py.tolist(), levels.tolist(), glow.tolist()
+        ):
+            row, glow_stamp, glow_r = tables[size][i]
+            if g:
+                seq.append((glow_stamp, (x - glow_r, y - glow_r)))
+            seq.append((row[lvl], (x - size, y - size)))
+        screen.blits(seq, doreturn=False)
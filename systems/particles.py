@@ -0,0 +1,149 @@
+import numpy as np
+import pygame
+
+from systems.battle import draw_pixel_block, draw_pixel_trail
+
+# Array-backed exhaust particles for JSBattle (the default when numpy is
+# available; GK_PARTICLE_BACKEND=python keeps the per-dict list). Particle
+# state sits in preallocated arrays, dead particles are compacted out in one
+# masked copy, and each particle is drawn as one cached stamp holding its trail, halo and core, so a
+# frame is a single blit batch however many particles are alive.
+ALPHA_LEVELS = 16
+# Distinct stamps depend on thrust direction, so the cache is bounded and
+# simply dropped when a long run fills it.
+MAX_STAMPS = 4096
+_STAMP_KEY = (255, 0, 255)
+_FIELDS = ("x", "y", "vx", "vy", "r", "a")
+
+
+def _stamp(r_core: int, r_halo: int, dx: int, dy: int, a: float, glow: bool):
+    # Same blocks _draw_particles used to fill on screen, drawn around (0, 0)
+    # and offset into a small colorkey surface.
+    pad = max(r_halo, r_core) + 1
+    w = abs(dx) + pad * 2 + 1
+    h = abs(dy) + pad * 2 + 1
+    ox = pad + max(0, -dx)
+    oy = pad + max(0, -dy)
+    surf = pygame.Surface((w, h)).convert()
+    surf.fill(_STAMP_KEY)
+    trail_size = max(1, r_core // 2)
+    if not glow:
+        trail = (int(40 * a), int(120 * a), int(220 * a))
+        core = (int(150 * a), int(230 * a), int(255 * a))
+        draw_pixel_trail(surf, trail, ox, oy, ox + dx, oy + dy, trail_size)
+        draw_pixel_block(surf, core, ox - r_core // 2, oy - r_core // 2, r_core)
+    else:
+        outer = (int(20 * a), int(90 * a), int(220 * a))
+        core = (int(170 * a), int(235 * a), int(255 * a))
+        hot = (int(255 * a), int(255 * a), int(220 * a))
+        draw_pixel_trail(surf, outer, ox, oy, ox + dx, oy + dy, trail_size)
+        draw_pixel_block(surf, outer, ox - r_halo // 2, oy - r_halo // 2, r_halo)
+        draw_pixel_block(surf, core, ox - r_core // 2, oy - r_core // 2, r_core)
+        hot_size = max(1, r_core // 2)
+        draw_pixel_block(surf, hot, ox - hot_size // 2, oy - hot_size // 2, hot_size)
+    surf.set_colorkey(_STAMP_KEY, pygame.RLEACCEL)
+    return surf, ox, oy
+
+
+class ArrayParticles:
+    """
+    Exhaust particle store with a fixed capacity. Live particles occupy the
+    first n slots of each array, oldest first. Compaction keeps that order
+    (swap-remove would put fresh particles under older trails), and since
+    particles fade in spawn order the dead ones are almost always a prefix.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        for name in _FIELDS:
+            setattr(self, name, np.zeros(self.capacity))
+        self.n = 0
+        self._stamps = {}
+
+    def __len__(self):
+        return self.n
+
+    def add(self, x, y, vx, vy, r):
+        i = self.n
+        if i >= self.capacity:
+            return
+        self.x[i] = x; self.y[i] = y
+        self.vx[i] = vx; self.vy[i] = vy
+        self.r[i] = r
+        self.a[i] = 1.0
+        self.n = i + 1
+
+    def _compact(self, alive):
+        n = self.n
+        keep = int(np.count_nonzero(alive))
+        if keep == n:
+            return
+        if alive[n - keep:].all():
+            # Only the oldest died: shift the survivors down.
+            for name in _FIELDS:
+                arr = getattr(self, name)
+                arr[:keep] = arr[n - keep:n]
+        else:
+            for name in _FIELDS:
+                arr = getattr(self, name)
+                arr[:keep] = arr[:n][alive]
+        self.n = keep
+
+    def update(self, dt, w, h, decay, fade, margin):
+        n = self.n
+        if not n:
+            return
+        x, y, a = self.x[:n], self.y[:n], self.a[:n]
+        x += self.vx[:n] * dt
+        y += self.vy[:n] * dt
+        self.r[:n] *= decay
+        a -= fade
+        alive = (a > 0) & (x >= -margin) & (x <= w + margin) & (y >= -margin) & (y <= h + margin)
+        self._compact(alive)
+
+    def truncate(self, count: int):
+        # Keep the newest particles, like the list slice did.
+        if self.n <= count:
+            return
+        alive = np.zeros(self.n, dtype=bool)
+        alive[self.n - count:] = True
+        self._compact(alive)
+
+    def rescale(self, fx, fy):
+        self.x[:self.n] *= fx
+        self.y[:self.n] *= fy
+
+    def draw(self, screen, w, h, glow):
+        n = self.n
+        if not n:
+            return
+        px = self.x[:n].astype(np.int64)
+        py = self.y[:n].astype(np.int64)
+        vx, vy = self.vx[:n], self.vy[:n]
+        a = np.clip(self.a[:n], 0.0, 1.0)
+        r_core = np.maximum(1, self.r[:n].astype(np.int64))
+        r_halo = np.maximum(r_core + 1, (self.r[:n] * 1.8).astype(np.int64)) if glow else r_core
+        trail_len = np.clip(((np.abs(vx) + np.abs(vy)) * 0.55 + r_core).astype(np.int64), 2, 20) * 0.85
+        dx = (self.x[:n] - vx * trail_len).astype(np.int64) - px
+        dy = (self.y[:n] - vy * trail_len).astype(np.int64) - py
+        level = np.rint(a * (ALPHA_LEVELS - 1)).astype(np.int64)
+        visible = (px >= -16) & (px <= w + 16) & (py >= -16) & (py <= h + 16)
+
+        stamps = self._stamps
+        if len(stamps) > MAX_STAMPS:
+            stamps.clear()
+        seq = []
+        for x, y, rc, rh, sx, sy, lvl in zip(
+            px[visible].tolist(), py[visible].tolist(), r_core[visible].tolist(), r_halo[visible].tolist(),
+            dx[visible].tolist(), dy[visible].tolist(), level[visible].tolist(),
+        ):
+            key = (rc, rh, sx, sy, lvl, glow)
+            stamp = stamps.get(key)
+            if stamp is None:
+                stamp = stamps[key] = _stamp(rc, rh, sx, sy, lvl / (ALPHA_LEVELS - 1), glow)
+            surf, ox, oy = stamp
+            seq.append((surf, (x - ox, y - oy)))
+        if hasattr(screen, "fblits"):
+            screen.fblits(seq)
+        else:
+            screen.blits(seq, doreturn=False)
@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from systems.fetch import wait_for_change
+from systems.metrics import POLL_ERRORS, POLL_SECONDS
+from systems.signature import taplist_signature
+from systems.taplist import (
+    BeerIndex,
+    document_digest,
+    load_json_if_changed,
+    merge_taplist_with_db,
+    taplist_ids,
+)
+
+
+def _http_deadline(timeout_s: float) -> float:
+    # requests applies its timeout per phase (connect, then each read), so a
+    # healthy call can run past it; leave room before abandoning the worker.
+    return timeout_s * 2 + 1.0
+
+
+class TaplistPoller:
+    """
+    Watches one taplist plus the beer DB from a background asyncio loop.
+    Each tick fetches both documents at the same time, so a slow tick costs the
+    slowest request instead of the sum, and hands merged results to
+    on_update(refresh_token, merged). Requests run on a small executor because
+    requests (the HTTP client the Pis already ship) is blocking; every worker
+    keeps its own keep-alive session.
+    """
+
+    def __init__(
+        self,
+        taplist_src: str,
+        beerdb_src: str | None,
+        taplist: dict,
+        beer_index: BeerIndex,
+        on_update,
+        log,
+        poll_seconds: float,
+        taplist_timeout_s: float,
+        beerdb_timeout_s: float,
+        feed_url: str | None = None,
+        feed_wait_s: float = 20.0,
+        feed_retry_s: float = 60.0,
+        trust_server_bytes: bool = False,
+        publish_first: bool = False,
+    ):
+        self.taplist_src = taplist_src
+        self.beerdb_src = beerdb_src
+        self.on_update = on_update
+        self.log = log
+        self.poll_seconds = poll_seconds
+        self.taplist_timeout_s = taplist_timeout_s
+        self.beerdb_timeout_s = beerdb_timeout_s
+        self.feed_url = feed_url
+        self.feed_wait_s = feed_wait_s
+        self.feed_retry_s = feed_retry_s
+        self.trust_server_bytes = trust_server_bytes
+
+        self.taplist = taplist
+        self.beer_index = beer_index
+        self.refresh_token = taplist.get("refreshToken")
+        self.taplist_sig = self._taplist_sig(taplist)
+        # Validator of the last applied copy of each document. A fetch that
+        # was abandoned may still land in the shared caches, so changes are
+        # judged against these.
+        self._applied = {src: document_digest(src) for src in (taplist_src, beerdb_src) if src}
+        # Beer versions of the taps as last handed to on_update. Without a
+        # beerdb_src another poller (BeerDbPoller) updates the shared index,
+        # so changes are found by comparing against these.
+        self._published = beer_index.versions(taplist_ids(taplist))
+        # Taking over from another source (the data daemon) mid-run: the
+        # screen no longer shows the startup state, so fetch straight away and
+        # publish the first full result even if nothing changed.
+        self.publish_first = publish_first
+        if publish_first:
+            self._applied = dict.fromkeys(self._applied)
+            self._published = None
+
+        self._feed_params = {"src": Path(taplist_src).name, "token": "", "dbv": ""}
+        self._feed_retry_at = 0.0 if feed_url else float("inf")
+        self._feed_ok = True
+        self._errors = 0
+
+        # taplist, beer DB and the long-poll feed can all be in flight at once.
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="taplist-poll")
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop_event: asyncio.Event | None = None
+        self._stop_requested = threading.Event()
+
+    # ---- lifecycle ----
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="taplist-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, join_timeout_s: float = 1.0):
+        self._stop_requested.set()
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # loop already closed
+        if self._thread is not None:
+            self._thread.join(join_timeout_s)
+        # Blocking requests can't be interrupted; just don't wait for them.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._stop_event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._stop_requested.is_set():
+            return
+        worker = asyncio.create_task(self._poll_loop())
+        stopper = asyncio.create_task(self._stop_event.wait())
+        await asyncio.wait({worker, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (worker, stopper):
+            task.cancel()
+        await asyncio.gather(worker, stopper, return_exceptions=True)
+
+    async def _call(self, timeout_s: float, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self._executor, fn, *args), timeout_s)
+
+    # ---- polling ----
+    async def _poll_loop(self):
+        if self.publish_first:
+            await self._poll_once()
+        while True:
+            if not await self._wait_next_tick():
+                continue
+            await self._poll_once()
+
+    async def _wait_next_tick(self) -> bool:
+        # Returns False when the feed timed out with nothing new (skip this poll).
+        if time.monotonic() < self._feed_retry_at:
+            await asyncio.sleep(self.poll_seconds)
+            return True
+
+        try:
+            change = await self._call(
+                self.feed_wait_s + self.taplist_timeout_s * 2,
+                wait_for_change,
+                self.feed_url,
+                dict(self._feed_params),
+                self.feed_wait_s,
+                self.taplist_timeout_s,
+            )
+            if not self._feed_ok:
+                self.log("[debug] change feed restored")
+            self._feed_ok = True
+        except Exception as exc:
+            self._feed_retry_at = time.monotonic() + self.feed_retry_s
+            if self._feed_ok:
+                self.log(f"[warn] change feed unavailable, falling back to polling: {exc}")
+            self._feed_ok = False
+            return True
+
+        if change is None:
+            return False
+        # Track what the feed reported so a change we can't fetch yet doesn't spin.
+        self._feed_params["token"] = str(change.get("refreshToken") or "")
+        self._feed_params["dbv"] = str(change.get("dbVersion") or "")
+        return True
+
+    async def _fetch(self, src: str, timeout_s: float):
+        validator, data = await self._call(
+            _http_deadline(timeout_s), load_json_if_changed, src, timeout_s, self._applied[src]
+        )
+        self._applied[src] = validator
+        return data
+
+    def _taplist_sig(self, taplist: dict):
+        if self.trust_server_bytes:
+            # Same bytes <=> same content; the response hash is all we need.
+            return document_digest(self.taplist_src)
+        return taplist_signature(taplist)
+
+    async def _poll_once(self):
+        started = time.perf_counter()
+        fetches = [self._fetch(self.taplist_src, self.taplist_timeout_s)]
+        if self.beerdb_src:
+            fetches.append(self._fetch(self.beerdb_src, self.beerdb_timeout_s))
+        results = await asyncio.gather(*fetches, return_exceptions=True)
+        POLL_SECONDS.observe(time.perf_counter() - started)
+        latest = [None if isinstance(r, Exception) else r for r in results]
+        latest_taplist = latest[0]
+        latest_beerdb = latest[1] if len(latest) > 1 else None
+
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            POLL_ERRORS.inc()
+            self._errors += 1
+            if self._errors <= 3 or self._errors % 10 == 0:
+                detail = "; ".join(str(exc) or type(exc).__name__ for exc in failures)
+                self.log(f"[warn] poll fetch failed ({self._errors}): {detail}")
+        else:
+            self._errors = 0
+
+        tap_changed = False
+        if isinstance(latest_taplist, dict):
+            latest_token = latest_taplist.get("refreshToken")
+            latest_sig = self._taplist_sig(latest_taplist)
+            if latest_token != self.refresh_token or latest_sig != self.taplist_sig:
+                self.taplist = latest_taplist
+                self.refresh_token = latest_token
+                self.taplist_sig = latest_sig
+                tap_changed = True
+
+        if isinstance(latest_beerdb, list):
+            self.beer_index.update(latest_beerdb)
+        if self._published is None and not isinstance(latest_taplist, dict):
+            # publish_first: wait for a fetched taplist, not the startup one.
+            return
+        # Archived beers change without touching the screen; only taps matter.
+        versions = self.beer_index.versions(taplist_ids(self.taplist))
+        beerdb_changed = versions != self._published
+
+        if not tap_changed and not beerdb_changed:
+            return
+
+        try:
+            merged = merge_taplist_with_db(self.taplist, self.beer_index)
+            self.on_update(self.refresh_token, merged)
+            self._published = versions
+        except Exception as exc:
+            # Keep rendering smooth even if a bad document slips through.
+            self.log(f"[warn] poll merge failed: {exc}")
+
+
+class BeerDbPoller:
+    """
+    Polls the beer DB alone for a process that serves several taplists (the
+    data daemon). Each tick is one fetch, and this poller is the only one that
+    updates the shared BeerIndex; the TaplistPollers (built without a
+    beerdb_src) see the new version stamps on their next tick. Runs on a plain
+    thread: there is only one request per tick, so nothing is gained from the
+    asyncio loop.
+    """
+
+    def __init__(self, beerdb_src: str, beer_index: BeerIndex, log, poll_seconds: float, timeout_s: float):
+        self.beerdb_src = beerdb_src
+        self.beer_index = beer_index
+        self.log = log
+        self.poll_seconds = poll_seconds
+        self.timeout_s = timeout_s
+        self._applied = document_digest(beerdb_src)
+        self._errors = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="beerdb-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, join_timeout_s: float = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(join_timeout_s)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.poll_once()
+
+    def poll_once(self):
+        started = time.perf_counter()
+        try:
+            validator, latest = load_json_if_changed(self.beerdb_src, self.timeout_s, self._applied)
+        except Exception as exc:
+            POLL_ERRORS.inc()
+            self._errors += 1
+            if self._errors <= 3 or self._errors % 10 == 0:
+                self.log(f"[warn] beer DB fetch failed ({self._errors}): {str(exc) or type(exc).__name__}")
+            return
+        finally:
+            POLL_SECONDS.observe(time.perf_counter() - started)
+        self._errors = 0
+        self._applied = validator
+        if latest is not None:
+            self.beer_index.update(latest)
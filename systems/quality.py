@@ -0,0 +1,143 @@
+from dataclasses import dataclass, replace
+
+from systems.framehist import FrameHistogram
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    render_scale: float
+    star_density: float
+    particle_scale: float
+    glow: bool
+    # Fraction of GK_SIM_HZ to simulate at; frames are still drawn at full rate.
+    sim_rate: float
+
+
+# Lowest to highest. "medium" matches the stock desktop look at the default
+# GK_RENDER_SCALE of 0.75.
+QUALITY_LEVELS = (
+    QualityLevel("low", render_scale=0.5, star_density=0.5, particle_scale=0.25, glow=False, sim_rate=0.5),
+    QualityLevel("medium-low", render_scale=0.6, star_density=0.75, particle_scale=0.5, glow=False, sim_rate=1.0),
+    QualityLevel("medium", render_scale=0.75, star_density=1.0, particle_scale=1.0, glow=True, sim_rate=1.0),
+    QualityLevel("high", render_scale=0.9, star_density=1.0, particle_scale=1.0, glow=True, sim_rate=1.0),
+    QualityLevel("full", render_scale=1.0, star_density=1.0, particle_scale=1.0, glow=True, sim_rate=1.0),
+)
+
+
+def cap_levels(
+    levels=QUALITY_LEVELS, glow: bool = True, particle_scale: float = 1.0, render_scale: float = 1.0
+) -> tuple:
+    # Never above the look the display was started with: a perf-mode Pi keeps
+    # glow off and its particle budget, nothing renders above GK_RENDER_SCALE,
+    # and the governor only trades below that. Levels past the first one that
+    # reaches render_scale would all be the same, so they're dropped.
+    out = []
+    for level in levels:
+        out.append(replace(
+            level,
+            render_scale=min(level.render_scale, render_scale),
+            glow=level.glow and glow,
+            particle_scale=min(level.particle_scale, particle_scale),
+        ))
+        if level.render_scale >= render_scale - 1e-6:
+            break
+    return tuple(out)
+
+
+def level_for_scale(render_scale: float, levels=QUALITY_LEVELS) -> int:
+    # Highest level that doesn't render above the configured scale.
+    best = 0
+    for i, level in enumerate(levels):
+        if level.render_scale <= render_scale + 1e-6:
+            best = i
+    return best
+
+
+class QualityGovernor:
+    """
+    Steps through quality levels to keep p95 frame time under the frame budget.
+    Frame times go into a FrameHistogram; once it holds a window of frames
+    its p95 is judged and it starts over, so each verdict covers fresh frames.
+    Drops a level once p95 has been over down_ratio * budget for down_hold_s,
+    and only climbs back after up_hold_s under up_ratio * budget. A climb that
+    has to be undone soon after doubles the wait before the next one.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float,
+        levels=QUALITY_LEVELS,
+        start_level: int = 0,
+        window: int = 120,
+        down_ratio: float = 0.95,
+        up_ratio: float = 0.70,
+        down_hold_s: float = 2.0,
+        up_hold_s: float = 10.0,
+        eval_interval_s: float = 0.5,
+    ):
+        self.budget_ms = budget_ms
+        self.levels = tuple(levels)
+        self.index = max(0, min(len(self.levels) - 1, start_level))
+        self.window = window
+        self.hist = FrameHistogram(max_ms=1000.0)
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.down_hold_s = down_hold_s
+        self.base_up_hold_s = up_hold_s
+        self.up_hold_s = up_hold_s
+        self.eval_interval_s = eval_interval_s
+
+        self.p95 = 0.0
+        self._over_since = None
+        self._under_since = None
+        self._last_eval = 0.0
+        self._last_raise = None
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def observe(self, frame_ms: float):
+        self.hist.record(frame_ms)
+
+    def update(self, now: float) -> QualityLevel | None:
+        """Returns the new level when it changes, otherwise None."""
+        if now - self._last_eval < self.eval_interval_s:
+            return None
+        self._last_eval = now
+        # Wait for a full window after each change so we judge the new level.
+        if self.hist.count < self.window:
+            return None
+        self.p95 = self.hist.percentile(0.95)
+        self.hist.reset()
+
+        if self.p95 > self.budget_ms * self.down_ratio:
+            self._under_since = None
+            if self._over_since is None:
+                self._over_since = now
+            if now - self._over_since >= self.down_hold_s and self.index > 0:
+                if self._last_raise is not None and now - self._last_raise < self.up_hold_s * 2:
+                    self.up_hold_s = min(self.up_hold_s * 2, 300.0)
+                return self._step(-1)
+        elif self.p95 < self.budget_ms * self.up_ratio:
+            self._over_since = None
+            if self._under_since is None:
+                self._under_since = now
+            if now - self._under_since >= self.up_hold_s and self.index < len(self.levels) - 1:
+                self._last_raise = now
+                return self._step(1)
+        else:
+            self._over_since = None
+            self._under_since = None
+            if self._last_raise is not None and now - self._last_raise > self.up_hold_s * 2:
+                # The last climb held up; back to the normal wait.
+                self.up_hold_s = self.base_up_hold_s
+        return None
+
+    def _step(self, delta: int) -> QualityLevel:
+        self.index += delta
+        self.hist.reset()
+        self._over_since = None
+        self._under_since = None
+        return self.level
@@ -0,0 +1,134 @@
+import gzip
+import json
+import zlib
+
+# Scene timelines for reproducible perf runs. The battlefield draws all of its
+# randomness from one seeded RNG, so a recording only needs the seed, every
+# frame's dt and the things that came from outside the simulation: forced
+# spawns, draw toggles, quality changes and taplist updates. The rolls that
+# decide what the battle costs are stored as well: every ship spawn (mode,
+# scale and motion, keyed by simulation step) and every combat bullet
+# interval. A replay plays those back instead of rolling them, so its load
+# follows the recording even where the RNG stream doesn't (a different
+# starfield backend, say).
+#
+# The file is gzipped JSON lines. Every event carries "f", the frame it was
+# applied before; dt values come in chunks, in frame order.
+FORMAT_VERSION = 2
+# Frames per dt chunk; each chunk is sync-flushed, so a killed display loses
+# at most this many frames of its recording.
+DT_CHUNK = 120
+
+
+def beer_records(beers) -> list[dict]:
+    return [dict(b) for b in beers]
+
+
+class SceneRecorder:
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._dts: list[int] = []
+        self.frame = 0
+        self._write({"t": "header", "version": FORMAT_VERSION, **header})
+        self._file.flush()
+
+    def _write(self, event: dict):
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def _flush_dts(self):
+        if self._dts:
+            self._write({"t": "dt", "v": self._dts})
+            self._dts = []
+
+    def event(self, kind: str, **fields):
+        self._write({"t": kind, "f": self.frame, **fields})
+
+    def taplist(self, refresh_token, beers):
+        self.event("taplist", token=refresh_token, beers=beer_records(beers))
+
+    def frame_done(self, dt: float):
+        # dt is stored in whole microseconds; replays use the rounded value.
+        self._dts.append(int(round(dt * 1_000_000)))
+        self.frame += 1
+        if len(self._dts) >= DT_CHUNK:
+            self._flush_dts()
+            self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush_dts()
+        self._write({"t": "end", "f": self.frame})
+        self._file.close()
+
+
+class SceneTimeline:
+    """
+    A loaded recording: header fields, per-frame dt (seconds), events grouped
+    by the frame they apply before, and the battle's own spawns and bullet
+    intervals in order. A file cut short (power loss on a Pi) loads up to the
+    last complete line; `complete` says which it was.
+    """
+
+    def __init__(
+        self,
+        header: dict,
+        dts: list[float],
+        events: dict[int, list[dict]],
+        spawns: list[dict],
+        bullet_intervals: list[int],
+        complete: bool,
+    ):
+        self.header = header
+        self.dts = dts
+        self.events = events
+        self.spawns = spawns
+        self.bullet_intervals = bullet_intervals
+        self.complete = complete
+
+    @property
+    def seed(self) -> int:
+        return self.header["seed"]
+
+    def __len__(self):
+        return len(self.dts)
+
+
+def load_timeline(path: str) -> SceneTimeline:
+    header = None
+    dts: list[float] = []
+    events: dict[int, list[dict]] = {}
+    spawns: list[dict] = []
+    bullet_intervals: list[int] = []
+    complete = False
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break
+                kind = event.get("t")
+                if kind == "header":
+                    if event.get("version") != FORMAT_VERSION:
+                        raise ValueError(f"unsupported recording version {event.get('version')!r}")
+                    header = event
+                elif kind == "dt":
+                    dts.extend(us / 1_000_000 for us in event["v"])
+                elif kind == "spawn":
+                    spawns.append(event)
+                elif kind == "bullets":
+                    bullet_intervals.append(event["interval"])
+                elif kind == "end":
+                    complete = True
+                else:
+                    events.setdefault(event["f"], []).append(event)
+    except (EOFError, zlib.error, gzip.BadGzipFile):
+        if header is None:
+            raise
+
+    if header is None:
+        raise ValueError(f"{path} is not a scene recording")
+    return SceneTimeline(header, dts, events, spawns, bullet_intervals, complete)
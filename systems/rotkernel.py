@@ -0,0 +1,165 @@
+import math
+
+import numpy as np
+import pygame
+
+from systems.spriteatlas import ATLAS_WIDTH, RotationAtlas
+
+# NumPy rotation kernel for the prewarmed ship/alien atlas. Rotations are
+# sampled straight from the 15x15 pixel-art grids: for every output pixel the
+# inverse rotation gives a point on the sprite, and the grid cell under it is
+# the colour (nearest neighbour, so edges stay hard). Angles are done in
+# batches of index arrays, and the cropped results are written directly into
+# the atlas pixels, with no intermediate scaled or rotated surfaces.
+
+# Angles per pass; bounds the index arrays to a few MB at scale 4.
+ANGLE_CHUNK = 16
+# Fixed-point fraction bits for the inverse mapping. Coordinates are in grid
+# cells, so for small grids they fit int16, which halves the memory traffic.
+_SHIFT = 10
+_ONE = 1 << _SHIFT
+
+
+def grid_pixels(rows, color_of) -> np.ndarray:
+    """
+    (h, w) uint32 from a grid of cells, each the colour as mapped for an
+    atlas surface (0 is transparent); color_of(cell) -> RGB or None.
+    """
+    fmt = RotationAtlas.new_surface((1, 1))
+    h, w = len(rows), len(rows[0])
+    out = np.zeros((h, w), dtype=np.uint32)
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            rgb = color_of(cell)
+            if rgb is not None:
+                out[r, c] = fmt.map_rgb((*rgb, 255)) & 0xFFFFFFFF
+    return out
+
+
+def rotate_grid(grid: np.ndarray, cell_px: int, angles):
+    """
+    Rotate the grid, upscaled by cell_px, clockwise by each angle (degrees).
+    grid comes from grid_pixels. Returns [(pixel array indexed [x, y], dx, dy)],
+    cropped to visible pixels, with dx/dy the crop's offset from the sprite center (see
+    blit_rotation).
+    """
+    gh, gw = grid.shape[:2]
+    # The grid inside a one-cell transparent edge. Samples are clamped onto
+    # it per axis, so anything that lands off the sprite reads transparent.
+    border = 1
+    lut = np.zeros((gh + 2 * border, gw + 2 * border), dtype=np.uint32)
+    lut[border:border + gh, border:border + gw] = grid
+    rows, cols = np.nonzero(grid)
+    if len(rows) == 0:
+        return [(np.zeros((1, 1), dtype=np.uint32), 0.0, 0.0) for _ in angles]
+    # Visible cells' extent in pixels from the sprite center.
+    extent = (
+        (cols.min() - gw / 2) * cell_px, (cols.max() + 1 - gw / 2) * cell_px,
+        (rows.min() - gh / 2) * cell_px, (rows.max() + 1 - gh / 2) * cell_px,
+    )
+
+    out = []
+    angles = list(angles)
+    for start in range(0, len(angles), ANGLE_CHUNK):
+        out.extend(_rotate_chunk(lut, border, gw, gh, cell_px, extent, angles[start:start + ANGLE_CHUNK]))
+    return out
+
+
+def _fixed(values, dtype) -> np.ndarray:
+    return np.rint(values * _ONE).astype(dtype)
+
+
+def _rotate_chunk(lut, border, gw, gh, cell_px, extent, angles):
+    rad = np.radians(np.asarray(angles, dtype=np.float64))
+    cos, sin = np.cos(rad), np.sin(rad)
+    # Box covering the rotated visible cells for every angle in the chunk.
+    x0, x1, y0, y1 = extent
+    corners = [(x0, y0), (x1, y0), (x0, y1), (x1, y1)]
+    xs = [x * cos - y * sin for x, y in corners]
+    ys = [x * sin + y * cos for x, y in corners]
+    bx0 = math.floor(min(v.min() for v in xs)) - 1
+    by0 = math.floor(min(v.min() for v in ys)) - 1
+    ax = np.arange(bx0, math.ceil(max(v.max() for v in xs)) + 1) + 0.5
+    ay = np.arange(by0, math.ceil(max(v.max() for v in ys)) + 1) + 0.5
+    cos, sin = cos[:, None], sin[:, None]
+
+    # Inverse of the clockwise screen rotation (x, y) -> (x cos - y sin, x sin + y cos),
+    # in grid cells. It's separable (an x term plus a y term), so per pixel
+    # this is one fixed-point add and a shift (arithmetic, so it floors
+    # negative values too), then a clamp onto the lut's transparent edge.
+    lh, lw = lut.shape
+    # Largest fixed-point value either sum can reach.
+    reach = max(lh, lw) + (np.abs(ax).max() + np.abs(ay).max()) / cell_px
+    dtype = np.int16 if reach * _ONE < 1 << 15 and lut.size < 1 << 15 else np.int32
+    col_x = _fixed(ax * cos / cell_px + (gw / 2 + border), dtype)
+    col_y = _fixed(ay * sin / cell_px, dtype)
+    row_x = _fixed(-ax * sin / cell_px + (gh / 2 + border), dtype)
+    row_y = _fixed(ay * cos / cell_px, dtype)
+    col = col_x[:, :, None] + col_y[:, None, :]
+    row = row_x[:, :, None] + row_y[:, None, :]
+    col >>= _SHIFT
+    row >>= _SHIFT
+    np.clip(col, 0, lw - 1, out=col)
+    np.clip(row, 0, lh - 1, out=row)
+    row *= lw
+    row += col
+    pixels = lut.reshape(-1).take(row)
+
+    # Crop each angle to its visible pixels: first/last non-empty column and row.
+    visible = pixels != 0
+    cols = visible.any(axis=2)
+    rows = visible.any(axis=1)
+    c0 = cols.argmax(axis=1).tolist()
+    c1 = (cols.shape[1] - cols[:, ::-1].argmax(axis=1)).tolist()
+    r0 = rows.argmax(axis=1).tolist()
+    r1 = (rows.shape[1] - rows[:, ::-1].argmax(axis=1)).tolist()
+    out = []
+    for i, block in enumerate(pixels):
+        if not cols[i].any():
+            out.append((np.zeros((1, 1), dtype=np.uint32), 0.0, 0.0))
+            continue
+        out.append((block[c0[i]:c1[i], r0[i]:r1[i]], float(bx0 + c0[i]), float(by0 + r0[i])))
+    return out
+
+
+def build_atlas(sprites: dict, width: int = ATLAS_WIDTH) -> RotationAtlas:
+    # sprites: {key: (pixel array [x, y], dx, dy)} from rotate_grid.
+    rects, size = RotationAtlas.layout({k: v[0].shape for k, v in sprites.items()}, width)
+    atlas = RotationAtlas.new_surface(size)
+    pixels = pygame.surfarray.pixels2d(atlas)
+    for key, rect in rects.items():
+        pixels[rect.x:rect.right, rect.y:rect.bottom] = sprites[key][0]
+    # Release the pixel view so the surface unlocks.
+    del pixels
+    return RotationAtlas(atlas, {k: (rect, sprites[k][1], sprites[k][2]) for k, rect in rects.items()})
+
+
+# ---------- Self-check ----------
+if __name__ == "__main__":
+    # python -m systems.rotkernel: fully opaque grids, whose rotations sample
+    # furthest off the sprite, against a float reference with explicit bounds.
+    # Pixels may only differ where a sample sits on a cell edge (fixed-point
+    # rounding).
+    import sys
+
+    failed = 0
+    for gh, gw in ((15, 15), (3, 40), (40, 3)):
+        grid = np.arange(1, gh * gw + 1, dtype=np.uint32).reshape(gh, gw)
+        for cell_px in (1, 2, 3, 4, 8):
+            angles = range(0, 360, 3)
+            for ang, (block, dx, dy) in zip(angles, rotate_grid(grid, cell_px, angles)):
+                rad = math.radians(ang)
+                x = dx + np.arange(block.shape[0])[:, None] + 0.5
+                y = dy + np.arange(block.shape[1])[None, :] + 0.5
+                fc = (x * math.cos(rad) + y * math.sin(rad)) / cell_px + gw / 2
+                fr = (-x * math.sin(rad) + y * math.cos(rad)) / cell_px + gh / 2
+                c, r = np.floor(fc).astype(int), np.floor(fr).astype(int)
+                inside = (c >= 0) & (c < gw) & (r >= 0) & (r < gh)
+                ref = np.where(inside, grid[r.clip(0, gh - 1), c.clip(0, gw - 1)], 0)
+                on_edge = (np.abs(fc - np.rint(fc)) < 1e-2) | (np.abs(fr - np.rint(fr)) < 1e-2)
+                bad = int(((ref != block) & ~on_edge).sum())
+                if bad:
+                    failed += 1
+                    print(f"{gw}x{gh} cell={cell_px} angle={ang}: {bad} pixels off")
+    print("rotkernel: ok" if not failed else f"rotkernel: {failed} rotations off")
+    sys.exit(1 if failed else 0)
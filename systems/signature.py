@@ -0,0 +1,51 @@
+import hashlib
+import struct
+
+# Change signatures for polled documents. Values are fed straight into a BLAKE2
+# hash in a canonical order (dict keys sorted, every value type-tagged) instead
+# of building a sorted JSON dump just to compare it with the previous one.
+# When the server's output is trusted to be canonical, document_digest() in
+# systems.taplist (a BLAKE2 of the response bytes) can stand in for all of this.
+DIGEST_SIZE = 16
+_PACK_FLOAT = struct.Struct("<d").pack
+
+
+def _feed(update, value):
+    if isinstance(value, str):
+        raw = value.encode("utf-8")
+        update(b"s%d:" % len(raw))
+        update(raw)
+    elif value is None:
+        update(b"n")
+    elif value is True:
+        update(b"t")
+    elif value is False:
+        update(b"f")
+    elif isinstance(value, int):
+        update(b"i%d;" % value)
+    elif isinstance(value, float):
+        update(b"d")
+        update(_PACK_FLOAT(value))
+    elif isinstance(value, dict):
+        update(b"{%d:" % len(value))
+        for key in sorted(value, key=str):
+            _feed(update, str(key))
+            _feed(update, value[key])
+        update(b"}")
+    elif isinstance(value, (list, tuple)):
+        update(b"[%d:" % len(value))
+        for item in value:
+            _feed(update, item)
+        update(b"]")
+    else:
+        _feed(update, repr(value))
+
+
+def digest(value) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    _feed(h.update, value)
+    return h.digest()
+
+
+def taplist_signature(taplist: dict) -> bytes:
+    return digest(taplist.get("beers", []))
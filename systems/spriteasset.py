@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pygame
+
+# Palette-indexed pixel-art sprites: an 8-bit colormap PNG, one image pixel
+# per sprite cell, with palette index 0 meaning "empty". Animation frames sit
+# side by side, each frame_width pixels wide. Any image editor that can save
+# an indexed PNG can add or change a sprite.
+SPRITE_DIR = Path("sprites")
+
+
+class IndexedSprite:
+    """
+    Frames as rows of palette indices plus the palette (RGB per index). The
+    grids are small plain lists, so symmetry checks and cache keys can use
+    them directly; surfaces come from expanding them once and scaling.
+    """
+
+    def __init__(self, name: str, palette: list, frames: list):
+        self.name = name
+        self.palette = palette
+        self.frames = frames
+        self.height = len(frames[0])
+        self.width = len(frames[0][0])
+        self._cells = {}
+
+    def color_of(self, index: int):
+        # RGB for a cell, None for empty.
+        return self.palette[index] if index else None
+
+    def cell_surface(self, frame: int = 0) -> pygame.Surface:
+        # One pixel per cell, transparent where empty.
+        surf = self._cells.get(frame)
+        if surf is None:
+            w, h = self.width, self.height
+            cells = pygame.image.frombuffer(
+                bytes(i for row in self.frames[frame] for i in row), (w, h), "P"
+            )
+            cells.set_palette([(0, 0, 0)] + [tuple(c) for c in self.palette[1:]])
+            cells.set_colorkey(0)
+            surf = pygame.Surface((w, h), pygame.SRCALPHA).convert_alpha()
+            surf.fill((0, 0, 0, 0))
+            surf.blit(cells, (0, 0))
+            self._cells[frame] = surf
+        return surf
+
+    def scaled(self, frame: int, cell_px: int) -> pygame.Surface:
+        # Nearest-neighbour upscale: every cell becomes a cell_px square.
+        cell_px = max(1, int(cell_px))
+        return pygame.transform.scale(self.cell_surface(frame), (self.width * cell_px, self.height * cell_px))
+
+
+def load_indexed_sprite(name: str, frame_width: int | None = None, folder=SPRITE_DIR) -> IndexedSprite:
+    path = Path(folder) / f"{name}.png"
+    img = pygame.image.load(str(path))
+    if img.get_bitsize() != 8:
+        raise ValueError(f"{path} is not a palette-indexed (8-bit) PNG")
+    width, height = img.get_size()
+    frame_width = frame_width or width
+    if width % frame_width:
+        raise ValueError(f"{path} is {width}px wide, not a multiple of the {frame_width}px frame width")
+    img.lock()
+    try:
+        indices = [[img.get_at_mapped((x, y)) for x in range(width)] for y in range(height)]
+    finally:
+        img.unlock()
+    used = max(max(row) for row in indices)
+    palette = [tuple(c[:3]) for c in img.get_palette()[:used + 1]]
+    frames = [
+        [row[start:start + frame_width] for row in indices]
+        for start in range(0, width, frame_width)
+    ]
+    return IndexedSprite(name, palette, frames)
+
+
+def save_indexed_sprite(path, palette: list, frames: list):
+    # palette[0] is the empty colour; frames are equal-sized index grids.
+    height = len(frames[0])
+    data = bytes(
+        frame[y][x] for y in range(height) for frame in frames for x in range(len(frame[0]))
+    )
+    img = pygame.image.frombuffer(data, (len(frames[0][0]) * len(frames), height), "P")
+    img.set_palette([tuple(c) for c in palette] + [(0, 0, 0)] * (256 - len(palette)))
+    pygame.image.save(img, str(path))
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import json
+import math
+from pathlib import Path
+
+import pygame
+
+from systems.cache import atomic_write_bytes
+
+# Prewarmed ship/alien rotations packed into one surface. Each rotation is
+# cropped to its visible pixels (a rotated bounding box is mostly empty
+# corners) and shelf-packed; the cache entries are subsurfaces of the atlas,
+# so thousands of sprites share one allocation. The atlas is written to disk
+# as a PNG plus a JSON rect index, keyed by everything that shapes the pixels,
+# and later starts load it with one image load instead of rotating again.
+#
+# Only a canonical angular range is ever rotated. Any angle is a canonical
+# one plus quarter turns, and for a sprite that mirrors onto itself, angles
+# past 45 degrees in a quadrant are mirror images of ones below it. Quarter
+# turns and flips are lossless on pixel art, so the rest is derived exactly.
+#
+# Offsets are floats from the sprite's true center: blit at
+# floor(center + offset + 0.5), which matches get_rect(center=...) for
+# unflipped rotations and stays consistent through flips and turns.
+ATLAS_VERSION = 2
+ATLAS_WIDTH = 4096
+
+
+def atlas_key(*parts) -> str:
+    blob = json.dumps([ATLAS_VERSION, pygame.version.ver, *parts], separators=(",", ":"))
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def sprite_mirror(rows) -> str | None:
+    # "rows" if the grid is symmetric about its horizontal axis, "cols" about
+    # its vertical one, else None.
+    rows = [list(row) for row in rows]
+    if rows == rows[::-1]:
+        return "rows"
+    if all(row == row[::-1] for row in rows):
+        return "cols"
+    return None
+
+
+def canonical_angle(ang: int, mirrored: bool):
+    """(canonical angle, quarter turns, flip) such that rotating by ang equals
+    flipping the canonical rotation (if flip) and then turning it clockwise."""
+    turns, rest = divmod(ang % 360, 90)
+    if mirrored and rest > 45:
+        return 90 - rest, (turns + 1) % 4, True
+    return rest, turns, False
+
+
+def rotation_entry(surf: pygame.Surface):
+    return surf, -surf.get_width() / 2, -surf.get_height() / 2
+
+
+def derive_rotation(entry, turns: int, mirror: str | None):
+    surf, dx, dy = entry
+    w, h = surf.get_size()
+    if mirror == "rows":
+        surf = pygame.transform.flip(surf, False, True)
+        dy = -(dy + h)
+    elif mirror == "cols":
+        surf = pygame.transform.flip(surf, True, False)
+        dx = -(dx + w)
+    for _ in range(turns):
+        # Clockwise on screen: (x, y) -> (-y, x).
+        w, h = surf.get_size()
+        surf = pygame.transform.rotate(surf, -90)
+        dx, dy = -(dy + h), dx
+    return surf, dx, dy
+
+
+def blit_rotation(screen, entry, cx: int, cy: int):
+    surf, dx, dy = entry
+    screen.blit(surf, (math.floor(cx + dx + 0.5), math.floor(cy + dy + 0.5)))
+
+
+def crop_sprite(entry):
+    """Entry cropped to its visible pixels, placed the same way."""
+    surf, dx, dy = entry
+    bounds = surf.get_bounding_rect()
+    if bounds.w == 0 or bounds.h == 0:
+        bounds = pygame.Rect(0, 0, 1, 1)
+    return surf.subsurface(bounds), dx + bounds.x, dy + bounds.y
+
+
+class RotationAtlas:
+    """
+    One atlas surface plus {key: (rect, dx, dy)}. Keys are tuples such as
+    ("ship", scale, angle) or ("alien", scale, frame, angle), canonical
+    angles only.
+    """
+
+    def __init__(self, surface: pygame.Surface, index: dict):
+        self.surface = surface
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def items(self):
+        for key, (rect, dx, dy) in self.index.items():
+            yield key, (self.surface.subsurface(rect), dx, dy)
+
+    @staticmethod
+    def layout(sizes: dict, width: int = ATLAS_WIDTH):
+        """Shelf-pack {key: (w, h)}, tallest first: ({key: Rect}, atlas size)."""
+        order = sorted(sizes, key=lambda k: sizes[k][1], reverse=True)
+        width = max([width] + [sizes[k][0] for k in order])
+        rects = {}
+        x = y = shelf_h = 0
+        for key in order:
+            w, h = sizes[key]
+            if x + w > width:
+                x, y = 0, y + shelf_h
+                shelf_h = 0
+            rects[key] = pygame.Rect(x, y, w, h)
+            x += w
+            shelf_h = max(shelf_h, h)
+        return rects, (width, max(1, y + shelf_h))
+
+    @staticmethod
+    def new_surface(size) -> pygame.Surface:
+        atlas = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+        return atlas
+
+    @classmethod
+    def pack(cls, sprites: dict, width: int = ATLAS_WIDTH) -> "RotationAtlas":
+        # sprites: {key: (cropped surface, dx, dy)}.
+        rects, size = cls.layout({k: v[0].get_size() for k, v in sprites.items()}, width)
+        atlas = cls.new_surface(size)
+        atlas.blits([(sprites[k][0], rect.topleft) for k, rect in rects.items()], doreturn=False)
+        return cls(atlas, {k: (rect, sprites[k][1], sprites[k][2]) for k, rect in rects.items()})
+
+    # ---- disk ----
+    @staticmethod
+    def _paths(folder, key: str):
+        folder = Path(folder)
+        return folder / f"rot-{key}.png", folder / f"rot-{key}.json"
+
+    def save(self, folder, key: str):
+        png_path, index_path = self._paths(folder, key)
+        buf = io.BytesIO()
+        pygame.image.save(self.surface, buf, "png")
+        atomic_write_bytes(png_path, buf.getvalue())
+        entries = [[list(k), [r.x, r.y, r.w, r.h], dx, dy] for k, (r, dx, dy) in self.index.items()]
+        # The index goes last: a start that finds it knows the PNG is complete.
+        atomic_write_bytes(index_path, json.dumps({"key": key, "entries": entries}).encode("utf-8"))
+
+    @classmethod
+    def load(cls, folder, key: str) -> "RotationAtlas | None":
+        png_path, index_path = cls._paths(folder, key)
+        try:
+            meta = json.loads(index_path.read_text(encoding="utf-8"))
+            surface = pygame.image.load(str(png_path)).convert_alpha()
+        except (OSError, ValueError, pygame.error):
+            return None
+        if meta.get("key") != key:
+            return None
+        bounds = surface.get_rect()
+        index = {}
+        for k, rect, dx, dy in meta["entries"]:
+            rect = pygame.Rect(rect)
+            if not bounds.contains(rect):
+                return None
+            index[tuple(k)] = (rect, dx, dy)
+        return cls(surface, index)
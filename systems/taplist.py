@@ -0,0 +1,239 @@
+import json
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+from settings import SERVER_BASE
+from systems.fetch import fetch_text_payload, is_url
+from systems.jsoncache import JsonCache, is_miss
+
+# Parsed taplist / beer DB documents shared by every loader in this process.
+JSON_CACHE = JsonCache()
+
+
+def urlify(path_or_url: str) -> str:
+    if is_url(path_or_url):
+        return path_or_url
+    return f"{SERVER_BASE.rstrip('/')}/{path_or_url.lstrip('./').lstrip('/')}"
+
+
+def _cached_parse(key: str, validator: str, body: bytes | None, local_path):
+    data = JSON_CACHE.get(key, validator)
+    if is_miss(data):
+        data = json.loads(body if body is not None else Path(local_path).read_bytes())
+        JSON_CACHE.put(key, validator, data)
+    return data
+
+
+def _load_remote_json(url: str, ttl, timeout_s, allow_stale_on_error):
+    validator, body, local_path = fetch_text_payload(
+        url, ttl=ttl, timeout_s=timeout_s, allow_stale_on_error=allow_stale_on_error
+    )
+    return _cached_parse(url, validator, body, local_path)
+
+
+def _load_local_json(local: Path):
+    stat = local.stat()
+    return _cached_parse(str(local), f"local:{stat.st_mtime_ns}:{stat.st_size}", None, local)
+
+
+def load_json(src: str, ttl: int = 15, timeout_s: float = 10, allow_stale_on_error: bool = True):
+    # Parsed documents are cached in memory and shared; don't mutate the result.
+    if is_url(src):
+        return _load_remote_json(src, ttl, timeout_s, allow_stale_on_error)
+
+    # For relative paths, prefer the server source of truth, then fall back to local file.
+    try:
+        return _load_remote_json(urlify(src), ttl, timeout_s, allow_stale_on_error)
+    except Exception:
+        if not allow_stale_on_error:
+            raise
+        local = Path(src)
+        if local.exists():
+            return _load_local_json(local)
+        raise
+
+
+def load_json_if_changed(src: str, timeout_s: float, previous: str | None):
+    """
+    Conditional GET against the server copy. Returns (validator, data), with
+    data None while the validator still equals previous. previous is the
+    caller's own last applied validator, not the shared cache's: another
+    poller, or a fetch the caller gave up on, may already have stored the new
+    copy there.
+    """
+    url = urlify(src)
+    validator, body, local_path = fetch_text_payload(
+        url, ttl=0, timeout_s=timeout_s, allow_stale_on_error=False
+    )
+    data = _cached_parse(url, validator, body, local_path)
+    return validator, (None if validator == previous else data)
+
+
+class BeerView(Mapping):
+    """
+    Read-only merged entry: a beer DB record with the taplist's soldOut flag
+    layered on top. Records are never mutated once indexed, so views stay valid
+    after the index moves on.
+    """
+
+    __slots__ = ("base", "sold_out", "version")
+
+    def __init__(self, base: dict, sold_out: bool, version: int):
+        self.base = base
+        self.sold_out = sold_out
+        self.version = version
+
+    def __getitem__(self, key):
+        if key == "soldOut":
+            return self.sold_out
+        return self.base[key]
+
+    def __iter__(self):
+        yield from self.base
+        if "soldOut" not in self.base:
+            yield "soldOut"
+
+    def __len__(self):
+        return len(self.base) + (0 if "soldOut" in self.base else 1)
+
+    def __repr__(self):
+        return f"BeerView({self.base.get('id')!r}, soldOut={self.sold_out}, v{self.version})"
+
+
+class BeerIndex:
+    """
+    Beer DB records by id, kept across refreshes. update() swaps in only the
+    records that actually changed and bumps their version stamp, so unchanged
+    beers keep the same record object and merge() costs one lookup per tap.
+
+    The set update() returns only reaches its caller; a later caller with the
+    same document gets nothing back. Readers that share an index (one per side
+    in the data daemon) compare versions() for their taps against the stamps
+    they last published instead.
+    """
+
+    def __init__(self, beerdb: list[dict] = ()):
+        self._lock = threading.Lock()
+        self._by_id: dict[str, dict] = {}
+        self._versions: dict[str, int] = {}
+        self._clock = 0
+        self._source = None
+        self.update(beerdb)
+
+    def update(self, beerdb: list[dict]) -> set:
+        """Apply a fresh beer DB document. Returns the ids that were added, changed or removed."""
+        with self._lock:
+            # load_json hands back the same object while the document is unchanged.
+            if beerdb is self._source:
+                return set()
+            # Last record wins for duplicate ids, as before.
+            latest = {r.get("id"): r for r in beerdb}
+            latest.pop(None, None)
+            changed = set()
+            for beer_id, record in latest.items():
+                prev = self._by_id.get(beer_id)
+                if prev is record or prev == record:
+                    continue
+                self._clock += 1
+                self._by_id[beer_id] = record
+                self._versions[beer_id] = self._clock
+                changed.add(beer_id)
+            if len(latest) != len(self._by_id):
+                for beer_id in [i for i in self._by_id if i not in latest]:
+                    del self._by_id[beer_id]
+                    del self._versions[beer_id]
+                    changed.add(beer_id)
+            self._source = beerdb
+            return changed
+
+    def get(self, beer_id) -> dict | None:
+        with self._lock:
+            return self._by_id.get(beer_id)
+
+    def version(self, beer_id) -> int:
+        # 0 for unknown ids; otherwise increases every time the record changes.
+        with self._lock:
+            return self._versions.get(beer_id, 0)
+
+    def versions(self, ids) -> dict:
+        # version() for several ids under one lock.
+        with self._lock:
+            return {beer_id: self._versions.get(beer_id, 0) for beer_id in ids}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def merge(self, taplist: dict) -> list[BeerView]:
+        out = []
+        with self._lock:
+            for slot in taplist.get("beers", []):
+                beer_id = slot.get("id")
+                record = self._by_id.get(beer_id)
+                if not record:
+                    continue
+                out.append(BeerView(record, slot.get("soldOut", False), self._versions[beer_id]))
+        return out
+
+
+def taplist_ids(taplist: dict) -> set:
+    return {slot.get("id") for slot in taplist.get("beers", [])}
+
+
+def document_digest(src: str) -> str | None:
+    # Validator of the last parsed copy of src: a hash of the response body
+    # (mtime/size when it came from the local fallback).
+    return JSON_CACHE.validator(urlify(src))
+
+
+def merge_taplist_with_db(taplist: dict, beer_index: BeerIndex) -> list[BeerView]:
+    return beer_index.merge(taplist)
+
+
+def _same_beer(a, b) -> bool:
+    # Equal apart from the soldOut flag the taplist layers on top.
+    if getattr(a, "base", a) is getattr(b, "base", b):
+        return True
+    if len(a) != len(b):
+        return False
+    for k, v in a.items():
+        if k != "soldOut" and (k not in b or b[k] != v):
+            return False
+    return True
+
+
+def diff_taplist(old: list, new: list) -> dict:
+    """
+    Structural diff between two merged taplists.
+    Returns {"layout": bool, "slots": {index: kind}, "changed_ids": set}:
+      - layout: slot count changed, which moves every card (full redraw)
+      - slots: per-slot change kind: "added", "removed", "moved", "changed", "sold_out"
+      - changed_ids: beer ids whose database entry changed (logos must be reloaded)
+    """
+    old_index = {b.get("id"): i for i, b in enumerate(old)}
+    slots: dict[int, str] = {}
+    changed_ids: set = set()
+
+    for i, beer in enumerate(new):
+        beer_id = beer.get("id")
+        prev = old[i] if i < len(old) else None
+        if prev is not None and prev.get("id") == beer_id:
+            if not _same_beer(prev, beer):
+                slots[i] = "changed"
+                changed_ids.add(beer_id)
+            elif prev.get("soldOut", False) != beer.get("soldOut", False):
+                slots[i] = "sold_out"
+            continue
+
+        j = old_index.get(beer_id)
+        if j is None:
+            slots[i] = "added"
+        else:
+            slots[i] = "moved"
+            if not _same_beer(old[j], beer):
+                changed_ids.add(beer_id)
+
+    for i in range(len(new), len(old)):
+        slots[i] = "removed"
+
+    return {"layout": len(old) != len(new), "slots": slots, "changed_ids": changed_ids}
@@ -219,41 +219,22 @@ def desaturate_color(color, amount=0.45):
     )
 
 
-def draw_taplist_static(
-    screen,
-    beers,
-    logo_cache,
-    theme,
-    screen_w,
-    screen_h,
-    beer_font_path,
-    info_font_path,
-    header_font_path="fonts/WtfNewStrike.ttf",
-    draw_panels=False,
-    panel_color=(0, 0, 0),
-    panel_border=(80, 80, 80),
-):
-    logo_size = theme.logo_size
-    card_height = 130
-    row_padding = 18
-    column_count = 2
-    logo_margin = 0
-    accent = theme.accent
-    dirty_rects = []
+CARD_HEIGHT = 130
+ROW_PADDING = 18
+COLUMN_COUNT = 2
+
 
+def _ensure_header(theme, screen_w, hf_path):
     global _HEADER_TEXT, _HEADER_THEME
-    global _HEADER_POS
 
-    hf_path = header_font_path or beer_font_path
     max_header_w = screen_w - 20
-
     if _HEADER_TEXT is None or _HEADER_THEME != (theme.name, hf_path):
         try:
             header_font = get_fitting_font("TAP LIST", max_header_w, hf_path, start_size=220, min_size=88)
             _HEADER_TEXT = NeonTextFX(
                 font=header_font,
                 text="TAP LIST",
-                base_color=accent,
+                base_color=theme.accent,
                 outline_color=(255, 255, 255),
                 shadow_color=(0, 0, 0),
                 shadow_alpha=0,
@@ -274,18 +255,23 @@ def draw_taplist_static(
             print("Header text init failed:", exc)
             _HEADER_TEXT = None
 
+
+def _taplist_layout(beer_count, theme, screen_w, screen_h, hf_path):
+    # Returns (header_x, header_y, list_top) for the current header and slot count.
+    _ensure_header(theme, screen_w, hf_path)
+
     if _HEADER_TEXT:
         header_x = (screen_w - _HEADER_TEXT.base.get_width()) // 2
         header_h = _HEADER_TEXT.base.get_height()
     else:
-        header_font = get_fitting_font("TAP LIST", max_header_w, hf_path, start_size=220, min_size=88)
+        header_font = get_fitting_font("TAP LIST", screen_w - 20, hf_path, start_size=220, min_size=88)
         header_w = header_font.size("TAP LIST")[0]
         header_x = (screen_w - header_w) // 2
         header_h = header_font.get_height()
 
-    rows = (len(beers) + 1) // 2
+    rows = (beer_count + 1) // 2
     if theme.name == "blue":
-        list_h = rows * card_height + max(0, rows - 1) * row_padding
+        list_h = rows * CARD_HEIGHT + max(0, rows - 1) * ROW_PADDING
         header_gap = 20
         block_h = header_h + header_gap + list_h
         try:
@@ -298,6 +284,154 @@ def draw_taplist_static(
     else:
         header_y = -2
         list_top = 160
+    return header_x, header_y, list_top
+
+
+def _card_origin(beer_idx, list_top, screen_w):
+    # Row-major order to match editor layout:
+    # 0=L row1, 1=R row1, 2=L row2, 3=R row2, ...
+    col_x = [20, screen_w // 2 + 16]
+    row, col = divmod(beer_idx, COLUMN_COUNT)
+    return col_x[col], list_top + row * (CARD_HEIGHT + ROW_PADDING)
+
+
+def card_clear_rect(beer_idx, list_top, screen_w):
+    # Everything a card draws (panel, logo, text, strike) stays inside this box,
+    # and neighbouring boxes never overlap, so one card can be redrawn alone.
+    left, top = _card_origin(beer_idx, list_top, screen_w)
+    half_pad = ROW_PADDING // 2
+    return pygame.Rect(left - 8, top - half_pad, screen_w // 2 - 24, CARD_HEIGHT + half_pad * 2)
+
+
+def _draw_card(
+    screen,
+    beer,
+    left,
+    top,
+    logo_cache,
+    theme,
+    screen_w,
+    beer_font_path,
+    info_font_path,
+    draw_panels,
+    panel_color,
+    panel_border,
+):
+    logo_size = theme.logo_size
+    card_height = CARD_HEIGHT
+    logo_margin = 0
+    accent = theme.accent
+    dirty_rects = []
+
+    if draw_panels:
+        card_rect = pygame.Rect(left - 8, top + 2, screen_w // 2 - 24, card_height - 4)
+        pygame.draw.rect(screen, panel_color, card_rect, border_radius=14)
+        pygame.draw.rect(screen, panel_border, card_rect, width=2, border_radius=14)
+        dirty_rects.append(card_rect.copy())
+
+    surf = logo_cache.get(beer.get("id"))
+    logo_box_x = left + logo_margin
+    logo_box_y = top + (card_height - logo_size) // 2
+    logo_box_rect = pygame.Rect(logo_box_x, logo_box_y, logo_size, logo_size)
+
+    if surf:
+        logo_rect = surf.get_rect(center=logo_box_rect.center)
+        screen.blit(surf, logo_rect)
+        dirty_rects.append(logo_rect.copy())
+    else:
+        draw_logo_placeholder(screen, logo_box_x, logo_box_y, logo_size, accent)
+        dirty_rects.append(logo_box_rect.copy())
+
+    x_text = left + logo_margin + logo_size + 22
+    spacing = 15
+    max_text_width = (screen_w // 2 - 36) - (logo_margin + logo_size + 22) - 18
+
+    brewery = beer["brewery"].upper()
+    title = beer["title"].upper()
+    full_name = f"{brewery} {title}"
+
+    name_font = get_fitting_font(full_name, max_text_width, beer_font_path, start_size=72, min_size=22)
+
+    sold_out = beer.get("soldOut", False)
+    info_line = (
+        "-TEMPORARILY SOLD OUT-"
+        if sold_out
+        else f"{beer['style'].upper()} - {beer['abv']}% ABV - "
+        f"{beer['city'].upper()}, {beer['state'].upper()}"
+    )
+    info_font_fitted = get_fitting_font(
+        info_line,
+        max_text_width,
+        info_font_path,
+        start_size=32,
+        min_size=12,
+    )
+
+    brewery_color = desaturate_color(theme.text_brewery) if sold_out else theme.text_brewery
+    beer_color = desaturate_color(theme.text_beer) if sold_out else theme.text_beer
+    info_color = desaturate_color(theme.text_info) if sold_out else theme.text_info
+
+    brewery_surf = name_font.render(brewery, TEXT_ANTIALIAS, brewery_color)
+    space_surf = name_font.render(" ", TEXT_ANTIALIAS, beer_color)
+    title_surf = name_font.render(title, TEXT_ANTIALIAS, beer_color)
+    info_surf = info_font_fitted.render(info_line, TEXT_ANTIALIAS, info_color)
+
+    name_ascent = name_font.get_ascent()
+    info_ascent = info_font_fitted.get_ascent()
+    block_height = name_ascent + spacing + info_ascent
+    block_top = top + (card_height - block_height) // 2
+
+    x = x_text
+    b_rect = screen.blit(brewery_surf, (x, block_top))
+    dirty_rects.append(b_rect)
+    x += brewery_surf.get_width()
+    s_rect = screen.blit(space_surf, (x, block_top))
+    dirty_rects.append(s_rect)
+    x += space_surf.get_width()
+    t_rect = screen.blit(title_surf, (x, block_top))
+    dirty_rects.append(t_rect)
+
+    if sold_out:
+        strike_y = block_top + int(name_ascent * 0.55)
+        strike_start = x_text
+        strike_end = x_text + brewery_surf.get_width() + space_surf.get_width() + title_surf.get_width()
+        pygame.draw.line(screen, beer_color, (strike_start, strike_y), (strike_end, strike_y), 3)
+        dirty_rects.append(
+            pygame.Rect(
+                strike_start,
+                strike_y - 2,
+                max(1, strike_end - strike_start),
+                5,
+            )
+        )
+
+    info_x = x_text
+    if sold_out:
+        info_x = x_text + max(0, (max_text_width - info_surf.get_width()) // 2)
+    i_rect = screen.blit(info_surf, (info_x, block_top + name_ascent + spacing))
+    dirty_rects.append(i_rect)
+    return dirty_rects
+
+
+def draw_taplist_static(
+    screen,
+    beers,
+    logo_cache,
+    theme,
+    screen_w,
+    screen_h,
+    beer_font_path,
+    info_font_path,
+    header_font_path="fonts/WtfNewStrike.ttf",
+    draw_panels=False,
+    panel_color=(0, 0, 0),
+    panel_border=(80, 80, 80),
+):
+    global _HEADER_POS
+
+    dirty_rects = []
+    hf_path = header_font_path or beer_font_path
+    header_x, header_y, list_top = _taplist_layout(len(beers), theme, screen_w, screen_h, hf_path)
 
     _HEADER_POS = (header_x, header_y)
     if _HEADER_TEXT:
@@ -310,106 +444,83 @@ def draw_taplist_static(
                 _HEADER_TEXT.shadow.get_height(),
             )
         )
-    col_x = [20, screen_w // 2 + 16]
 
-    for col in range(column_count):
-        for idx in range(rows):
-            # Row-major order to match editor layout:
-            # 0=L row1, 1=R row1, 2=L row2, 3=R row2, ...
-            beer_idx = idx * column_count + col
-            if beer_idx >= len(beers):
-                break
-
-            beer = beers[beer_idx]
-            top = list_top + idx * (card_height + row_padding)
-            left = col_x[col]
-
-            if draw_panels:
-                card_rect = pygame.Rect(left - 8, top + 2, screen_w // 2 - 24, card_height - 4)
-                pygame.draw.rect(screen, panel_color, card_rect, border_radius=14)
-                pygame.draw.rect(screen, panel_border, card_rect, width=2, border_radius=14)
-                dirty_rects.append(card_rect.copy())
-
-            surf = logo_cache.get(beer.get("id"))
-            logo_box_x = left + logo_margin
-            logo_box_y = top + (card_height - logo_size) // 2
-            logo_box_rect = pygame.Rect(logo_box_x, logo_box_y, logo_size, logo_size)
-
-            if surf:
-                logo_rect = surf.get_rect(center=logo_box_rect.center)
-                screen.blit(surf, logo_rect)
-                dirty_rects.append(logo_rect.copy())
-            else:
-                draw_logo_placeholder(screen, logo_box_x, logo_box_y, logo_size, accent)
-                dirty_rects.append(logo_box_rect.copy())
-
-            x_text = left + logo_margin + logo_size + 22
-            spacing = 15
-            max_text_width = (screen_w // 2 - 36) - (logo_margin + logo_size + 22) - 18
-
-            brewery = beer["brewery"].upper()
-            title = beer["title"].upper()
-            full_name = f"{brewery} {title}"
-
-            name_font = get_fitting_font(full_name, max_text_width, beer_font_path, start_size=72, min_size=22)
-
-            sold_out = beer.get("soldOut", False)
-            info_line = (
-                "-TEMPORARILY SOLD OUT-"
-                if sold_out
-                else f"{beer['style'].upper()} - {beer['abv']}% ABV - "
-                f"{beer['city'].upper()}, {beer['state'].upper()}"
-            )
-            info_font_fitted = get_fitting_font(
-                info_line,
-                max_text_width,
+    for beer_idx, beer in enumerate(beers):
+        left, top = _card_origin(beer_idx, list_top, screen_w)
+        dirty_rects.extend(
+            _draw_card(
+                screen,
+                beer,
+                left,
+                top,
+                logo_cache,
+                theme,
+                screen_w,
+                beer_font_path,
                 info_font_path,
-                start_size=32,
-                min_size=12,
+                draw_panels,
+                panel_color,
+                panel_border,
             )
+        )
 
-            brewery_color = desaturate_color(theme.text_brewery) if sold_out else theme.text_brewery
-            beer_color = desaturate_color(theme.text_beer) if sold_out else theme.text_beer
-            info_color = desaturate_color(theme.text_info) if sold_out else theme.text_info
-
-            brewery_surf = name_font.render(brewery, TEXT_ANTIALIAS, brewery_color)
-            space_surf = name_font.render(" ", TEXT_ANTIALIAS, beer_color)
-            title_surf = name_font.render(title, TEXT_ANTIALIAS, beer_color)
-            info_surf = info_font_fitted.render(info_line, TEXT_ANTIALIAS, info_color)
-
-            name_ascent = name_font.get_ascent()
-            info_ascent = info_font_fitted.get_ascent()
-            block_height = name_ascent + spacing + info_ascent
-            block_top = top + (card_height - block_height) // 2
-
-            x = x_text
-            b_rect = screen.blit(brewery_surf, (x, block_top))
-            dirty_rects.append(b_rect)
-            x += brewery_surf.get_width()
-            s_rect = screen.blit(space_surf, (x, block_top))
-            dirty_rects.append(s_rect)
-            x += space_surf.get_width()
-            t_rect = screen.blit(title_surf, (x, block_top))
-            dirty_rects.append(t_rect)
-
-            if sold_out:
-                strike_y = block_top + int(name_ascent * 0.55)
-                strike_start = x_text
-                strike_end = x_text + brewery_surf.get_width() + space_surf.get_width() + title_surf.get_width()
-                pygame.draw.line(screen, beer_color, (strike_start, strike_y), (strike_end, strike_y), 3)
-                dirty_rects.append(
-                    pygame.Rect(
-                        strike_start,
-                        strike_y - 2,
-                        max(1, strike_end - strike_start),
-                        5,
-                    )
-                )
+    return dirty_rects
 
-            info_x = x_text
-            if sold_out:
-                info_x = x_text + max(0, (max_text_width - info_surf.get_width()) // 2)
-            i_rect = screen.blit(info_surf, (info_x, block_top + name_ascent + spacing))
-            dirty_rects.append(i_rect)
 
-    return dirty_rects
+def redraw_taplist_cards(
+    screen,
+    indexes,
+    beers,
+    logo_cache,
+    theme,
+    screen_w,
+    screen_h,
+    beer_font_path,
+    info_font_path,
+    header_font_path="fonts/WtfNewStrike.ttf",
+    draw_panels=False,
+    panel_color=(0, 0, 0),
+    panel_border=(80, 80, 80),
+    clear_color=(0, 0, 0, 0),
+):
+    """
+    Re-render only the given card slots of a surface drawn by draw_taplist_static
+    with the same slot count. Each card is cleared and redrawn under a clip
+    (header first, as in the full draw), so the result matches a full redraw.
+    Returns (cleared_rects, dirty_rects).
+    """
+    hf_path = header_font_path or beer_font_path
+    header_x, header_y, list_top = _taplist_layout(len(beers), theme, screen_w, screen_h, hf_path)
+    cleared = []
+    dirty_rects = []
+    prev_clip = screen.get_clip()
+    try:
+        for beer_idx in sorted(indexes):
+            rect = card_clear_rect(beer_idx, list_top, screen_w).clip(screen.get_rect())
+            if not rect.w or not rect.h:
+                continue
+            screen.set_clip(rect)
+            screen.fill(clear_color)
+            if _HEADER_TEXT:
+                _HEADER_TEXT.draw_base(screen, header_x, header_y)
+            if beer_idx < len(beers):
+                left, top = _card_origin(beer_idx, list_top, screen_w)
+                card_rects = _draw_card(
+                    screen,
+                    beers[beer_idx],
+                    left,
+                    top,
+                    logo_cache,
+                    theme,
+                    screen_w,
+                    beer_font_path,
+                    info_font_path,
+                    draw_panels,
+                    panel_color,
+                    panel_border,
+                )
+                dirty_rects.extend(r.clip(rect) for r in card_rects)
+            cleared.append(rect)
+    finally:
+        screen.set_clip(prev_clip)
+    return cleared, dirty_rects
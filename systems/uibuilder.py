@@ -0,0 +1,220 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import pygame
+
+from systems.logos import build_logo_cache
+from systems.metrics import UI_LAYERS_DROPPED, UI_REBUILDS, UI_UPDATES_COALESCED
+from systems.taplist import diff_taplist
+from systems.ui import draw_taplist_static, redraw_taplist_cards
+
+
+@dataclass
+class UiLayer:
+    # A finished taplist layer, ready to be swapped in by the render loop.
+    refresh_token: object
+    beers: list
+    logo_cache: dict
+    surface: pygame.Surface
+    rects: list
+    diff: dict | None
+    published_at: float | None
+    build_s: float
+    updates: int = 1
+
+
+class UiBuilder:
+    """
+    Builds taplist UI layers on a worker thread so logo rasterizing, disk I/O
+    and font work never run on the render thread. The worker keeps a private
+    back buffer: each update diffs against the last build, redraws only the
+    cards that changed (or everything when the slot count changes), and hands
+    over a copy of the result.
+
+    An update that arrives after a quiet spell (no build for debounce_s or
+    min_interval_s, whichever is longer) is built at once. Updates that
+    follow it are folded into one rebuild: that build starts once they have
+    been quiet for debounce_s (but no later than max_delay_s after the first
+    one), and never sooner than min_interval_s after the previous build.
+    Updates in between only replace the pending one.
+
+    Fonts are drawn under font_lock; the render thread should only try for it
+    (acquire(blocking=False)) so it never waits on a build.
+    """
+
+    def __init__(
+        self,
+        theme,
+        size: tuple[int, int],
+        log,
+        draw_kwargs: dict,
+        colorkey=None,
+        debounce_s: float = 0.0,
+        max_delay_s: float = 0.0,
+        min_interval_s: float = 0.0,
+    ):
+        self.theme = theme
+        self.width, self.height = size
+        self.log = log
+        self.draw_kwargs = draw_kwargs
+        self.colorkey = colorkey
+        self.clear_color = colorkey if colorkey is not None else (0, 0, 0, 0)
+        self.font_lock = threading.Lock()
+        self.debounce_s = debounce_s
+        self.max_delay_s = max(debounce_s, max_delay_s)
+        self.min_interval_s = min_interval_s
+
+        if colorkey is not None:
+            self._back = pygame.Surface(size).convert()
+        else:
+            self._back = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        self._beers = None
+        self._logo_cache: dict = {}
+        self._rects: list = []
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._pending_updates = 0
+        self._first_submit = 0.0
+        self._last_submit = 0.0
+        self._last_build = 0.0
+        self._ready: UiLayer | None = None
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    # ---- lifecycle ----
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ui-builder", daemon=True)
+        self._thread.start()
+
+    def stop(self, join_timeout_s: float = 2.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(join_timeout_s)
+
+    # ---- render-thread side ----
+    def build_now(self, refresh_token, beers) -> UiLayer:
+        # Synchronous build for the first frame, before the worker starts.
+        return self._build(refresh_token, beers, None)
+
+    def submit(self, refresh_token, beers, published_at: float | None = None):
+        now = time.monotonic()
+        with self._cond:
+            if self._pending is None:
+                self._first_submit = now
+                self._pending_updates = 0
+            else:
+                UI_UPDATES_COALESCED.inc()
+                if self._pending[2] is not None:
+                    # Latency counts from the oldest unapplied publish.
+                    published_at = self._pending[2]
+            self._pending = (refresh_token, beers, published_at)
+            self._pending_updates += 1
+            self._last_submit = now
+            self._cond.notify_all()
+
+    def poll(self) -> UiLayer | None:
+        # Newest finished layer not yet taken, if any. Never blocks on a build.
+        with self._cond:
+            layer, self._ready = self._ready, None
+        return layer
+
+    # ---- worker ----
+    def _due(self) -> float:
+        if self._first_submit - self._last_build >= max(self.debounce_s, self.min_interval_s):
+            # Leading edge: nothing was built lately, so don't hold this one back.
+            return self._first_submit
+        due = min(self._last_submit + self.debounce_s, self._first_submit + self.max_delay_s)
+        return max(due, self._last_build + self.min_interval_s)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._pending is None:
+                        self._cond.wait()
+                        continue
+                    wait_s = self._due() - time.monotonic()
+                    if wait_s <= 0:
+                        break
+                    self._cond.wait(wait_s)
+                if self._stopping:
+                    return
+                refresh_token, beers, published_at = self._pending
+                updates = self._pending_updates
+                self._pending = None
+            UI_REBUILDS.inc()
+            try:
+                layer = self._build(refresh_token, beers, published_at)
+                layer.updates = updates
+            except Exception as exc:
+                # Keep showing the last good layer; the back buffer may be
+                # half drawn, so the next build starts from scratch.
+                self.log(f"[warn] ui build failed: {exc}")
+                self._beers = None
+                continue
+            with self._cond:
+                if self._ready is not None:
+                    # The render loop hasn't taken the previous layer yet; keep
+                    # the older publish time so apply latency isn't understated.
+                    UI_LAYERS_DROPPED.inc()
+                    layer.updates += self._ready.updates
+                    if self._ready.published_at is not None:
+                        layer.published_at = self._ready.published_at
+                self._ready = layer
+
+    def _build(self, refresh_token, beers, published_at) -> UiLayer:
+        started = time.perf_counter()
+        theme = self.theme
+        if self._beers is None:
+            diff = None
+            stale_ids = set()
+        else:
+            diff = diff_taplist(self._beers, beers)
+            stale_ids = diff["changed_ids"] | {b.get("id") for b in beers if b.get("id") not in self._logo_cache}
+        logo_cache = build_logo_cache(
+            beers, theme.logo_size, theme, previous=self._logo_cache, rebuild_ids=stale_ids
+        )
+
+        back = self._back
+        with self.font_lock:
+            if diff is None or diff["layout"]:
+                back.fill(self.clear_color)
+                rects = draw_taplist_static(
+                    back, beers, logo_cache, theme, self.width, self.height, **self.draw_kwargs
+                )
+            else:
+                cleared, card_rects = redraw_taplist_cards(
+                    back,
+                    diff["slots"],
+                    beers,
+                    logo_cache,
+                    theme,
+                    self.width,
+                    self.height,
+                    clear_color=self.clear_color,
+                    **self.draw_kwargs,
+                )
+                rects = [r for r in self._rects if not any(c.contains(r) for c in cleared)] + card_rects
+
+        front = back.copy()
+        if self.colorkey is not None:
+            front.set_colorkey(self.colorkey, pygame.RLEACCEL)
+
+        self._beers = beers
+        self._logo_cache = logo_cache
+        self._rects = rects
+        self._last_build = time.monotonic()
+        return UiLayer(
+            refresh_token=refresh_token,
+            beers=beers,
+            logo_cache=logo_cache,
+            surface=front,
+            rects=list(rects),
+            diff=diff,
+            published_at=published_at,
+            build_s=time.perf_counter() - started,
+        )
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import signal
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from systems.daemon_client import daemon_socket_path
+from systems.logos import ensure_logo_png
+from systems.poller import BeerDbPoller, TaplistPoller
+from systems.taplist import BeerIndex, load_json, merge_taplist_with_db
+from themes import BLUE, RED
+
+# Shared data-poll daemon: polls the bar server once per host (each taplist,
+# plus the beer DB once per tick for all sides), keeps the merged taplists,
+# prerenders themed logo PNGs into logos/_cache, and streams updates to every
+# local display (red-side.py / blue-side.py with GK_DATA_DAEMON=1) over a Unix
+# socket as newline-delimited JSON.
+BEERDB_FILE = "json/beer-database.json"
+THEMES = {"red": RED, "blue": BLUE}
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw.strip())
+    except Exception:
+        return default
+
+
+TOKEN_POLL_SECONDS = max(0.2, _env_float("GK_TOKEN_POLL_SECONDS", 0.75))
+POLL_TAPLIST_TIMEOUT_S = max(0.5, _env_float("GK_POLL_TAPLIST_TIMEOUT_S", 2.0))
+POLL_BEERDB_TIMEOUT_S = max(0.5, _env_float("GK_POLL_BEERDB_TIMEOUT_S", 2.5))
+TRUST_SERVER_JSON = os.getenv("GK_TRUST_SERVER_JSON", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def log_line(message: str):
+    print(f"[daemon] {message}", flush=True)
+
+
+class TaplistHub:
+    # Latest merged taplist per source plus a version counter subscribers wait on.
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._state: dict[str, tuple[int, str]] = {}
+
+    def publish(self, src: str, refresh_token, beers: list[dict]):
+        line = json.dumps(
+            {"refreshToken": refresh_token, "beers": [dict(b) for b in beers]},
+            separators=(",", ":"),
+        )
+        with self._cond:
+            version = self._state.get(src, (0, ""))[0] + 1
+            self._state[src] = (version, line)
+            self._cond.notify_all()
+
+    def wait(self, src: str, after_version: int, timeout_s: float):
+        with self._cond:
+            self._cond.wait_for(lambda: self._state.get(src, (0, ""))[0] > after_version, timeout_s)
+            return self._state.get(src, (0, ""))
+
+
+class SubscriberHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+        src = request.get("subscribe")
+        if src not in self.server.sources:
+            self.wfile.write(b'{"error":"unknown taplist"}\n')
+            return
+
+        seen = 0
+        while not self.server.stopping.is_set():
+            version, line = self.server.hub.wait(src, seen, 1.0)
+            if version <= seen:
+                continue
+            seen = version
+            try:
+                self.wfile.write(line.encode("utf-8") + b"\n")
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared taplist poller for local displays")
+    parser.add_argument("--side", action="append", choices=sorted(THEMES), help="Side(s) to serve (default: all)")
+    parser.add_argument("--socket", default=daemon_socket_path())
+    args = parser.parse_args()
+
+    themes = [THEMES[name] for name in (args.side or sorted(THEMES))]
+    hub = TaplistHub()
+    beer_index = BeerIndex(load_json(BEERDB_FILE, ttl=0))
+    # One beer DB fetch per tick; every side reads the shared index.
+    beerdb_poller = BeerDbPoller(BEERDB_FILE, beer_index, log_line, TOKEN_POLL_SECONDS, POLL_BEERDB_TIMEOUT_S)
+    pollers = []
+    workers = []
+
+    for theme in themes:
+        # Logo prerendering shells out to rsvg-convert per beer, so it runs on
+        # one worker per side instead of the poller's loop; a single worker
+        # keeps that side's updates in order.
+        worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"logos-{theme.name}")
+        workers.append(worker)
+
+        def prerender_and_publish(refresh_token, merged, theme=theme):
+            for beer in merged:
+                try:
+                    ensure_logo_png(beer, theme.logo_size, theme)
+                except Exception as exc:
+                    # Displays rasterize missing logos themselves; keep publishing.
+                    log_line(f"{theme.name}: logo prerender failed for {beer.get('id')}: {exc}")
+            hub.publish(theme.json_path, refresh_token, merged)
+            log_line(f"{theme.name}: published refreshToken={refresh_token!r} items={len(merged)}")
+
+        def publish(refresh_token, merged, worker=worker, job=prerender_and_publish):
+            worker.submit(job, refresh_token, merged)
+
+        taplist = load_json(theme.json_path, ttl=0)
+        publish(taplist.get("refreshToken"), merge_taplist_with_db(taplist, beer_index))
+        poller = TaplistPoller(
+            theme.json_path,
+            None,
+            taplist,
+            beer_index,
+            publish,
+            log_line,
+            poll_seconds=TOKEN_POLL_SECONDS,
+            taplist_timeout_s=POLL_TAPLIST_TIMEOUT_S,
+            beerdb_timeout_s=POLL_BEERDB_TIMEOUT_S,
+            trust_server_bytes=TRUST_SERVER_JSON,
+        )
+        poller.start()
+        pollers.append(poller)
+    beerdb_poller.start()
+
+    try:
+        os.unlink(args.socket)
+    except FileNotFoundError:
+        pass
+    server = DaemonServer(args.socket, SubscriberHandler)
+    server.hub = hub
+    server.sources = {t.json_path for t in themes}
+    server.stopping = threading.Event()
+
+    def shutdown(*_):
+        server.stopping.set()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    log_line(f"serving {', '.join(t.name for t in themes)} on {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        beerdb_poller.stop()
+        for poller in pollers:
+            poller.stop()
+        for worker in workers:
+            worker.shutdown(wait=False, cancel_futures=True)
+        server.server_close()
+        try:
+            os.unlink(args.socket)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    main()